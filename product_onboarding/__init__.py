@@ -12,4 +12,11 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
-from . import agent
+from dotenv import load_dotenv
+
+# `adk web` loads .env before importing the agent. Command-line tools such as
+# `python -m product_onboarding.kyc_batch` import this package first, and the
+# agents read their configuration at import time, so load it here too.
+load_dotenv()
+
+from . import agent  # noqa: E402
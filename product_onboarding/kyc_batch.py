@@ -0,0 +1,308 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Bulk KYC verification for backfills and re-verification jobs.
+
+Runs the same pipeline as the `run_kyc_pipeline_async` tool over many packets
+of documents, each packet being one customer's driver's license and bank
+statement:
+
+    python -m product_onboarding.kyc_batch DIR_OR_MANIFEST -o report.jsonl
+
+DIR_OR_MANIFEST is either a directory with one subdirectory per packet, or a
+manifest: a .jsonl file of {"packet_id": ..., "files": [...]} lines or a .csv
+file with packet_id and path columns. Relative paths are resolved against
+the manifest's directory.
+
+Packets are verified concurrently, at most KYC_BATCH_CONCURRENCY at a time,
+and each result is appended to the JSONL report as soon as it is ready. The
+report doubles as the checkpoint: a rerun skips every packet that already has
+a verdict other than "error".
+"""
+
+import argparse
+import asyncio
+import csv
+import json
+import logging
+import mimetypes
+import os
+import sys
+import time
+from collections import Counter
+from typing import Any, Dict, Iterable, List, NamedTuple, Optional, Set
+
+from product_onboarding.sub_agents.kyc_check import agent as kyc_agent
+from product_onboarding.tools import docai
+
+# Packets verified at once. Each packet makes up to three Document AI calls.
+KYC_BATCH_CONCURRENCY = int(os.getenv("KYC_BATCH_CONCURRENCY", "8"))
+
+_RETRIED_VERDICTS = {"error"}
+
+
+class Packet(NamedTuple):
+    """One customer's documents, verified together."""
+
+    packet_id: str
+    files: List[str]
+
+
+def packets_from_directory(directory: str) -> List[Packet]:
+    """One packet per subdirectory, holding the files directly inside it."""
+    packets = []
+    for entry in sorted(os.scandir(directory), key=lambda e: e.name):
+        if not entry.is_dir():
+            continue
+        files = sorted(
+            f.path
+            for f in os.scandir(entry.path)
+            if f.is_file() and not f.name.startswith(".")
+        )
+        packets.append(Packet(entry.name, files))
+    return packets
+
+
+def packets_from_manifest(path: str) -> List[Packet]:
+    """Reads a .jsonl or .csv manifest, keeping the order packets first appear in."""
+    base = os.path.dirname(os.path.abspath(path))
+    files: Dict[str, List[str]] = {}
+    with open(path, newline="") as f:
+        if path.endswith(".csv"):
+            rows: Iterable[tuple] = (
+                (row["packet_id"], [row["path"]]) for row in csv.DictReader(f)
+            )
+        else:
+            rows = (
+                (record["packet_id"], record["files"])
+                for record in (json.loads(line) for line in f if line.strip())
+            )
+        for packet_id, paths in rows:
+            files.setdefault(str(packet_id), []).extend(
+                os.path.join(base, p) for p in paths
+            )
+    return [Packet(packet_id, paths) for packet_id, paths in files.items()]
+
+
+def load_packets(source: str) -> List[Packet]:
+    if os.path.isdir(source):
+        return packets_from_directory(source)
+    return packets_from_manifest(source)
+
+
+def completed_packets(report_path: str) -> Set[str]:
+    """Packets whose latest record in the report does not need a retry."""
+    latest: Dict[str, str] = {}
+    if not os.path.exists(report_path):
+        return set()
+    with open(report_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                # A line cut short by an interrupted run; that packet is redone.
+                continue
+            latest[record["packet_id"]] = record.get("verdict")
+    return {p for p, verdict in latest.items() if verdict not in _RETRIED_VERDICTS}
+
+
+def _read_packet_documents(packet: Packet) -> Dict[str, "kyc_agent.LoadedDocument"]:
+    """Loads each file as a KYC document, keyed by kind; the first of a kind wins."""
+    documents: Dict[str, kyc_agent.LoadedDocument] = {}
+    for path in packet.files:
+        with open(path, "rb") as f:
+            data = f.read()
+        document = kyc_agent.load_document(data, mimetypes.guess_type(path)[0])
+        if document is None:
+            logging.warning(f"Skipping unsupported file {path} in packet {packet.packet_id}")
+        elif document.kind in documents:
+            logging.warning(
+                f"Packet {packet.packet_id} has more than one {document.kind}, "
+                f"ignoring {path}"
+            )
+        else:
+            documents[document.kind] = document
+    return documents
+
+
+async def _verify_packet(packet: Packet) -> Dict[str, Any]:
+    try:
+        documents = await asyncio.to_thread(_read_packet_documents, packet)
+    except OSError as e:
+        logging.error(f"Could not read packet {packet.packet_id}: {e}")
+        return {"verdict": "error", "errors": [f"Could not read documents: {e}"]}
+    return await kyc_agent.verify_kyc_documents_async(documents)
+
+
+async def run_batch(
+    packets: List[Packet],
+    report_path: str,
+    concurrency: int = KYC_BATCH_CONCURRENCY,
+    resume: bool = True,
+) -> Counter:
+    """
+    Verifies the packets not yet in the report and appends one JSONL record
+    per packet. Returns the count of each verdict written in this run.
+    """
+    done = completed_packets(report_path) if resume else set()
+    pending = [p for p in packets if p.packet_id not in done]
+    logging.info(
+        f"{len(pending)} of {len(packets)} packets to verify, {len(done)} already done"
+    )
+
+    semaphore = asyncio.Semaphore(max(1, concurrency))
+    verdicts: Counter = Counter()
+
+    with open(report_path, "a" if resume else "w") as report:
+        if report.tell():
+            # Start on a fresh line if the last run died mid-write.
+            with open(report_path, "rb") as f:
+                f.seek(-1, os.SEEK_END)
+                if f.read(1) != b"\n":
+                    report.write("\n")
+
+        async def verify(packet: Packet) -> None:
+            async with semaphore:
+                try:
+                    result = await _verify_packet(packet)
+                except Exception as e:
+                    # Recorded like any other failure, so the rest of the
+                    # batch carries on and a rerun retries this packet.
+                    logging.exception(f"Unexpected error verifying packet {packet.packet_id}")
+                    result = {"verdict": "error", "errors": [f"Unexpected error: {e}"]}
+            record = {"packet_id": packet.packet_id, "files": packet.files, **result}
+            record["verified_at"] = time.time()
+            # Only the loop thread writes, so whole lines never interleave.
+            report.write(json.dumps(record) + "\n")
+            report.flush()
+            verdicts[result["verdict"]] += 1
+
+        try:
+            await asyncio.gather(*(verify(p) for p in pending))
+        finally:
+            await docai.close_async_clients()
+    return verdicts
+
+
+def _latest_records(report_path: str) -> List[Dict[str, Any]]:
+    records: Dict[str, Dict[str, Any]] = {}
+    with open(report_path) as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue
+            records.pop(record["packet_id"], None)
+            records[record["packet_id"]] = record
+    return list(records.values())
+
+
+def write_parquet(report_path: str, parquet_path: str) -> None:
+    """Writes the latest record of each packet as a flat Parquet table."""
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError as e:
+        raise SystemExit(f"Parquet output needs pyarrow (pip install pyarrow): {e}")
+
+    records = _latest_records(report_path)
+    columns = {
+        "packet_id": [r["packet_id"] for r in records],
+        "verdict": [r["verdict"] for r in records],
+        "license_name": [r.get("drivers_license", {}).get("name") for r in records],
+        "license_address": [r.get("drivers_license", {}).get("address") for r in records],
+        "statement_name": [r.get("bank_statement", {}).get("name") for r in records],
+        "statement_address": [r.get("bank_statement", {}).get("address") for r in records],
+        "name_score": [r.get("name_score") for r in records],
+        "address_score": [r.get("address_score") for r in records],
+        "names_match": [r.get("names_match") for r in records],
+        "addresses_match": [r.get("addresses_match") for r in records],
+        "fraud_signals": [r.get("fraud_signals", []) for r in records],
+        "missing_documents": [r.get("missing_documents", []) for r in records],
+        "errors": [r.get("errors", []) for r in records],
+        "files": [r["files"] for r in records],
+        "verified_at": [r["verified_at"] for r in records],
+    }
+    types = {
+        "name_score": pa.float64(),
+        "address_score": pa.float64(),
+        "names_match": pa.bool_(),
+        "addresses_match": pa.bool_(),
+        "fraud_signals": pa.list_(pa.string()),
+        "missing_documents": pa.list_(pa.string()),
+        "errors": pa.list_(pa.string()),
+        "files": pa.list_(pa.string()),
+        "verified_at": pa.float64(),
+    }
+    table = pa.table(
+        {
+            name: pa.array(values, type=types.get(name, pa.string()))
+            for name, values in columns.items()
+        }
+    )
+    pq.write_table(table, parquet_path)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m product_onboarding.kyc_batch",
+        description="Verify KYC document packets in bulk.",
+    )
+    parser.add_argument(
+        "source", help="directory with one subdirectory per packet, or a .jsonl/.csv manifest"
+    )
+    parser.add_argument(
+        "-o", "--output", default="kyc_report.jsonl", help="JSONL report and checkpoint"
+    )
+    parser.add_argument("--parquet", help="also write the final report as Parquet")
+    parser.add_argument(
+        "-c",
+        "--concurrency",
+        type=int,
+        default=KYC_BATCH_CONCURRENCY,
+        help="packets verified at once (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-resume",
+        action="store_true",
+        help="overwrite the report instead of skipping packets already verified",
+    )
+    parser.add_argument("-v", "--verbose", action="store_true")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(
+        level=logging.INFO if args.verbose else logging.WARNING,
+        format="%(asctime)s %(levelname)s %(message)s",
+    )
+
+    packets = load_packets(args.source)
+    start = time.monotonic()
+    verdicts = asyncio.run(
+        run_batch(packets, args.output, args.concurrency, resume=not args.no_resume)
+    )
+    elapsed = time.monotonic() - start
+
+    summary = ", ".join(f"{verdict}: {n}" for verdict, n in sorted(verdicts.items()))
+    print(
+        f"Verified {sum(verdicts.values())} of {len(packets)} packets in {elapsed:.1f}s"
+        + (f" ({summary})" if summary else "")
+    )
+    if args.parquet:
+        write_parquet(args.output, args.parquet)
+        print(f"Wrote {args.parquet}")
+    return 1 if verdicts.get("error") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,257 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Small thread-safe caches shared by the agent tools."""
+
+import json
+import logging
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+
+class TTLCache:
+    """
+    In-process LRU cache whose entries expire after a time-to-live.
+
+    The cache holds at most `maxsize` entries and, when `max_bytes` is set, at
+    most that many bytes as measured by `sizeof`.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = len,
+    ):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._sizeof = sizeof if max_bytes is not None else (lambda value: 0)
+        self._bytes = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, int]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Returns the cached value, or None if it is missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[1] > time.monotonic():
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                self._bytes -= self._entries.pop(key)[2]
+            self.misses += 1
+            return None
+
+    def set(self, key: Hashable, value: Any, ttl: Optional[float] = None) -> None:
+        """Stores a value. `ttl` overrides the cache default for this entry."""
+        size = self._sizeof(value)
+        if self.maxsize <= 0 or (self.max_bytes is not None and size > self.max_bytes):
+            return
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._bytes -= previous[2]
+            self._entries[key] = (value, expires_at, size)
+            self._bytes += size
+            while len(self._entries) > self.maxsize or (
+                self.max_bytes is not None and self._bytes > self.max_bytes
+            ):
+                self._bytes -= self._entries.popitem(last=False)[1][2]
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    @property
+    def nbytes(self) -> int:
+        """Total size of the cached values, as measured by `sizeof`."""
+        return self._bytes
+
+
+class SQLiteCache:
+    """On-disk cache of byte values with per-entry expiry, backed by SQLite."""
+
+    def __init__(self, path: str, table: str = "cache", max_bytes: Optional[int] = None):
+        self.path = path
+        self.table = table
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {table} "
+                "(key TEXT PRIMARY KEY, value BLOB NOT NULL, expires_at REAL NOT NULL)"
+            )
+
+    def get(self, key: str) -> Optional[Tuple[bytes, float]]:
+        """Returns `(value, expires_at)` with a wall-clock expiry, or None."""
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is not None and row[1] > time.time():
+                self.hits += 1
+                return bytes(row[0]), row[1]
+            if row is not None:
+                with self._conn:
+                    self._conn.execute(
+                        f"DELETE FROM {self.table} WHERE key = ?", (key,)
+                    )
+            self.misses += 1
+            return None
+
+    def set(self, key: str, value: bytes, ttl: float) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at) "
+                "VALUES (?, ?, ?)",
+                (key, sqlite3.Binary(value), time.time() + ttl),
+            )
+            if self.max_bytes is not None:
+                self._evict_to_max_bytes()
+
+    def _evict_to_max_bytes(self) -> None:
+        """Drops expired rows, then the soonest-expiring ones, until under budget."""
+        self._conn.execute(
+            f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),)
+        )
+        total = self._conn.execute(
+            f"SELECT COALESCE(SUM(LENGTH(value)), 0) FROM {self.table}"
+        ).fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        rows = self._conn.execute(
+            f"SELECT key, LENGTH(value) FROM {self.table} ORDER BY expires_at"
+        ).fetchall()
+        evicted = []
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            evicted.append((key,))
+            total -= size
+        self._conn.executemany(f"DELETE FROM {self.table} WHERE key = ?", evicted)
+
+    def purge_expired(self) -> int:
+        """Deletes expired rows and returns how many were removed."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"DELETE FROM {self.table} WHERE expires_at <= ?", (time.time(),)
+            )
+            return cursor.rowcount
+
+    def clear(self) -> None:
+        with self._lock, self._conn:
+            self._conn.execute(f"DELETE FROM {self.table}")
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
+
+
+class TieredCache:
+    """
+    Two-tier cache: an in-process `TTLCache` in front of an optional
+    `SQLiteCache`.
+
+    Values must round-trip through `serialize`/`deserialize` (JSON by default)
+    to be stored on disk. A disk hit is promoted to memory with the time it has
+    left, so a short-lived entry never outlives its original TTL.
+    """
+
+    def __init__(
+        self,
+        maxsize: int,
+        ttl: float,
+        db_path: Optional[str] = None,
+        table: str = "cache",
+        serialize: Callable[[Any], bytes] = lambda value: json.dumps(value).encode(),
+        deserialize: Callable[[bytes], Any] = json.loads,
+        max_bytes: Optional[int] = None,
+        disk_max_bytes: Optional[int] = None,
+        sizeof: Callable[[Any], int] = len,
+    ):
+        self.ttl = ttl
+        self.memory = TTLCache(
+            maxsize=maxsize, ttl=ttl, max_bytes=max_bytes, sizeof=sizeof
+        )
+        self.disk: Optional[SQLiteCache] = None
+        self._serialize = serialize
+        self._deserialize = deserialize
+        if db_path:
+            try:
+                self.disk = SQLiteCache(db_path, table=table, max_bytes=disk_max_bytes)
+            except sqlite3.Error as e:
+                logging.warning(
+                    f"Could not open cache database {db_path}, using memory only: {e}"
+                )
+
+    def get(self, key: str) -> Optional[Any]:
+        value = self.memory.get(key)
+        if value is not None or self.disk is None:
+            return value
+        try:
+            row = self.disk.get(key)
+            if row is None:
+                return None
+            value = self._deserialize(row[0])
+        except (sqlite3.Error, ValueError) as e:
+            logging.warning(f"Ignoring unreadable cache entry {key}: {e}")
+            return None
+        self.memory.set(key, value, ttl=row[1] - time.time())
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None) -> None:
+        ttl = self.ttl if ttl is None else ttl
+        self.memory.set(key, value, ttl=ttl)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, self._serialize(value), ttl=ttl)
+            except (sqlite3.Error, TypeError, ValueError) as e:
+                logging.warning(f"Could not write cache entry {key} to disk: {e}")
+
+    def clear(self) -> None:
+        self.memory.clear()
+        if self.disk is not None:
+            self.disk.clear()
+
+    def stats(self) -> Dict[str, int]:
+        """Hit/miss counters. A disk lookup only happens after a memory miss."""
+        disk_hits = self.disk.hits if self.disk is not None else 0
+        return {
+            "memory_hits": self.memory.hits,
+            "disk_hits": disk_hits,
+            "hits": self.memory.hits + disk_hits,
+            "misses": self.memory.misses - disk_hits,
+            "memory_entries": len(self.memory),
+            "memory_bytes": self.memory.nbytes,
+        }
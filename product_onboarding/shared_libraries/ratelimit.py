@@ -0,0 +1,165 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Process-wide rate limiting with adaptive (AIMD) concurrency.
+
+One `RateLimiter` can be shared by threads and event loops at the same time:
+the blocking methods are for threads, the `_async` ones for coroutines.
+"""
+
+import asyncio
+import contextlib
+import threading
+import time
+from typing import AsyncIterator, Dict, Iterator
+
+# How often a coroutine re-checks for a free concurrency slot.
+_ASYNC_POLL_SECONDS = 0.005
+
+
+class RateLimiter:
+    """
+    Token bucket (requests per second) plus an AIMD concurrency limit.
+
+    Call `record(overloaded=...)` after each request. A success grows the
+    concurrency limit by about one per window of requests. An overload answer
+    (HTTP 429, OVER_QUERY_LIMIT) halves it, at most once per `cooldown`
+    seconds, so one burst of rejections counts as a single signal.
+    """
+
+    def __init__(
+        self,
+        qps: float,
+        burst: int,
+        max_concurrency: int,
+        min_concurrency: int = 1,
+        cooldown: float = 1.0,
+    ):
+        self.qps = qps
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.cooldown = cooldown
+
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Condition(self._lock)
+        self._tokens = float(burst)
+        self._refilled_at = time.monotonic()
+        self._limit = float(max_concurrency)
+        self._in_flight = 0
+        self._last_decrease = 0.0
+
+        self._acquired = 0
+        self._overloads = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    # --- Token bucket ---
+    def _reserve_token(self) -> float:
+        """Takes a token, possibly on credit, and returns how long to wait."""
+        if self.qps <= 0:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(
+                float(self.burst), self._tokens + (now - self._refilled_at) * self.qps
+            )
+            self._refilled_at = now
+            self._tokens -= 1.0
+            return max(0.0, -self._tokens / self.qps)
+
+    # --- Concurrency slots ---
+    def _try_take_slot(self) -> bool:
+        if self._in_flight < int(self._limit):
+            self._in_flight += 1
+            return True
+        return False
+
+    def _release_slot(self) -> None:
+        with self._lock:
+            self._in_flight -= 1
+            self._slot_freed.notify()
+
+    def _record_wait(self, waited: float) -> None:
+        with self._lock:
+            self._acquired += 1
+            self._total_wait += waited
+            self._max_wait = max(self._max_wait, waited)
+
+    @contextlib.contextmanager
+    def acquire(self) -> Iterator[float]:
+        """Blocks until a request may be sent. Yields the time spent waiting."""
+        start = time.monotonic()
+        delay = self._reserve_token()
+        if delay:
+            time.sleep(delay)
+        with self._lock:
+            while not self._try_take_slot():
+                self._slot_freed.wait()
+        waited = time.monotonic() - start
+        self._record_wait(waited)
+        try:
+            yield waited
+        finally:
+            self._release_slot()
+
+    @contextlib.asynccontextmanager
+    async def acquire_async(self) -> AsyncIterator[float]:
+        """Async version of `acquire` that never blocks the event loop."""
+        start = time.monotonic()
+        delay = self._reserve_token()
+        if delay:
+            await asyncio.sleep(delay)
+        while True:
+            with self._lock:
+                if self._try_take_slot():
+                    break
+            await asyncio.sleep(_ASYNC_POLL_SECONDS)
+        waited = time.monotonic() - start
+        self._record_wait(waited)
+        try:
+            yield waited
+        finally:
+            self._release_slot()
+
+    # --- Feedback ---
+    def record(self, overloaded: bool) -> None:
+        """Adjusts the concurrency limit from the outcome of one request."""
+        with self._lock:
+            if overloaded:
+                self._overloads += 1
+                now = time.monotonic()
+                if now - self._last_decrease >= self.cooldown:
+                    self._limit = max(float(self.min_concurrency), self._limit / 2)
+                    self._last_decrease = now
+            else:
+                self._limit = min(
+                    float(self.max_concurrency), self._limit + 1.0 / self._limit
+                )
+                self._slot_freed.notify()
+
+    def stats(self) -> Dict[str, float]:
+        """Current limit, load and queue-wait metrics."""
+        with self._lock:
+            return {
+                "concurrency_limit": int(self._limit),
+                "in_flight": self._in_flight,
+                "requests": self._acquired,
+                "overloads": self._overloads,
+                "queue_wait_total_s": self._total_wait,
+                "queue_wait_max_s": self._max_wait,
+                "queue_wait_avg_s": (
+                    self._total_wait / self._acquired if self._acquired else 0.0
+                ),
+            }
@@ -14,11 +14,14 @@
 
 """Search agent. Searches for general information about {os.getenv("AGENT_COMPANY_NAME", "Clover")}"""
 
+import asyncio
+import concurrent.futures
 import json  # Added import for json
 import logging
 import os
+import threading
 from io import BytesIO
-from typing import Dict, Optional
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
 
 from google.adk.agents import Agent
 from google.adk.models import (  # Content and Part come from google.genai.types
@@ -30,7 +33,7 @@ from google.adk.tools import ToolContext, load_artifacts
 # PIL.Image is not strictly needed if docai handles bytes directly
 from google.genai import types  # Import types for Content and Part
 
-from product_onboarding.sub_agents.kyc_check import prompt
+from product_onboarding.sub_agents.kyc_check import classifier, matching, preprocess, prompt
 from product_onboarding.tools import docai  # Import the docai module
 from product_onboarding.tools.salesforce import (
     get_opportunity_details,
@@ -38,173 +41,389 @@ from product_onboarding.tools.salesforce import (
     update_opportunity_with_comment,
 )
 
+# Worker threads shared by concurrent Document AI calls in run_kyc_pipeline.
+KYC_MAX_WORKERS = int(os.getenv("KYC_MAX_WORKERS", "6"))
+# Bank statement pages sent to Document AI first. The account holder's name
+# and address are almost always on page one; the rest of the statement is
+# only processed if they are not found there.
+KYC_STATEMENT_PAGES = int(os.getenv("KYC_STATEMENT_PAGES", "1"))
 
-def _load_file_from_context(
-    tool_context: ToolContext,
-) -> tuple[Optional[bytes], Optional[str]]:
-    """Loads a file from callback_context.user_content and returns its bytes and mime_type."""
-    if tool_context.user_content and tool_context.user_content.parts:
-        # user_content is a single Content object, iterate through its parts
-        for part in tool_context.user_content.parts:
-            if (
-                isinstance(part, types.Part)
-                and part.inline_data
-                and part.inline_data.data
-            ):
-                try:
-                    file_bytes = part.inline_data.data
-                    mime_type = part.inline_data.mime_type
-                    # Basic check for supported mime types
-                    if mime_type in ["image/jpeg", "image/png", "application/pdf"]:
-                        logging.info(
-                            f"Found file part in user_content with mime_type: {mime_type}"
-                        )
-                        return file_bytes, mime_type
-                    # else:
-                    # logging.info(f"Part found in user_content with mime_type: {mime_type}, but not a target file type.")
-                except Exception as e:
-                    logging.error(
-                        f"Error accessing inline_data from user_content part: {e}"
-                    )
-                    # Continue checking other parts
-        logging.warning(
-            "No suitable file part (image/pdf) found in callback_context.user_content.parts."
-        )
-        return None, None
-    else:
-        logging.warning("No user_content or parts found in callback_context.")
-        return None, None
+_SUPPORTED_MIME_TYPES = ("image/jpeg", "image/png", "application/pdf")
 
+# Session artifacts holding the last uploaded document of each kind, so the
+# pipeline can combine a license and a statement sent in different turns.
+_DOCUMENT_ARTIFACTS = {
+    classifier.DRIVERS_LICENSE: "kyc_drivers_license",
+    classifier.BANK_STATEMENT: "kyc_bank_statement",
+}
 
-def check_fraud_drivers_license(query: str, tool_context: "ToolContext"):
-    """Calls DocAI to verify document is not fradulent"""
+_kyc_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_kyc_executor_lock = threading.Lock()
 
-    file_bytes, mime_type = _load_file_from_context(tool_context)
 
-    if not file_bytes or not mime_type:
-        logging.warning("No file data found in user content to process for fraud check.")
-        # Potentially return an LlmResponse indicating failure or missing data
+class LoadedDocument(NamedTuple):
+    """A document part from the conversation, viewed without copying."""
+
+    data: memoryview
+    mime_type: str
+    kind: str  # classifier.DRIVERS_LICENSE or classifier.BANK_STATEMENT
+    confident: bool  # False when `kind` is only the default for the file type
+    part: types.Part  # The source part, e.g. for saving as an artifact
+
+
+# File signatures win over the declared mime type, which clients often guess.
+_MAGIC_NUMBERS = (
+    (b"\xff\xd8\xff", "image/jpeg"),
+    (b"\x89PNG\r\n\x1a\n", "image/png"),
+    (b"%PDF-", "application/pdf"),
+)
+
+
+def _detect_mime_type(data: memoryview, declared: Optional[str]) -> Optional[str]:
+    """Returns the supported mime type of the bytes, or None if unsupported."""
+    for magic, mime_type in _MAGIC_NUMBERS:
+        if data[: len(magic)] == magic:
+            return mime_type
+    return declared if declared in _SUPPORTED_MIME_TYPES else None
+
+
+def _document_from_part(part: types.Part) -> Optional[LoadedDocument]:
+    """Wraps an inline document part, or returns None if it is not one."""
+    if not (isinstance(part, types.Part) and part.inline_data and part.inline_data.data):
+        return None
+    data = memoryview(part.inline_data.data)
+    mime_type = _detect_mime_type(data, part.inline_data.mime_type)
+    if mime_type is None:
+        logging.info(
+            f"Skipping part with unsupported mime_type: {part.inline_data.mime_type}"
+        )
         return None
+    classification = classifier.classify_document(data, mime_type)
+    return LoadedDocument(
+        data, mime_type, classification.kind, classification.confident, part
+    )
 
-    processor_name_env = os.getenv("ID_PROOFING_PROCESSOR_FULLPATH")
-    logging.debug(
-        f"check_fraud_drivers_license::processor_name_env: {processor_name_env}"
+
+def load_document(data: bytes, mime_type: Optional[str]) -> Optional[LoadedDocument]:
+    """Wraps stored document bytes, e.g. from a file, as a LoadedDocument."""
+    return _document_from_part(
+        types.Part(inline_data=types.Blob(data=data, mime_type=mime_type))
     )
 
-    if not processor_name_env:
-        logging.error(
-            "Error: Missing one or more environment variables for DocAI:"
-            "ID_PROOFING_PROCESSOR_FULLPATH"
+
+def _load_documents_from_context(tool_context: ToolContext) -> List[LoadedDocument]:
+    """
+    Returns every image or PDF part of tool_context.user_content, in order,
+    with its detected mime type and document kind. The bytes are not copied.
+    """
+    if not tool_context.user_content or not tool_context.user_content.parts:
+        logging.warning("No user_content or parts found in callback_context.")
+        return []
+    documents = []
+    for part in tool_context.user_content.parts:
+        document = _document_from_part(part)
+        if document is not None:
+            logging.info(
+                f"Found {document.kind} part in user_content with mime_type: {document.mime_type}"
+            )
+            documents.append(document)
+    if not documents:
+        logging.warning(
+            "No suitable file part (image/pdf) found in callback_context.user_content.parts."
         )
-        # Potentially return an LlmResponse indicating configuration error
-        return None
+    return documents
 
-    try:
-        processed_document = docai.process_document(
-            processor_name=processor_name_env,
-            image_buffer=file_bytes,  # process_document expects bytes
-            mime_type=mime_type,
+
+def _load_file_from_context(
+    tool_context: ToolContext, kind: Optional[str] = None
+) -> tuple[Optional[memoryview], Optional[str]]:
+    """
+    Returns a zero-copy view of one document's bytes and its mime_type.
+
+    Picks the first document of `kind` when given, else the first document.
+    """
+    documents = _load_documents_from_context(tool_context)
+    if not documents:
+        return None, None
+    document = next((d for d in documents if d.kind == kind), documents[0])
+    return document.data, document.mime_type
+
+
+# Expected value for non-fraud on the identity-proofing signals we check.
+_TARGET_FRAUD_SIGNAL_TYPES = {
+    "fraud_signals_is_identity_document": "PASS",
+    "fraud_signals_image_manipulation": "PASS",  # assuming "PASS" means clear
+}
+
+
+def _parse_fraud_signals(processed_document) -> List[str]:
+    """Returns a description of each targeted fraud signal that did not pass."""
+    fraud_details = []
+    for entity in processed_document.entities:
+        entity_type = entity.type_
+        mention_text = entity.mention_text
+
+        if entity_type == "fraud_signals_is_identity_document":
+            if mention_text != _TARGET_FRAUD_SIGNAL_TYPES[entity_type]:
+                fraud_details.append(
+                    f"Identity Document Check Failed: {mention_text} (Expected {_TARGET_FRAUD_SIGNAL_TYPES[entity_type]})"
+                )
+
+        # elif entity_type == "fraud_signals_image_manipulation":
+        #     # If this signal is present and not explicitly "PASS", consider it a flag.
+        #     # The documentation isn't very specific on mention_text values for this,
+        #     # but "PASS" usually indicates no issue.
+        #     if mention_text != _TARGET_FRAUD_SIGNAL_TYPES[entity_type]:
+        #         fraud_details.append(
+        #             f"Image Manipulation Detected: {mention_text} (Expected {_TARGET_FRAUD_SIGNAL_TYPES[entity_type]})"
+        #         )
+    return fraud_details
+
+
+def _parse_drivers_license(processed_document) -> Dict[str, Optional[str]]:
+    """Returns the holder's Names and Address from a parsed driver's license."""
+    extracted_data: Dict[str, Optional[str]] = {"Names": None, "Address": None}
+    given_names = []
+    family_names = []
+
+    for entity in processed_document.entities:
+        if entity.type_ == "Given Names":
+            given_names.append(entity.mention_text.strip())
+        elif entity.type_ == "Family Name":
+            family_names.append(entity.mention_text.strip())
+        elif entity.type_ == "Address":
+            extracted_data["Address"] = entity.mention_text.strip()
+
+    # Combine names, handling cases where parts might be missing
+    full_name_parts = [name for name in given_names + family_names if name]
+    if full_name_parts:
+        extracted_data["Names"] = " ".join(full_name_parts)
+    return extracted_data
+
+
+def _parse_bank_statement(processed_document) -> Dict[str, Optional[str]]:
+    """Returns the account holder's Name and Address from a parsed bank statement."""
+    extracted_data: Dict[str, Optional[str]] = {"Name": None, "Address": None}
+    for entity in processed_document.entities:
+        if entity.type_ == "client_name":
+            extracted_data["Name"] = entity.mention_text.strip()
+        elif entity.type_ == "client_address":
+            extracted_data["Address"] = entity.mention_text.strip()
+    return extracted_data
+
+
+def _process_fraud_check(processor_name: str, file_bytes, mime_type: str):
+    """Sends the original upload, untouched, to the identity-proofing processor."""
+    return docai.process_document(processor_name, file_bytes, mime_type)
+
+
+async def _process_fraud_check_async(processor_name: str, file_bytes, mime_type: str):
+    return await docai.process_document_async(processor_name, file_bytes, mime_type)
+
+
+def _extract_document(
+    processor_name: str, file_bytes, mime_type: str, first_pages: Optional[int] = None
+):
+    """
+    Normalizes an image upload (orientation, size, metadata) and sends it to
+    an extraction processor. Fraud checks get the original upload instead,
+    since identity proofing inspects the untouched image.
+    """
+    file_bytes, mime_type = preprocess.normalize_image(file_bytes, mime_type)
+    return docai.process_document(
+        processor_name=processor_name,
+        image_buffer=file_bytes,
+        mime_type=mime_type,
+        first_pages=first_pages,
+    )
+
+
+async def _extract_document_async(
+    processor_name: str, file_bytes, mime_type: str, first_pages: Optional[int] = None
+):
+    """Async version of `_extract_document`; images are normalized on a thread."""
+    if mime_type != "application/pdf":
+        file_bytes, mime_type = await asyncio.to_thread(
+            preprocess.normalize_image, file_bytes, mime_type
         )
+    return await docai.process_document_async(
+        processor_name=processor_name,
+        image_buffer=file_bytes,
+        mime_type=mime_type,
+        first_pages=first_pages,
+    )
 
-        # Check for specific fraud signals in the processed document entities
-        fraud_detected = False
-        fraud_details = []
 
-        # Specific fraud signals to check based on user feedback
-        target_fraud_signal_types = {
-            "fraud_signals_is_identity_document": "PASS",  # Expected value for non-fraud
-            "fraud_signals_image_manipulation": "PASS",  # Expected value if not manipulated (assuming "PASS" means clear)
-        }
+def _selects_statement_pages(mime_type: str) -> bool:
+    return mime_type == "application/pdf" and KYC_STATEMENT_PAGES > 0
+
+
+def _needs_whole_statement(processed_document, file_bytes) -> bool:
+    """
+    True when the first pages lack the client's name or address and the
+    statement has more pages to look at.
+    """
+    extracted_data = _parse_bank_statement(processed_document)
+    if extracted_data["Name"] and extracted_data["Address"]:
+        return False
+    page_count = classifier.pdf_page_count(file_bytes)
+    if page_count is not None and page_count <= KYC_STATEMENT_PAGES:
+        return False
+    logging.info(
+        f"Client name or address not on the first {KYC_STATEMENT_PAGES} page(s), "
+        "processing the whole statement"
+    )
+    return True
 
-        if processed_document.entities:
-            for entity in processed_document.entities:
-                entity_type = entity.type_
-                mention_text = entity.mention_text
-
-                if entity_type == "fraud_signals_is_identity_document":
-                    if mention_text != target_fraud_signal_types[entity_type]:
-                        fraud_detected = True
-                        fraud_details.append(
-                            f"Identity Document Check Failed: {mention_text} (Expected {target_fraud_signal_types[entity_type]})"
-                        )
-
-                # elif entity_type == "fraud_signals_image_manipulation":
-                #     # If this signal is present and not explicitly "PASS", consider it a flag.
-                #     # The documentation isn't very specific on mention_text values for this,
-                #     # but "PASS" usually indicates no issue.
-                #     if mention_text != target_fraud_signal_types[entity_type]:
-                #         fraud_detected = True
-                #         fraud_details.append(
-                #             f"Image Manipulation Detected: {mention_text} (Expected {target_fraud_signal_types[entity_type]})"
-                #         )
-
-        if fraud_detected:
-            logging.info(f"Fraud signals detected: {'; '.join(fraud_details)}")
-            fraud_message = f"Fraudulent document detected based on DocAI analysis. Details: {'; '.join(fraud_details)}"
-            # update_opportunity_with_comment(callback_context, fraud_message) # Optional: update Salesforce
-            return fraud_message
 
-        else:
-            return "No targeted fraud signals (identity document, image manipulation) detected by DocAI."
+def _extract_bank_statement(processor_name: str, file_bytes, mime_type: str):
+    """
+    Processes the first KYC_STATEMENT_PAGES pages of a PDF statement, and the
+    whole statement only if the client's name or address is not found there.
+    """
+    if not _selects_statement_pages(mime_type):
+        return _extract_document(processor_name, file_bytes, mime_type)
 
-    except Exception as e:
-        logging.error(f"Error calling Document AI: {e}")
-        error_message = f"Error processing document with DocAI: {e}"
-        # update_opportunity_with_comment(callback_context, error_message) # Optional: update Salesforce
-        return error_message
+    processed_document = _extract_document(
+        processor_name, file_bytes, mime_type, first_pages=KYC_STATEMENT_PAGES
+    )
+    if _needs_whole_statement(processed_document, file_bytes):
+        return _extract_document(processor_name, file_bytes, mime_type)
+    return processed_document
 
 
-def extract_info_from_drivers_license(query: str, tool_context: "ToolContext"):
-    """Extracts Name and Address from a driver's license using Document AI."""
-    file_bytes, mime_type = _load_file_from_context(tool_context)
+async def _extract_bank_statement_async(
+    processor_name: str, file_bytes, mime_type: str
+):
+    """Async version of `_extract_bank_statement`."""
+    if not _selects_statement_pages(mime_type):
+        return await _extract_document_async(processor_name, file_bytes, mime_type)
 
+    processed_document = await _extract_document_async(
+        processor_name, file_bytes, mime_type, first_pages=KYC_STATEMENT_PAGES
+    )
+    if _needs_whole_statement(processed_document, file_bytes):
+        return await _extract_document_async(processor_name, file_bytes, mime_type)
+    return processed_document
+
+
+def _tool_inputs(
+    tool_context: ToolContext, kind: str, processor_env: str, label: str
+) -> Tuple[Optional[Tuple[str, memoryview, str]], Optional[str]]:
+    """
+    Finds the upload for a single-step KYC tool and its processor.
+
+    Returns `(processor_name, file_bytes, mime_type)` and None, or None and
+    the error message to give the model.
+    """
+    file_bytes, mime_type = _load_file_from_context(tool_context, kind)
     if not file_bytes or not mime_type:
-        logging.warning("No file data found in user content for driver's license extraction.")
+        logging.warning(f"No file data found in user content for {label} processing.")
+        return None, f"No file provided for {label} processing."
+
+    mismatch = classifier.mismatch_error(file_bytes, mime_type, kind)
+    if mismatch:
+        logging.warning(f"Rejected upload for {label} processing: {mismatch}")
+        return None, mismatch
+
+    processor_name_env = os.getenv(processor_env)
+    logging.debug(f"{label}::processor_name_env: {processor_name_env}")
+    if not processor_name_env:
+        logging.error(f"Error: Missing {processor_env} environment variable.")
+        return None, f"Document AI processor for {label} is not configured."
+    return (processor_name_env, file_bytes, mime_type), None
+
+
+def _fraud_check_result(processed_document) -> str:
+    # Check for specific fraud signals in the processed document entities
+    fraud_details = _parse_fraud_signals(processed_document)
+    if fraud_details:
+        logging.info(f"Fraud signals detected: {'; '.join(fraud_details)}")
+        fraud_message = f"Fraudulent document detected based on DocAI analysis. Details: {'; '.join(fraud_details)}"
+        # update_opportunity_with_comment(callback_context, fraud_message) # Optional: update Salesforce
+        return fraud_message
+    return "No targeted fraud signals (identity document, image manipulation) detected by DocAI."
+
+
+def _drivers_license_result(processed_document) -> str:
+    extracted_data = _parse_drivers_license(processed_document)
+    if not extracted_data["Names"] and not extracted_data["Address"]:
         return json.dumps(
-            {"error": "No file provided for driver's license processing."}
+            {"error": "Could not extract Names or Address from the driver's license."}
         )
+    return json.dumps(extracted_data)
 
-    processor_name_env = os.getenv("DL_PROCESSOR_FULLPATH")
-    if not processor_name_env:
-        logging.error("Error: Missing DL_PROCESSOR_FULLPATH environment variable.")
+
+def _bank_statement_result(processed_document) -> str:
+    extracted_data = _parse_bank_statement(processed_document)
+    if not extracted_data["Name"] and not extracted_data["Address"]:
         return json.dumps(
-            {"error": "Document AI processor for driver's license is not configured."}
+            {"error": "Could not extract Name or Address from the bank statement."}
         )
+    return json.dumps(extracted_data)
+
+
+def check_fraud_drivers_license(query: str, tool_context: "ToolContext"):
+    """Calls DocAI to verify document is not fradulent"""
+    inputs, error = _tool_inputs(
+        tool_context,
+        classifier.DRIVERS_LICENSE,
+        "ID_PROOFING_PROCESSOR_FULLPATH",
+        "identity proofing",
+    )
+    if error:
+        return error
+    try:
+        # bytes or memoryview, passed through uncopied
+        return _fraud_check_result(_process_fraud_check(*inputs))
+    except Exception as e:
+        logging.error(f"Error calling Document AI: {e}")
+        # update_opportunity_with_comment(callback_context, error_message) # Optional: update Salesforce
+        return f"Error processing document with DocAI: {e}"
+
 
+async def check_fraud_drivers_license_async(query: str, tool_context: "ToolContext"):
+    """Calls DocAI to verify document is not fradulent"""
+    inputs, error = _tool_inputs(
+        tool_context,
+        classifier.DRIVERS_LICENSE,
+        "ID_PROOFING_PROCESSOR_FULLPATH",
+        "identity proofing",
+    )
+    if error:
+        return error
     try:
-        processed_document = docai.process_document(
-            processor_name=processor_name_env,
-            image_buffer=file_bytes,
-            mime_type=mime_type,
-        )
+        return _fraud_check_result(await _process_fraud_check_async(*inputs))
+    except Exception as e:
+        logging.error(f"Error calling Document AI: {e}")
+        return f"Error processing document with DocAI: {e}"
 
-        extracted_data: Dict[str, Optional[str]] = {"Names": None, "Address": None}
-        given_names = []
-        family_names = []
-
-        if processed_document.entities:
-            for entity in processed_document.entities:
-                if entity.type_ == "Given Names":
-                    given_names.append(entity.mention_text.strip())
-                elif entity.type_ == "Family Name":
-                    family_names.append(entity.mention_text.strip())
-                elif entity.type_ == "Address":
-                    extracted_data["Address"] = entity.mention_text.strip()
-
-        # Combine names, handling cases where parts might be missing
-        full_name_parts = [name for name in given_names + family_names if name]
-        if full_name_parts:
-            extracted_data["Names"] = " ".join(full_name_parts)
-
-        if not extracted_data["Names"] and not extracted_data["Address"]:
-            return json.dumps(
-                {
-                    "error": "Could not extract Names or Address from the driver's license."
-                }
-            )
 
-        return json.dumps(extracted_data)
+def extract_info_from_drivers_license(query: str, tool_context: "ToolContext"):
+    """Extracts Name and Address from a driver's license using Document AI."""
+    inputs, error = _tool_inputs(
+        tool_context, classifier.DRIVERS_LICENSE, "DL_PROCESSOR_FULLPATH", "driver's license"
+    )
+    if error:
+        return json.dumps({"error": error})
+    try:
+        return _drivers_license_result(_extract_document(*inputs))
+    except Exception as e:
+        logging.error(f"Error calling Document AI for driver's license: {e}")
+        return json.dumps(
+            {"error": f"Error processing driver's license with Document AI: {str(e)}"}
+        )
+
 
+async def extract_info_from_drivers_license_async(query: str, tool_context: "ToolContext"):
+    """Extracts Name and Address from a driver's license using Document AI."""
+    inputs, error = _tool_inputs(
+        tool_context, classifier.DRIVERS_LICENSE, "DL_PROCESSOR_FULLPATH", "driver's license"
+    )
+    if error:
+        return json.dumps({"error": error})
+    try:
+        return _drivers_license_result(await _extract_document_async(*inputs))
     except Exception as e:
         logging.error(f"Error calling Document AI for driver's license: {e}")
         return json.dumps(
@@ -214,47 +433,272 @@ def extract_info_from_drivers_license(query: str, tool_context: "ToolContext"):
 
 def extract_info_from_bank_statement(query: str, tool_context: "ToolContext"):
     """Extracts Name and Address from a bank statement using Document AI."""
-    file_bytes, mime_type = _load_file_from_context(tool_context)
-
-    if not file_bytes or not mime_type:
-        logging.warning("No file data found in user content for bank statement extraction.")
-        return json.dumps({"error": "No file provided for bank statement processing."})
-
-    processor_name_env = os.getenv("BANK_STATEMENT_PROCESSOR_FULLPATH")
-    if not processor_name_env:
-        logging.error("Error: Missing BANK_STATEMENT_PROCESSOR_FULLPATH environment variable.")
+    inputs, error = _tool_inputs(
+        tool_context,
+        classifier.BANK_STATEMENT,
+        "BANK_STATEMENT_PROCESSOR_FULLPATH",
+        "bank statement",
+    )
+    if error:
+        return json.dumps({"error": error})
+    try:
+        return _bank_statement_result(_extract_bank_statement(*inputs))
+    except Exception as e:
+        logging.error(f"Error calling Document AI for bank statement: {e}")
         return json.dumps(
-            {"error": "Document AI processor for bank statement is not configured."}
+            {"error": f"Error processing bank statement with Document AI: {str(e)}"}
         )
 
+
+async def extract_info_from_bank_statement_async(query: str, tool_context: "ToolContext"):
+    """Extracts Name and Address from a bank statement using Document AI."""
+    inputs, error = _tool_inputs(
+        tool_context,
+        classifier.BANK_STATEMENT,
+        "BANK_STATEMENT_PROCESSOR_FULLPATH",
+        "bank statement",
+    )
+    if error:
+        return json.dumps({"error": error})
     try:
-        processed_document = docai.process_document(
-            processor_name=processor_name_env,
-            image_buffer=file_bytes,
-            mime_type=mime_type,
+        return _bank_statement_result(await _extract_bank_statement_async(*inputs))
+    except Exception as e:
+        logging.error(f"Error calling Document AI for bank statement: {e}")
+        return json.dumps(
+            {"error": f"Error processing bank statement with Document AI: {str(e)}"}
         )
 
-        extracted_data: Dict[str, Optional[str]] = {"Name": None, "Address": None}
 
-        if processed_document.entities:
-            for entity in processed_document.entities:
-                if entity.type_ == "client_name":
-                    extracted_data["Name"] = entity.mention_text.strip()
-                elif entity.type_ == "client_address":
-                    extracted_data["Address"] = entity.mention_text.strip()
+def _get_kyc_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Returns the process-wide worker pool used for Document AI calls."""
+    global _kyc_executor
+    if _kyc_executor is None:
+        with _kyc_executor_lock:
+            if _kyc_executor is None:
+                _kyc_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=KYC_MAX_WORKERS,
+                    thread_name_prefix="kyc-docai",
+                )
+    return _kyc_executor
+
+
+def _collect_kyc_documents(tool_context: ToolContext) -> Dict[str, LoadedDocument]:
+    """
+    Returns the driver's license and bank statement available to the pipeline,
+    keyed by kind.
+
+    Documents in the current message win, confidently classified ones first.
+    Only confidently classified documents are saved as session artifacts, so
+    a guess never replaces a document of a known kind. Kinds not in the
+    message are loaded from the artifacts of earlier turns, when an artifact
+    service is configured.
+    """
+    documents: Dict[str, LoadedDocument] = {}
+    for document in _load_documents_from_context(tool_context):
+        current = documents.get(document.kind)
+        if current is None or (document.confident and not current.confident):
+            documents[document.kind] = document
+
+    for kind, filename in _DOCUMENT_ARTIFACTS.items():
+        try:
+            if kind in documents:
+                if documents[kind].confident:
+                    tool_context.save_artifact(filename, documents[kind].part)
+            else:
+                artifact = tool_context.load_artifact(filename)
+                document = _document_from_part(artifact) if artifact else None
+                if document is not None:
+                    documents[kind] = document
+        except ValueError as e:
+            # No artifact service: only the current message is available.
+            logging.debug(f"Skipping artifact {filename}: {e}")
+    return documents
+
+
+# Pipeline jobs: the document kind they read, the processor they call, and
+# the blocking and async functions that call it.
+_KYC_JOBS = {
+    "fraud_check": (
+        classifier.DRIVERS_LICENSE,
+        "ID_PROOFING_PROCESSOR_FULLPATH",
+        _process_fraud_check,
+        _process_fraud_check_async,
+    ),
+    "drivers_license": (
+        classifier.DRIVERS_LICENSE,
+        "DL_PROCESSOR_FULLPATH",
+        _extract_document,
+        _extract_document_async,
+    ),
+    "bank_statement": (
+        classifier.BANK_STATEMENT,
+        "BANK_STATEMENT_PROCESSOR_FULLPATH",
+        _extract_bank_statement,
+        _extract_bank_statement_async,
+    ),
+}
+
+
+def _plan_kyc_jobs(
+    documents: Dict[str, LoadedDocument], errors: List[str]
+) -> Dict[str, Tuple[Callable, Callable, Tuple[str, memoryview, str]]]:
+    """
+    Returns the sync function, async function and arguments of every job
+    whose document was uploaded, recording unconfigured processors in `errors`.
+    """
+    planned = {}
+    for job, (kind, processor_env, process, process_async) in _KYC_JOBS.items():
+        if kind not in documents:
+            continue
+        processor_name = os.getenv(processor_env)
+        if not processor_name:
+            logging.error(f"Error: Missing {processor_env} environment variable.")
+            errors.append(f"{job}: Document AI processor is not configured.")
+            continue
+        args = (processor_name, documents[kind].data, documents[kind].mime_type)
+        planned[job] = (process, process_async, args)
+    return planned
+
+
+def _kyc_verdict(
+    documents: Dict[str, LoadedDocument], parsed: Dict[str, Any], errors: List[str]
+) -> Dict[str, Any]:
+    """Merges the parsed documents into the pipeline's compact verdict."""
+    result: Dict[str, Any] = {}
+    fraud_details: List[str] = []
+    if "fraud_check" in parsed:
+        fraud_details = _parse_fraud_signals(parsed["fraud_check"])
+        result["fraud_signals"] = fraud_details
+    license_info = (
+        _parse_drivers_license(parsed["drivers_license"])
+        if "drivers_license" in parsed
+        else None
+    )
+    statement_info = (
+        _parse_bank_statement(parsed["bank_statement"])
+        if "bank_statement" in parsed
+        else None
+    )
+    if license_info:
+        result["drivers_license"] = {
+            "name": license_info["Names"],
+            "address": license_info["Address"],
+        }
+    if statement_info:
+        result["bank_statement"] = {
+            "name": statement_info["Name"],
+            "address": statement_info["Address"],
+        }
+    if license_info and statement_info:
+        scores = matching.match_pairs(
+            [license_info["Names"]],
+            [statement_info["Name"]],
+            [license_info["Address"]],
+            [statement_info["Address"]],
+        )
+        for field in ("name", "address"):
+            score = float(scores[f"{field}_score"][0])
+            if score == score:  # NaN when a document is missing the field
+                result[f"{field}_score"] = round(score, 2)
+        result["names_match"] = bool(scores["names_match"][0])
+        result["addresses_match"] = bool(scores["addresses_match"][0])
+
+    missing = [kind for kind in _DOCUMENT_ARTIFACTS if kind not in documents]
+    if missing:
+        result["missing_documents"] = missing
+    if errors:
+        result["errors"] = errors
+
+    if fraud_details:
+        result["verdict"] = "fraud_detected"
+    elif errors:
+        result["verdict"] = "error"
+    elif missing:
+        result["verdict"] = "incomplete"
+    elif result.get("names_match") and result.get("addresses_match"):
+        result["verdict"] = "verified"
+    else:
+        result["verdict"] = "mismatch"
+    logging.info(f"KYC pipeline verdict: {result['verdict']}")
+    return result
+
+
+def verify_kyc_documents(documents: Dict[str, LoadedDocument]) -> Dict[str, Any]:
+    """
+    Runs every KYC job on the given documents, keyed by kind, concurrently on
+    the shared worker pool and returns the merged verdict.
+    """
+    errors: List[str] = []
+    futures = {
+        job: _get_kyc_executor().submit(process, *args)
+        for job, (process, _, args) in _plan_kyc_jobs(documents, errors).items()
+    }
+
+    parsed = {}
+    for job, future in futures.items():
+        try:
+            parsed[job] = future.result()
+        except Exception as e:
+            logging.error(f"Error calling Document AI for {job}: {e}")
+            errors.append(f"{job}: Error processing document with Document AI: {e}")
+    return _kyc_verdict(documents, parsed, errors)
+
+
+async def verify_kyc_documents_async(
+    documents: Dict[str, LoadedDocument],
+) -> Dict[str, Any]:
+    """Async version of `verify_kyc_documents`, gathering the jobs on the loop."""
+    errors: List[str] = []
+    planned = _plan_kyc_jobs(documents, errors)
+    outcomes = await asyncio.gather(
+        *(process_async(*args) for _, process_async, args in planned.values()),
+        return_exceptions=True,
+    )
 
-        if not extracted_data["Name"] and not extracted_data["Address"]:
-            return json.dumps(
-                {"error": "Could not extract Name or Address from the bank statement."}
+    parsed = {}
+    for job, outcome in zip(planned, outcomes):
+        if isinstance(outcome, Exception):
+            logging.error(f"Error calling Document AI for {job}: {outcome}")
+            errors.append(
+                f"{job}: Error processing document with Document AI: {outcome}"
             )
+        else:
+            parsed[job] = outcome
+    return _kyc_verdict(documents, parsed, errors)
 
-        return json.dumps(extracted_data)
 
-    except Exception as e:
-        logging.error(f"Error calling Document AI for bank statement: {e}")
-        return json.dumps(
-            {"error": f"Error processing bank statement with Document AI: {str(e)}"}
-        )
+def run_kyc_pipeline(query: str, tool_context: "ToolContext") -> Dict[str, Any]:
+    """
+    Verifies the customer's driver's license and bank statement in one call.
+
+    The identity-proofing and driver's license processors run on the license
+    while the bank statement processor runs on the statement, all at once.
+    Documents uploaded in earlier turns are reused.
+
+    Returns:
+        A verdict of "verified", "fraud_detected", "mismatch", "incomplete" or
+        "error", the extracted name and address of each document, their match
+        scores and decisions, and any missing documents or processing errors.
+    """
+    return verify_kyc_documents(_collect_kyc_documents(tool_context))
+
+
+async def run_kyc_pipeline_async(
+    query: str, tool_context: "ToolContext"
+) -> Dict[str, Any]:
+    """
+    Verifies the customer's driver's license and bank statement in one call.
+
+    The identity-proofing and driver's license processors run on the license
+    while the bank statement processor runs on the statement, all at once.
+    Documents uploaded in earlier turns are reused.
+
+    Returns:
+        A verdict of "verified", "fraud_detected", "mismatch", "incomplete" or
+        "error", the extracted name and address of each document, their match
+        scores and decisions, and any missing documents or processing errors.
+    """
+    return await verify_kyc_documents_async(_collect_kyc_documents(tool_context))
 
 
 kyc_check = Agent(
@@ -265,8 +709,9 @@ kyc_check = Agent(
     tools=[
         load_artifacts,
         update_opportunity_with_comment,
-        check_fraud_drivers_license,
-        extract_info_from_drivers_license,
-        extract_info_from_bank_statement,
+        run_kyc_pipeline_async,
+        check_fraud_drivers_license_async,
+        extract_info_from_drivers_license_async,
+        extract_info_from_bank_statement_async,
     ],
 )
@@ -0,0 +1,243 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local document-type classifier for KYC uploads.
+
+Decides whether an upload is a driver's license or a bank statement from its
+mime type, image dimensions and orientation, PDF page count and page size, and
+a sniff of the PDF's uncompressed text, before any Document AI call. Only file headers and
+small windows at both ends of a PDF are read, so a decision takes well under
+a millisecond and never copies the payload.
+"""
+
+import re
+from typing import NamedTuple, Optional, Tuple
+
+DRIVERS_LICENSE = "drivers_license"
+BANK_STATEMENT = "bank_statement"
+
+_READABLE_KINDS = {DRIVERS_LICENSE: "driver's license", BANK_STATEMENT: "bank statement"}
+
+# ID-1 cards (ISO/IEC 7810) are 85.60 x 53.98 mm, a 1.586 aspect ratio.
+# Photos are cropped loosely, which overlaps 3:2 camera frames and legal
+# paper, so a photo only counts as a card when it is also landscape. PDF pages
+# must stay clear of legal paper (1.65).
+_ID_CARD_ASPECT = (1.45, 1.75)
+_PDF_ID_CARD_ASPECT = (1.5, 1.63)
+# Letter (1.29), A4 (1.41) and legal (1.65) pages, in portrait.
+_PAGE_ASPECT = (1.2, 1.7)
+# Portrait photos also come from 4:3 phone cameras (1.33) whatever they show,
+# so only ratios clear of that frame, A4 and legal, mark a photo as a page.
+_PHOTO_PAGE_ASPECT = (1.38, 1.7)
+
+# EXIF orientations (5-8) whose stored image is rotated a quarter turn.
+_EXIF_ORIENTATION_TAG = 0x0112
+_EXIF_QUARTER_TURNS = {5, 6, 7, 8}
+
+# Bytes read at each end of a PDF; the page tree and metadata live there.
+_PDF_WINDOW = 64 * 1024
+# Smaller windows for text sniffing, which looks at the document info
+# dictionary, XMP metadata and any uncompressed text near the ends.
+_PDF_TEXT_WINDOW = 8 * 1024
+# Printable PDF string literals, e.g. "(Account Summary) Tj" or "/Title (...)".
+_PDF_STRING = re.compile(rb"\(([\x20-\x27\x2a-\x5b\x5d-\x7e]{3,200})\)")
+_PDF_PAGE_COUNT = re.compile(rb"/Count\s+(\d+)")
+_PDF_MEDIA_BOX = re.compile(
+    rb"/MediaBox\s*\[\s*(-?[\d.]+)\s+(-?[\d.]+)\s+(-?[\d.]+)\s+(-?[\d.]+)\s*\]"
+)
+_BANK_WORDS = re.compile(
+    r"\b(?:statement|account\s+(?:number|summary)|balance|deposits?|withdrawals?|bank)\b"
+)
+_LICENSE_WORDS = re.compile(r"\b(?:driver'?s?\s+licen[cs]e|identification\s+card)\b")
+
+# JPEG start-of-frame markers, which carry the image size.
+_JPEG_SOF_MARKERS = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+class Classification(NamedTuple):
+    """The document kind, whether the evidence is strong, and why."""
+
+    kind: str
+    confident: bool
+    reason: str
+
+
+def _exif_orientation(segment: memoryview) -> Optional[int]:
+    """The Orientation tag of a JPEG APP1 segment body, or None."""
+    if segment[:6] != b"Exif\x00\x00":
+        return None
+    tiff = segment[6:]
+    byteorder = {b"II": "little", b"MM": "big"}.get(bytes(tiff[:2]))
+    if byteorder is None:
+        return None
+    offset = int.from_bytes(tiff[4:8], byteorder)
+    entries = int.from_bytes(tiff[offset : offset + 2], byteorder)
+    for i in range(entries):
+        entry = tiff[offset + 2 + 12 * i : offset + 14 + 12 * i]
+        if len(entry) < 12:
+            break
+        if int.from_bytes(entry[:2], byteorder) == _EXIF_ORIENTATION_TAG:
+            return int.from_bytes(entry[8:10], byteorder)
+    return None
+
+
+def image_size(data: memoryview, mime_type: str) -> Optional[Tuple[int, int]]:
+    """
+    Returns (width, height) read from a JPEG or PNG header, or None.
+
+    For JPEGs the size is as displayed, with the EXIF orientation applied, so
+    a phone photo taken in portrait reports a portrait size.
+    """
+    try:
+        if mime_type == "image/png":
+            return (
+                int.from_bytes(data[16:20], "big"),
+                int.from_bytes(data[20:24], "big"),
+            )
+        if mime_type == "image/jpeg":
+            orientation = None
+            i = 2
+            while i + 9 < len(data):
+                if data[i] != 0xFF:
+                    return None
+                marker = data[i + 1]
+                if marker == 0xFF:  # Fill byte
+                    i += 1
+                    continue
+                if marker in _JPEG_SOF_MARKERS:
+                    width = int.from_bytes(data[i + 7 : i + 9], "big")
+                    height = int.from_bytes(data[i + 5 : i + 7], "big")
+                    if orientation in _EXIF_QUARTER_TURNS:
+                        return height, width
+                    return width, height
+                if marker == 0xDA:  # Start of scan: no frame header found
+                    return None
+                if marker == 0x01 or 0xD0 <= marker <= 0xD8:
+                    i += 2
+                    continue
+                length = int.from_bytes(data[i + 2 : i + 4], "big")
+                if marker == 0xE1 and orientation is None:  # APP1, may hold EXIF
+                    orientation = _exif_orientation(data[i + 4 : i + 2 + length])
+                i += 2 + length
+    except (IndexError, ValueError):
+        pass
+    return None
+
+
+def _pdf_windows(data: memoryview) -> Tuple[memoryview, memoryview]:
+    return data[:_PDF_WINDOW], data[-_PDF_WINDOW:]
+
+
+def pdf_page_count(data: memoryview) -> Optional[int]:
+    """Page count from the page tree's /Count, if it lies in a sniffed window."""
+    counts = [
+        int(match.group(1))
+        for window in _pdf_windows(data)
+        for match in _PDF_PAGE_COUNT.finditer(window)
+    ]
+    return max(counts) if counts else None
+
+
+def pdf_page_size(data: memoryview) -> Optional[Tuple[float, float]]:
+    """(width, height) of the first /MediaBox in the file, in points."""
+    for window in _pdf_windows(data):
+        match = _PDF_MEDIA_BOX.search(window)
+        if match:
+            x0, y0, x1, y1 = (float(value) for value in match.groups())
+            return abs(x1 - x0), abs(y1 - y0)
+    return None
+
+
+def pdf_text_sample(data: memoryview) -> str:
+    """Lower-cased printable string literals found near both ends of a PDF."""
+    strings = [
+        match.group(1).decode("ascii").lower()
+        for window in (data[:_PDF_TEXT_WINDOW], data[-_PDF_TEXT_WINDOW:])
+        for match in _PDF_STRING.finditer(window)
+    ]
+    return " ".join(strings)
+
+
+def _aspect(size: Optional[Tuple[float, float]]) -> Optional[float]:
+    """Long side over short side, so rotated scans give the same ratio."""
+    if not size or not min(size):
+        return None
+    return max(size) / min(size)
+
+
+def _within(value: Optional[float], bounds: Tuple[float, float]) -> bool:
+    return value is not None and bounds[0] <= value <= bounds[1]
+
+
+def classify_document(data: memoryview, mime_type: str) -> Classification:
+    """
+    Classifies an upload as a driver's license or a bank statement.
+
+    Photos default to driver's license and PDFs to bank statement, as before;
+    `confident` is only set when a header signal backs the decision. A
+    landscape card-shaped photo is a license and a portrait A4 or legal-shaped
+    photo is a statement. Other photos, e.g. a 4:3 portrait phone photo, are
+    left unconfident so the tool the user chose decides.
+    """
+    if mime_type != "application/pdf":
+        size = image_size(data, mime_type)
+        aspect = _aspect(size)
+        if size and size[0] > size[1] and _within(aspect, _ID_CARD_ASPECT):
+            return Classification(
+                DRIVERS_LICENSE,
+                True,
+                f"landscape image with an ID card aspect ratio ({aspect:.2f})",
+            )
+        if size and size[1] > size[0] and _within(aspect, _PHOTO_PAGE_ASPECT):
+            return Classification(
+                BANK_STATEMENT,
+                True,
+                f"portrait image with a document page aspect ratio ({aspect:.2f})",
+            )
+        return Classification(DRIVERS_LICENSE, False, "image upload")
+
+    text = pdf_text_sample(data)
+    if _LICENSE_WORDS.search(text):
+        return Classification(DRIVERS_LICENSE, True, "PDF text mentions a license")
+    pages = pdf_page_count(data)
+    aspect = _aspect(pdf_page_size(data))
+    if pages == 1 and _within(aspect, _PDF_ID_CARD_ASPECT):
+        return Classification(
+            DRIVERS_LICENSE, True, f"single PDF page with an ID card aspect ratio ({aspect:.2f})"
+        )
+    if pages is not None and pages > 1:
+        return Classification(BANK_STATEMENT, True, f"PDF has {pages} pages")
+    if _BANK_WORDS.search(text):
+        return Classification(BANK_STATEMENT, True, "PDF text mentions a bank statement")
+    if _within(aspect, _PAGE_ASPECT):
+        return Classification(
+            BANK_STATEMENT, True, f"PDF page has a document page size ({aspect:.2f})"
+        )
+    return Classification(BANK_STATEMENT, False, "PDF upload")
+
+
+def mismatch_error(data: memoryview, mime_type: str, expected_kind: str) -> Optional[str]:
+    """
+    Returns an error message when the upload is confidently not `expected_kind`,
+    so a tool can reject it before calling Document AI. None otherwise.
+    """
+    classification = classify_document(data, mime_type)
+    if classification.kind == expected_kind or not classification.confident:
+        return None
+    readable = _READABLE_KINDS[classification.kind]
+    expected = _READABLE_KINDS[expected_kind]
+    return (
+        f"The uploaded document looks like a {readable}, not a {expected} "
+        f"({classification.reason}). Please upload a {expected}."
+    )
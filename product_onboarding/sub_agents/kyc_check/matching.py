@@ -0,0 +1,227 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Deterministic name and address matching for KYC documents.
+
+Values are normalized (case, punctuation, postal abbreviations, unit numbers,
+token order) and then scored with hashed character-trigram cosine similarity
+plus token overlap. `match_pairs` scores any number of pairs in one vectorized
+call, so the live tool and offline re-verification jobs share the same rules.
+"""
+
+import os
+import re
+import unicodedata
+from typing import Dict, List, Optional, Sequence, Set
+
+import numpy as np
+
+KYC_NAME_MATCH_THRESHOLD = float(os.getenv("KYC_NAME_MATCH_THRESHOLD", "0.85"))
+KYC_ADDRESS_MATCH_THRESHOLD = float(os.getenv("KYC_ADDRESS_MATCH_THRESHOLD", "0.8"))
+
+_TRIGRAM_DIM = 1024
+# Rows scored per block, bounding the trigram matrices to a few MB.
+_BATCH_ROWS = 4096
+
+_NAME_STOPWORDS = {"mr", "mrs", "ms", "miss", "dr", "jr", "sr", "ii", "iii", "iv"}
+
+# USPS Publication 28 suffixes and directionals most often seen on IDs.
+_ADDRESS_ABBREVIATIONS = {
+    "street": "st", "str": "st", "avenue": "ave", "av": "ave", "road": "rd",
+    "drive": "dr", "boulevard": "blvd", "lane": "ln", "court": "ct",
+    "place": "pl", "terrace": "ter", "circle": "cir", "highway": "hwy",
+    "parkway": "pkwy", "square": "sq", "trail": "trl", "way": "way",
+    "north": "n", "south": "s", "east": "e", "west": "w",
+    "northeast": "ne", "northwest": "nw", "southeast": "se", "southwest": "sw",
+    "mount": "mt", "fort": "ft", "saint": "st",
+}
+
+_STATE_ABBREVIATIONS = {
+    "alabama": "al", "alaska": "ak", "arizona": "az", "arkansas": "ar",
+    "california": "ca", "colorado": "co", "connecticut": "ct", "delaware": "de",
+    "florida": "fl", "georgia": "ga", "hawaii": "hi", "idaho": "id",
+    "illinois": "il", "indiana": "in", "iowa": "ia", "kansas": "ks",
+    "kentucky": "ky", "louisiana": "la", "maine": "me", "maryland": "md",
+    "massachusetts": "ma", "michigan": "mi", "minnesota": "mn",
+    "mississippi": "ms", "missouri": "mo", "montana": "mt", "nebraska": "ne",
+    "nevada": "nv", "new hampshire": "nh", "new jersey": "nj",
+    "new mexico": "nm", "new york": "ny", "north carolina": "nc",
+    "north dakota": "nd", "ohio": "oh", "oklahoma": "ok", "oregon": "or",
+    "pennsylvania": "pa", "rhode island": "ri", "south carolina": "sc",
+    "south dakota": "sd", "tennessee": "tn", "texas": "tx", "utah": "ut",
+    "vermont": "vt", "virginia": "va", "washington": "wa",
+    "west virginia": "wv", "wisconsin": "wi", "wyoming": "wy",
+    "district of columbia": "dc",
+}
+_STATE_NAMES = re.compile(
+    r"\b(" + "|".join(sorted(_STATE_ABBREVIATIONS, key=len, reverse=True)) + r")\b"
+)
+
+# "Apt 4B", "Suite 200", "Unit 3", "# 12" all become "unit 4b" and so on.
+_UNIT = re.compile(
+    r"(?:\b(?:apartment|apt|suite|ste|unit|room|rm|floor|bldg|building)\b\.?|#)"
+    r"\s*#?\s*([a-z0-9-]+)"
+)
+_ZIP_PLUS_FOUR = re.compile(r"\b(\d{5})-\d{4}\b")
+
+
+def _fold(text: Optional[str]) -> str:
+    """Lower-cases and strips accents, leaving plain ASCII."""
+    text = unicodedata.normalize("NFKD", text or "")
+    return text.encode("ascii", "ignore").decode().casefold()
+
+
+def normalize_name(name: Optional[str]) -> str:
+    """
+    Canonical form of a person's name: lower case, no punctuation, titles,
+    suffixes or initials, tokens sorted so "SAMPLE, BRENDA A" equals
+    "Brenda Sample".
+    """
+    tokens = re.findall(r"[a-z]+", _fold(name).replace("'", ""))
+    return " ".join(
+        sorted(t for t in tokens if len(t) > 1 and t not in _NAME_STOPWORDS)
+    )
+
+
+def normalize_address(address: Optional[str]) -> str:
+    """
+    Canonical form of a postal address: lower case, USPS abbreviations, state
+    codes, "unit <n>" for apartment and suite numbers, and 5-digit ZIP codes.
+    """
+    text = _fold(address)
+    text = _ZIP_PLUS_FOUR.sub(r"\1", text)
+    text = _UNIT.sub(r" unit \1 ", text)
+    text = re.sub(r"[^a-z0-9 ]+", " ", text)
+    text = _STATE_NAMES.sub(lambda m: _STATE_ABBREVIATIONS[m.group(1)], text)
+    return " ".join(_ADDRESS_ABBREVIATIONS.get(t, t) for t in text.split())
+
+
+def _trigram_matrix(texts: Sequence[str]) -> np.ndarray:
+    """
+    Hashes each text's character trigrams into an L2-normalized row vector.
+
+    The hashing runs on a padded byte matrix in numpy instead of one Python
+    call per trigram.
+    """
+    padded = [f"  {text} ".encode() for text in texts]
+    lengths = np.array([len(p) for p in padded])
+    width = max(3, int(lengths.max()) if len(padded) else 3)
+    buffer = np.frombuffer(
+        b"".join(p.ljust(width, b"\0") for p in padded), dtype=np.uint8
+    ).reshape(len(padded), width).astype(np.uint32)
+
+    codes = (buffer[:, :-2] << 16) | (buffer[:, 1:-1] << 8) | buffer[:, 2:]
+    buckets = ((codes * np.uint32(2654435761)) >> np.uint32(16)) % _TRIGRAM_DIM
+    valid = np.arange(width - 2)[None, :] < (lengths - 2)[:, None]
+    rows = np.broadcast_to(np.arange(len(padded))[:, None], codes.shape)
+
+    flat = (rows[valid] * _TRIGRAM_DIM + buckets[valid]).astype(np.int64)
+    matrix = np.bincount(flat, minlength=len(padded) * _TRIGRAM_DIM)
+    matrix = matrix.reshape(len(padded), _TRIGRAM_DIM).astype(np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def _pairwise_cosine(left: Sequence[str], right: Sequence[str]) -> np.ndarray:
+    """Trigram cosine similarity of left[i] and right[i] for every i."""
+    scores = np.empty(len(left), dtype=np.float32)
+    for start in range(0, len(left), _BATCH_ROWS):
+        stop = start + _BATCH_ROWS
+        scores[start:stop] = np.einsum(
+            "ij,ij->i",
+            _trigram_matrix(left[start:stop]),
+            _trigram_matrix(right[start:stop]),
+        )
+    return scores
+
+
+def _token_overlap(left: Sequence[str], right: Sequence[str]) -> np.ndarray:
+    """Share of the shorter value's tokens found in the other value."""
+    overlap = []
+    for a, b in zip(left, right):
+        tokens_a, tokens_b = set(a.split()), set(b.split())
+        overlap.append(
+            len(tokens_a & tokens_b) / max(1, min(len(tokens_a), len(tokens_b)))
+        )
+    return np.array(overlap, dtype=np.float32)
+
+
+def _numbers(address: str) -> Set[str]:
+    """House, unit and ZIP numbers; these must agree exactly."""
+    return set(re.findall(r"\b\d+[a-z]?\b", address))
+
+
+def _conflicting_numbers(left: Sequence[str], right: Sequence[str]) -> np.ndarray:
+    """
+    True where the addresses disagree on a number that both contain: a missing
+    unit number on one document is fine, a different house number is not.
+    """
+    conflicts = []
+    for a, b in zip(left, right):
+        numbers_a, numbers_b = _numbers(a), _numbers(b)
+        conflicts.append(
+            bool(numbers_a and numbers_b)
+            and not (numbers_a <= numbers_b or numbers_b <= numbers_a)
+        )
+    return np.array(conflicts, dtype=bool)
+
+
+def _similarity(left: List[str], right: List[str]) -> np.ndarray:
+    """Mean of trigram cosine and token overlap; NaN where a value is empty."""
+    scores = 0.5 * _pairwise_cosine(left, right) + 0.5 * _token_overlap(left, right)
+    missing = np.array([not a or not b for a, b in zip(left, right)], dtype=bool)
+    scores[missing] = np.nan
+    return scores
+
+
+def name_scores(left: Sequence[Optional[str]], right: Sequence[Optional[str]]) -> np.ndarray:
+    """Similarity in [0, 1] of each pair of names; NaN if either is missing."""
+    return _similarity(
+        [normalize_name(n) for n in left], [normalize_name(n) for n in right]
+    )
+
+
+def address_scores(
+    left: Sequence[Optional[str]], right: Sequence[Optional[str]]
+) -> np.ndarray:
+    """Similarity in [0, 1] of each pair of addresses; NaN if either is missing."""
+    left_norm = [normalize_address(a) for a in left]
+    right_norm = [normalize_address(a) for a in right]
+    scores = _similarity(left_norm, right_norm)
+    scores[_conflicting_numbers(left_norm, right_norm)] = 0.0
+    return scores
+
+
+def match_pairs(
+    left_names: Sequence[Optional[str]],
+    right_names: Sequence[Optional[str]],
+    left_addresses: Sequence[Optional[str]],
+    right_addresses: Sequence[Optional[str]],
+) -> Dict[str, np.ndarray]:
+    """
+    Scores any number of (license, statement) identities in one call.
+
+    Returns arrays aligned with the inputs: "name_score" and "address_score"
+    (NaN when a value is missing) and the boolean "names_match" and
+    "addresses_match" decisions against the configured thresholds.
+    """
+    names = name_scores(left_names, right_names)
+    addresses = address_scores(left_addresses, right_addresses)
+    with np.errstate(invalid="ignore"):
+        return {
+            "name_score": names,
+            "address_score": addresses,
+            "names_match": names >= KYC_NAME_MATCH_THRESHOLD,
+            "addresses_match": addresses >= KYC_ADDRESS_MATCH_THRESHOLD,
+        }
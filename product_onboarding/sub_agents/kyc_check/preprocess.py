@@ -0,0 +1,88 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Image normalization for KYC uploads before they are sent to Document AI.
+
+Phone photos are far larger than the extraction processors need. Large or
+rotated images are decoded with JPEG draft mode, rotated upright from their
+EXIF orientation, downscaled, and re-encoded as a metadata-free JPEG. Small
+upright images pass through untouched and uncopied.
+"""
+
+import logging
+import os
+from io import BytesIO
+from typing import Tuple, Union
+
+import PIL.Image
+import PIL.ImageOps
+
+# Longest side sent to Document AI. An ID card scanned at 300 DPI is about
+# 1000 x 640 pixels, so this keeps every printed character legible.
+KYC_IMAGE_MAX_SIDE = int(os.getenv("KYC_IMAGE_MAX_SIDE", "1600"))
+KYC_IMAGE_QUALITY = int(os.getenv("KYC_IMAGE_QUALITY", "85"))
+# Images smaller than this, upright and within KYC_IMAGE_MAX_SIDE, are sent as-is.
+KYC_IMAGE_MIN_BYTES = int(os.getenv("KYC_IMAGE_MIN_BYTES", str(512 * 1024)))
+
+_EXIF_ORIENTATION = 0x0112
+
+Buffer = Union[bytes, memoryview]
+
+
+def normalize_image(data: Buffer, mime_type: str) -> Tuple[Buffer, str]:
+    """
+    Returns the image ready for upload and its mime type.
+
+    PDFs, small upright images and anything Pillow cannot read are returned
+    unchanged. Otherwise the result is an upright JPEG no larger than
+    KYC_IMAGE_MAX_SIDE on its longest side, without EXIF or other metadata.
+    """
+    if mime_type not in ("image/jpeg", "image/png"):
+        return data, mime_type
+    try:
+        with PIL.Image.open(BytesIO(data)) as image:
+            orientation = image.getexif().get(_EXIF_ORIENTATION, 1)
+            if (
+                len(data) < KYC_IMAGE_MIN_BYTES
+                and max(image.size) <= KYC_IMAGE_MAX_SIDE
+                and orientation == 1
+            ):
+                return data, mime_type
+
+            original_size = image.size
+            if image.format == "JPEG":
+                # Let the decoder downscale by 1/2, 1/4 or 1/8 while it decodes,
+                # never below the target size.
+                image.draft("RGB", (KYC_IMAGE_MAX_SIDE, KYC_IMAGE_MAX_SIDE))
+            upright = PIL.ImageOps.exif_transpose(image)
+            upright.thumbnail(
+                (KYC_IMAGE_MAX_SIDE, KYC_IMAGE_MAX_SIDE), PIL.Image.Resampling.LANCZOS
+            )
+            if upright.mode != "RGB":
+                upright = upright.convert("RGB")
+
+            output = BytesIO()
+            upright.save(output, format="JPEG", quality=KYC_IMAGE_QUALITY)
+    except (OSError, ValueError, PIL.Image.DecompressionBombError) as e:
+        logging.warning(f"Could not normalize {mime_type} image, sending it as-is: {e}")
+        return data, mime_type
+
+    normalized = output.getvalue()
+    if len(normalized) >= len(data) and orientation == 1:
+        return data, mime_type
+    logging.info(
+        f"Normalized {mime_type} image from {original_size} / {len(data)} bytes "
+        f"to {upright.size} / {len(normalized)} bytes"
+    )
+    return normalized, "image/jpeg"
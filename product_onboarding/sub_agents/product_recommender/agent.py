@@ -13,11 +13,12 @@
 # limitations under the License.
 
 """Validate Business agent. Finds and verifies a business using name and location"""
+import asyncio
 import base64
 import logging
 import os
 from io import BytesIO
-from typing import Optional
+from typing import AsyncIterator, Optional, Tuple
 
 import PIL.Image
 from google.adk.agents import Agent
@@ -25,17 +26,28 @@ from google.adk.tools import ToolContext
 from google.adk.tools.agent_tool import AgentTool
 from google.genai import Client, types
 
-from product_onboarding.sub_agents.product_recommender import prompt, vaisearch
+from product_onboarding.sub_agents.product_recommender import (
+    catalog,
+    kb_index,
+    prompt,
+    semantic_cache,
+    vaisearch,
+)
 from product_onboarding.tools.salesforce import (
     get_opportunity_details,
     update_opportunity_stage,
     update_opportunity_with_comment,
 )
 from product_onboarding.tools.search import google_search_grounding
+from product_onboarding.tools.streaming import StreamingFunctionTool
 
 # Only Vertex AI supports image generation for now.
 client = Client()
 
+# Knowledge base answers for near-duplicate questions. Bump
+# KB_CATALOG_VERSION when the knowledge base documents change.
+_answer_cache = semantic_cache.SemanticCache()
+
 
 def _load_image_from_user_content(
     tool_context: "ToolContext",
@@ -192,7 +204,8 @@ def identify_pos_model(prompt: str, tool_context: "ToolContext"):
     return response.text
 
 
-def knowledgebase_search_agent(query: str, tool_context: "ToolContext"):
+def _knowledgebase_config() -> Tuple[Optional[Tuple[str, str, str]], Optional[dict]]:
+    """Returns ((project_id, location, engine_id), None), or (None, error response)."""
     # get the GOOGLE_CLOUD_PROJECT from .env
     project_id = os.getenv("GOOGLE_CLOUD_PROJECT")
     location = os.getenv("VERTEX_AI_SEARCH_LOCATION")
@@ -200,7 +213,7 @@ def knowledgebase_search_agent(query: str, tool_context: "ToolContext"):
 
     if not project_id:
         logging.error("Error: GOOGLE_CLOUD_PROJECT environment variable not set.")
-        return {
+        return None, {
             "answerText": (
                 "Configuration error: The GOOGLE_CLOUD_PROJECT environment variable is"
                 " not set. Please configure it to proceed with knowledgebase search."
@@ -209,7 +222,7 @@ def knowledgebase_search_agent(query: str, tool_context: "ToolContext"):
         }
     if not location:
         logging.error("Error: VERTEX_AI_SEARCH_LOCATION environment variable not set.")
-        return {
+        return None, {
             "answerText": (
                 "Configuration error: The VERTEX_AI_SEARCH_LOCATION environment"
                 " variable is not set. Please configure it to proceed with"
@@ -219,7 +232,7 @@ def knowledgebase_search_agent(query: str, tool_context: "ToolContext"):
         }
     if not engine_id:
         logging.error("Error: VERTEX_AI_SEARCH_ENGINE_ID environment variable not set.")
-        return {
+        return None, {
             "answerText": (
                 "Configuration error: The VERTEX_AI_SEARCH_ENGINE_ID environment"
                 " variable is not set. Please configure it to proceed with"
@@ -228,14 +241,11 @@ def knowledgebase_search_agent(query: str, tool_context: "ToolContext"):
             "references": [],
         }
 
-    # vaisearch.vertex_ai_search now returns a dictionary like:
-    # {
-    #     "answerText": str,
-    #     "references": list[{"uri": str, "title": str}],
-    #     "blobAttachments": list[{"data": {"mimeType": str, "data": str}}] # data is base64
-    # }
-    api_response = vaisearch.vertex_ai_search(project_id, location, engine_id, query)
+    return (project_id, location, engine_id), None
 
+
+def _save_search_result_images(api_response: dict, query: str, tool_context: "ToolContext"):
+    """Saves blob attachments of a search response as artifacts."""
     if (
         api_response
         and "blobAttachments" in api_response
@@ -306,11 +316,130 @@ def knowledgebase_search_agent(query: str, tool_context: "ToolContext"):
                     f"No mimeType found in blobAttachment at index {index} for query '{query}'"
                 )
 
+
+def _cached_answer(query: str) -> Optional[dict]:
+    """Returns the cached answer to a near-duplicate question, if any."""
+    _answer_cache.check_version(os.getenv("KB_CATALOG_VERSION", ""))
+    try:
+        cached = _answer_cache.get(query)
+    except Exception as e:
+        logging.warning(f"Semantic cache lookup failed for query '{query}': {e}")
+        return None
+    return dict(cached) if cached is not None else None
+
+
+def _cache_answer(query: str, answer: dict) -> None:
+    """Caches a grounded answer; answers without references are not reused."""
+    if not answer.get("answerText") or not answer.get("references"):
+        return
+    try:
+        _answer_cache.set(query, answer)
+    except Exception as e:
+        logging.warning(f"Could not cache answer for query '{query}': {e}")
+
+
+def _local_answer(query: str, fallback: bool = False) -> Optional[dict]:
+    """
+    Answers from the local knowledge base index, if one is configured.
+
+    Only answers whose best passage covers the query are returned, unless
+    this is the fallback for a failed Vertex AI Search call, in which case any
+    match is returned and marked as degraded.
+    """
+    index = kb_index.get_index()
+    if index is None:
+        return None
+    try:
+        answer = index.answer(query)
+    except Exception as e:
+        logging.warning(f"Local knowledge base search failed for query '{query}': {e}")
+        return None
+    if answer is None:
+        return None
+    coverage = answer.pop("coverage")
+    if fallback:
+        answer["degraded"] = True
+    elif coverage < kb_index.KB_INDEX_MIN_COVERAGE:
+        return None
+    return answer
+
+
+def get_semantic_cache_stats() -> dict:
+    """Returns hit/miss counters for the knowledge base answer cache."""
+    return _answer_cache.stats()
+
+
+def knowledgebase_search_agent(query: str, tool_context: "ToolContext"):
+    config, error = _knowledgebase_config()
+    if error:
+        return error
+    # The local index first: a semantic cache lookup embeds the query remotely.
+    cached = _local_answer(query) or _cached_answer(query)
+    if cached is not None:
+        return cached
+
+    # vaisearch.vertex_ai_search now returns a dictionary like:
+    # {
+    #     "answerText": str,
+    #     "references": list[{"uri": str, "title": str}],
+    #     "blobAttachments": list[{"data": {"mimeType": str, "data": str}}] # data is base64
+    # }
+    try:
+        api_response = vaisearch.vertex_ai_search(*config, query)
+    except Exception as e:
+        local = _local_answer(query, fallback=True)
+        if local is None:
+            raise
+        logging.error(f"Vertex AI Search failed, answering from the local index: {e}")
+        return local
+    _save_search_result_images(api_response, query, tool_context)
+
     # Return only answerText and references as per feedback
-    return {
+    answer = {
         "answerText": api_response.get("answerText"),
         "references": api_response.get("references", []),  # Default to empty list
     }
+    _cache_answer(query, answer)
+    return answer
+
+
+async def knowledgebase_search_stream(
+    query: str, tool_context: "ToolContext"
+) -> AsyncIterator[dict]:
+    """
+    Answers technical questions about the POS systems from the knowledge base.
+
+    Yields {"answerTextChunk": ...} pieces of the answer as they are generated,
+    then {"answerText": ..., "references": [...]} with the complete answer.
+    """
+    config, error = _knowledgebase_config()
+    if error:
+        yield error
+        return
+    cached = await asyncio.to_thread(
+        lambda: _local_answer(query) or _cached_answer(query)
+    )
+    if cached is not None:
+        yield cached
+        return
+
+    try:
+        async for item in vaisearch.stream_vertex_ai_search(*config, query):
+            if "answerTextChunk" in item:
+                yield item
+                continue
+            # References and images are only final once generation ends.
+            _save_search_result_images(item, query, tool_context)
+            answer = {
+                "answerText": item.get("answerText"),
+                "references": item.get("references", []),
+            }
+            await asyncio.to_thread(_cache_answer, query, answer)
+            yield answer
+    except Exception as e:
+        logging.error(f"Error streaming knowledge base answer for query '{query}': {e}")
+        local = _local_answer(query, fallback=True)
+        yield local or {"error": f"Error searching the knowledge base: {e}"}
 
 
 def after_agent_callback(callback_context: ToolContext):
@@ -359,7 +488,12 @@ product_recommender_agent = Agent(
     description="A agent who recommends a POS solution based on the needs of the business owner",
     instruction=prompt.PRODUCT_RECOMENDER_AGENT_INSTR,
     tools=[
-        knowledgebase_search_agent,
+        catalog.recommend_terminals,
+        # Streams the answer to live sessions as it is generated; regular runs
+        # get the complete answer from knowledgebase_search_agent.
+        StreamingFunctionTool(
+            knowledgebase_search_stream, fallback=knowledgebase_search_agent
+        ),
         AgentTool(agent=search_agent),
         identify_pos_model,
         image_editor,
@@ -0,0 +1,452 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""POS terminal catalog and a deterministic recommendation scorer.
+
+The catalog used to be a Markdown table in the recommender prompt, which the
+model re-read and ranked on every turn. Here each terminal is typed data and
+`recommend_terminals` scores the whole catalog against a business profile,
+so the same profile always gets the same two terminals and reasons.
+"""
+
+import os
+import re
+from typing import Any, Dict, FrozenSet, List, NamedTuple, Optional
+
+AGENT_COMPANY_NAME = os.getenv("AGENT_COMPANY_NAME", "ACME Corp")
+
+# Business segments a terminal targets.
+RETAIL = "retail"
+FULL_SERVICE_RESTAURANT = "full_service_restaurant"
+QUICK_SERVICE_RESTAURANT = "quick_service_restaurant"
+SERVICES = "services"
+MOBILE = "mobile"
+REMOTE = "remote"
+
+_READABLE_SEGMENTS = {
+    RETAIL: "retail",
+    FULL_SERVICE_RESTAURANT: "full-service restaurants",
+    QUICK_SERVICE_RESTAURANT: "quick-service restaurants",
+    SERVICES: "service businesses",
+    MOBILE: "mobile businesses",
+    REMOTE: "remote payments",
+}
+
+# Feature support levels.
+NONE = 0
+BASIC = 1
+FULL = 2
+
+FEATURES = (
+    "inventory",
+    "order_management",
+    "table_management",
+    "tableside_ordering",
+    "loyalty",
+    "employee_management",
+    "reporting",
+    "online_ordering",
+    "appointments",
+    "invoicing",
+    "recurring_payments",
+    "cash_drawer",
+    "receipt_printer",
+    "barcode_scanner",
+)
+
+VOLUMES = ("low", "medium", "high")
+
+# Score weights. Each profile signal adds or removes points; ties keep
+# catalog order.
+_SEGMENT_MATCH = 3
+_VOLUME_MATCH = 2
+_MOBILITY_MATCH = 3
+_MOBILITY_MISMATCH = -3
+_REMOTE_MATCH = 3
+_FEATURE_POINTS = {FULL: 2, BASIC: 1, NONE: -2}
+
+
+def _words(*alternatives: str) -> "re.Pattern[str]":
+    """Matches any of the alternatives as whole words."""
+    return re.compile(r"\b(?:" + "|".join(alternatives) + r")\b")
+
+
+# Keywords mapping a free-text business type to segments, checked in order;
+# the first group that matches wins. A plain "restaurant" is taken to be full
+# service, after the quick-service kinds (coffee, pizza, fast food) had their
+# chance to match.
+_SEGMENT_KEYWORDS = (
+    (
+        _words(
+            r"full[- ]service", "fine dining", "table service", r"sit[- ]down",
+            "bistros?", "steakhouses?",
+        ),
+        {FULL_SERVICE_RESTAURANT},
+    ),
+    # Before services, whose "service" would otherwise match "quick-service".
+    (
+        _words(r"quick[- ]service", r"counter[- ]service", r"fast[- ]food"),
+        {QUICK_SERVICE_RESTAURANT},
+    ),
+    (
+        _words(
+            "trucks?", "carts?", "farmers", "market stalls?", r"pop[- ]ups?", "mobile",
+            "delivery", "catering", "caterers?", "vendors?",
+        ),
+        {MOBILE},
+    ),
+    (
+        _words(
+            "online", r"e-?commerce", "invoic(?:e|es|ing)", "consult(?:ing|ants?|ancy)?",
+            "subscriptions?", "remote", "phone orders?",
+        ),
+        {REMOTE},
+    ),
+    (
+        _words(
+            "salons?", "spas?", "barbers?", "barbershops?", "clinics?", "repairs?",
+            "plumb(?:er|ers|ing)", "electricians?", "cleaning", "cleaners?", "fitness",
+            "gyms?", "studios?", "tutor(?:s|ing)?", "dental", "dentists?", "vets?",
+            "veterinary", "veterinarians?", "services?",
+        ),
+        {SERVICES},
+    ),
+    (
+        _words(
+            "coffee", "cafes?", "cafés?", "bakery", "bakeries", "pizza", "pizzerias?",
+            "juice", "delis?", "ice cream", "bars?", "pubs?", "brewery", "breweries",
+        ),
+        {QUICK_SERVICE_RESTAURANT},
+    ),
+    (
+        _words("restaurants?", "diners?", "eatery", "eateries", "trattorias?", "tapas"),
+        {FULL_SERVICE_RESTAURANT},
+    ),
+    (
+        _words(
+            "retail", "shops?", "stores?", "boutiques?", "grocery", "groceries",
+            "pharmacy", "pharmacies", "florists?", "gift shops?", "bookstores?",
+            "bookshops?",
+        ),
+        {RETAIL},
+    ),
+)
+
+# Words in the current POS model that say whether it is used at a counter.
+_STATIONARY_POS = _words(
+    "registers?", "stands?", "stations?", "countertop", "counter", "desktop", "kiosks?"
+)
+_MOBILE_POS = _words("readers?", "handheld", "mobile", "portable", "phone", "tablet")
+
+
+class Terminal(NamedTuple):
+    """One POS product and what it supports."""
+
+    name: str
+    segments: FrozenSet[str]
+    volumes: FrozenSet[str]
+    mobile: bool
+    remote: bool
+    mode: str
+    hardware: str
+    payments: str
+    features: Dict[str, int]
+    # Other names customers use for the product, besides its short name.
+    aliases: FrozenSet[str] = frozenset()
+
+    @property
+    def short_name(self) -> str:
+        """The name without the company prefix, e.g. "Station Duo"."""
+        return self.name[len(AGENT_COMPANY_NAME) :].strip()
+
+
+def _features(**levels: int) -> Dict[str, int]:
+    unknown = set(levels) - set(FEATURES)
+    if unknown:
+        raise ValueError(f"Unknown features: {sorted(unknown)}")
+    return {feature: levels.get(feature, NONE) for feature in FEATURES}
+
+
+_ALL_VOLUMES = frozenset(VOLUMES)
+
+CATALOG = (
+    Terminal(
+        name=f"{AGENT_COMPANY_NAME} Station Duo",
+        segments=frozenset({RETAIL, FULL_SERVICE_RESTAURANT}),
+        volumes=frozenset({"high"}),
+        mobile=False,
+        remote=False,
+        mode="Stationary, counter service",
+        hardware="Dual screens, high-speed printer, cash drawer",
+        payments="Robust processing, various payment types",
+        features=_features(
+            inventory=FULL, order_management=FULL, table_management=FULL,
+            loyalty=FULL, employee_management=FULL, reporting=FULL,
+            online_ordering=FULL, cash_drawer=FULL, receipt_printer=FULL,
+        ),
+        aliases=frozenset({"duo"}),
+    ),
+    Terminal(
+        name=f"{AGENT_COMPANY_NAME} Station Solo",
+        segments=frozenset({RETAIL, QUICK_SERVICE_RESTAURANT}),
+        volumes=_ALL_VOLUMES,
+        mobile=False,
+        remote=False,
+        mode="Stationary, counter service",
+        hardware="Large merchant screen, receipt printer, cash drawer option",
+        payments="Strong processing, various payment types",
+        features=_features(
+            inventory=FULL, order_management=FULL, loyalty=FULL,
+            employee_management=FULL, reporting=FULL, online_ordering=FULL,
+            cash_drawer=FULL, receipt_printer=FULL,
+        ),
+        aliases=frozenset({"solo"}),
+    ),
+    Terminal(
+        name=f"{AGENT_COMPANY_NAME} Mini",
+        segments=frozenset({RETAIL, QUICK_SERVICE_RESTAURANT, SERVICES}),
+        volumes=_ALL_VOLUMES,
+        mobile=False,
+        remote=False,
+        mode="Stationary, compact countertop",
+        hardware="Compact design, touchscreen, built-in printer",
+        payments="Accepts various payment types",
+        features=_features(
+            inventory=FULL, order_management=FULL, loyalty=FULL,
+            employee_management=FULL, reporting=FULL, online_ordering=FULL,
+            appointments=FULL, receipt_printer=FULL,
+        ),
+    ),
+    Terminal(
+        name=f"{AGENT_COMPANY_NAME} Flex",
+        segments=frozenset({MOBILE, FULL_SERVICE_RESTAURANT, SERVICES}),
+        volumes=_ALL_VOLUMES,
+        mobile=True,
+        remote=False,
+        mode="Mobile, handheld",
+        hardware="Portable touchscreen, built-in printer, barcode scanner, long battery",
+        payments="Accepts various payment types",
+        features=_features(
+            inventory=FULL, order_management=FULL, tableside_ordering=FULL,
+            loyalty=FULL, employee_management=FULL, reporting=FULL,
+            online_ordering=FULL, appointments=FULL, receipt_printer=FULL,
+            barcode_scanner=FULL,
+        ),
+    ),
+    Terminal(
+        name=f"{AGENT_COMPANY_NAME} Go",
+        segments=frozenset({MOBILE, SERVICES}),
+        volumes=frozenset({"low"}),
+        mobile=True,
+        remote=False,
+        mode="Mobile, connects to a smartphone or tablet",
+        hardware="Mobile card reader",
+        payments="Accepts swipe, dip and tap payments",
+        features=_features(
+            inventory=BASIC, order_management=BASIC, loyalty=BASIC,
+            employee_management=BASIC, reporting=FULL,
+        ),
+    ),
+    Terminal(
+        name=f"{AGENT_COMPANY_NAME} Virtual Terminal",
+        segments=frozenset({REMOTE, SERVICES}),
+        volumes=_ALL_VOLUMES,
+        mobile=False,
+        remote=True,
+        mode="Software only, web-based",
+        hardware="None (software only)",
+        payments="Accepts payments by phone or online",
+        features=_features(
+            loyalty=BASIC, employee_management=BASIC, reporting=FULL,
+            invoicing=FULL, recurring_payments=FULL,
+        ),
+        aliases=frozenset({"virtual"}),
+    ),
+)
+
+
+_PRODUCT_NAMES = {
+    name.casefold(): terminal.short_name
+    for terminal in CATALOG
+    for name in (terminal.short_name, *terminal.aliases)
+}
+# Longest names first so "virtual terminal" wins over "virtual".
+_PRODUCT_NAME_PATTERN = re.compile(
+    r"\b("
+    + "|".join(sorted((re.escape(n) for n in _PRODUCT_NAMES), key=len, reverse=True))
+    + r")\b",
+    re.IGNORECASE,
+)
+
+
+def product_names(text: Optional[str]) -> FrozenSet[str]:
+    """Short names of the catalog products mentioned in `text`."""
+    return frozenset(
+        _PRODUCT_NAMES[match.casefold()]
+        for match in _PRODUCT_NAME_PATTERN.findall(text or "")
+    )
+
+
+def pos_is_mobile(current_pos: Optional[str]) -> Optional[bool]:
+    """Whether the current POS, e.g. "Square Register", is mobile; None if unclear."""
+    text = (current_pos or "").lower()
+    mobile = bool(_MOBILE_POS.search(text))
+    if mobile == bool(_STATIONARY_POS.search(text)):
+        return None
+    return mobile
+
+
+def business_segments(business_type: Optional[str]) -> FrozenSet[str]:
+    """Segments implied by a free-text business type, e.g. "coffee shop"."""
+    text = (business_type or "").lower()
+    for pattern, segments in _SEGMENT_KEYWORDS:
+        if pattern.search(text):
+            return frozenset(segments)
+    return frozenset()
+
+
+def _readable(feature: str) -> str:
+    return feature.replace("_", " ")
+
+
+def score_terminal(
+    terminal: Terminal,
+    segments: FrozenSet[str],
+    volume: Optional[str],
+    mobile: Optional[bool],
+    remote_payments: Optional[bool],
+    needs: List[str],
+) -> Dict[str, Any]:
+    """Scores one terminal; returns the score, reasons and unmet needs."""
+    score = 0
+    reasons: List[str] = []
+    gaps: List[str] = []
+
+    for segment in sorted(segments & terminal.segments):
+        score += _SEGMENT_MATCH
+        reasons.append(f"Built for {_READABLE_SEGMENTS[segment]}")
+    if volume in VOLUMES and terminal.volumes != _ALL_VOLUMES:
+        if volume in terminal.volumes:
+            score += _VOLUME_MATCH
+            reasons.append(f"Suited to {volume} transaction volume")
+        else:
+            score -= _VOLUME_MATCH
+            gaps.append(f"Not designed for {volume} transaction volume")
+    if mobile is not None and not terminal.remote:
+        if mobile == terminal.mobile:
+            score += _MOBILITY_MATCH
+            reasons.append(terminal.mode)
+        else:
+            score += _MOBILITY_MISMATCH
+            gaps.append(
+                "Stationary, not portable"
+                if mobile
+                else "Handheld or phone-based, not a counter system"
+            )
+    if remote_payments:
+        if terminal.remote:
+            score += _REMOTE_MATCH
+            reasons.append("Takes payments by phone or online")
+
+    for need in needs:
+        level = terminal.features[need]
+        score += _FEATURE_POINTS[level]
+        if level == FULL:
+            reasons.append(f"Supports {_readable(need)}")
+        elif level == BASIC:
+            reasons.append(f"Basic {_readable(need)} through the app")
+        else:
+            gaps.append(f"No {_readable(need)}")
+
+    return {"score": score, "reasons": reasons, "gaps": gaps}
+
+
+def recommend_terminals(
+    business_type: str,
+    current_pos: str = "",
+    volume: str = "",
+    mobile: Optional[bool] = None,
+    remote_payments: bool = False,
+    needs: Optional[List[str]] = None,
+) -> dict:
+    """
+    Recommends the 2 best POS terminals for a business from the product catalog.
+
+    Args:
+        business_type: e.g. "coffee shop", "full-service restaurant",
+            "hair salon", "food truck", "online store".
+        current_pos: the make and model of the current POS system, e.g.
+            "Square Register". Leave empty if unknown.
+        volume: transaction volume, "low", "medium" or "high". Leave empty if
+            unknown.
+        mobile: true if payments are taken away from a counter. Leave unset if
+            unknown; it is then inferred from current_pos where possible.
+        remote_payments: true if payments are taken by phone or online.
+        needs: required features, any of: inventory, order_management,
+            table_management, tableside_ordering, loyalty, employee_management,
+            reporting, online_ordering, appointments, invoicing,
+            recurring_payments, cash_drawer, receipt_printer, barcode_scanner.
+
+    Returns:
+        The top 2 terminals with their score, mode of operation, hardware,
+        payment acceptance, supported features, reasons and unmet needs.
+    """
+    segments = business_segments(business_type)
+    volume = (volume or "").lower() or None
+    needs = needs or []
+    if isinstance(needs, str):
+        needs = needs.split(",")
+    needs = [str(n).strip().lower().replace(" ", "_") for n in needs if str(n).strip()]
+    if mobile is None:
+        mobile = pos_is_mobile(current_pos)
+    unknown_needs = [n for n in needs if n not in FEATURES]
+    needs = [n for n in dict.fromkeys(needs) if n in FEATURES]
+
+    scored = []
+    for position, terminal in enumerate(CATALOG):
+        result = score_terminal(
+            terminal,
+            segments,
+            volume,
+            mobile,
+            remote_payments,
+            needs,
+        )
+        scored.append((-result["score"], position, terminal, result))
+    scored.sort(key=lambda item: item[:2])
+
+    recommendations = [
+        {
+            "name": terminal.name,
+            "score": result["score"],
+            "mode": terminal.mode,
+            "hardware": terminal.hardware,
+            "payments": terminal.payments,
+            "features": [
+                _readable(f) if level == FULL else f"{_readable(f)} (basic)"
+                for f, level in terminal.features.items()
+                if level
+            ],
+            "reasons": result["reasons"],
+            "gaps": result["gaps"],
+        }
+        for _, _, terminal, result in scored[:2]
+    ]
+    response: Dict[str, Any] = {
+        "recommendations": recommendations,
+        "business_segments": sorted(_READABLE_SEGMENTS[s] for s in segments),
+    }
+    if unknown_needs:
+        response["ignored_needs"] = unknown_needs
+    return response
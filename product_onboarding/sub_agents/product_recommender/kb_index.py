@@ -0,0 +1,431 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Local BM25 index of the knowledge base documents.
+
+Built offline from the same documents as the Vertex AI Search data store, it
+answers lookups whose every significant term is found in one passage in a
+few milliseconds, and keeps the recommender answering when Vertex AI Search
+is slow or down.
+
+    python -m product_onboarding.sub_agents.product_recommender.kb_index \\
+        build gs://my-kb-bucket/docs -o .cache/kb_index
+    python -m product_onboarding.sub_agents.product_recommender.kb_index \\
+        bench questions.txt --index .cache/kb_index --vertex
+
+An index directory holds the vocabulary and passages as JSON and the postings
+as .npy arrays, which are memory-mapped rather than read into memory.
+"""
+
+import argparse
+import html.parser
+import json
+import logging
+import math
+import os
+import re
+import statistics
+import sys
+import threading
+import time
+from collections import Counter
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+# Directory of a built index; unset disables the local index.
+KB_INDEX_DIR = os.getenv("KB_INDEX_DIR")
+# Share of the query's IDF weight that the best passage must contain for a
+# local answer to be returned without calling Vertex AI Search.
+KB_INDEX_MIN_COVERAGE = float(os.getenv("KB_INDEX_MIN_COVERAGE", "0.9"))
+
+_BM25_K1 = 1.2
+_BM25_B = 0.75
+# Words per passage and words shared by consecutive passages.
+_PASSAGE_WORDS = 200
+_PASSAGE_OVERLAP = 50
+
+_TOKEN = re.compile(r"[a-z0-9]+")
+_SENTENCE = re.compile(r"(?<=[.!?])\s+|\n+")
+_STOPWORDS = {
+    "a", "an", "and", "are", "as", "at", "be", "by", "can", "do", "does",
+    "for", "from", "how", "i", "in", "is", "it", "its", "my", "of", "on",
+    "or", "that", "the", "this", "to", "what", "which", "with", "you", "your",
+}
+_TEXT_EXTENSIONS = (".txt", ".md")
+_HTML_EXTENSIONS = (".html", ".htm")
+
+
+def _stem(token: str) -> str:
+    """Strips a plural or third-person "s", so "accepts" matches "accept"."""
+    if len(token) > 3 and token.endswith("s") and not token.endswith(("ss", "us")):
+        return token[:-1]
+    return token
+
+
+def tokenize(text: str) -> List[str]:
+    """Lower-cased, lightly stemmed alphanumeric tokens without stopwords."""
+    return [_stem(t) for t in _TOKEN.findall(text.lower()) if t not in _STOPWORDS]
+
+
+class Passage(NamedTuple):
+    uri: str
+    title: str
+    text: str
+
+
+class Hit(NamedTuple):
+    passage: Passage
+    score: float
+    coverage: float
+
+
+class KnowledgeBaseIndex:
+    """A BM25 index loaded from a directory written by `build_index`."""
+
+    def __init__(self, directory: str):
+        with open(os.path.join(directory, "meta.json")) as f:
+            meta = json.load(f)
+        self._vocabulary: Dict[str, List[int]] = meta["vocabulary"]
+        self._avg_length = meta["avg_length"]
+        with open(os.path.join(directory, "passages.jsonl")) as f:
+            self.passages = [Passage(**json.loads(line)) for line in f]
+        self._lengths = np.load(os.path.join(directory, "lengths.npy"))
+        self._postings = np.load(os.path.join(directory, "postings.npy"), mmap_mode="r")
+        self._frequencies = np.load(
+            os.path.join(directory, "frequencies.npy"), mmap_mode="r"
+        )
+        self._norms = _BM25_K1 * (
+            1 - _BM25_B + _BM25_B * self._lengths / max(self._avg_length, 1e-9)
+        )
+
+    def __len__(self) -> int:
+        return len(self.passages)
+
+    def _idf(self, document_frequency: int) -> float:
+        n = len(self.passages)
+        return math.log(1 + (n - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def search(self, query: str, k: int = 3) -> List[Hit]:
+        """
+        Returns up to `k` passages by BM25 score. `coverage` is the share of
+        the query's IDF weight found in each passage; terms missing from the
+        whole index count against it with the highest IDF.
+        """
+        terms = set(tokenize(query))
+        if not terms or not self.passages:
+            return []
+        scores = np.zeros(len(self.passages), dtype=np.float32)
+        matched = np.zeros(len(self.passages), dtype=np.float32)
+        total_weight = 0.0
+        for term in terms:
+            span = self._vocabulary.get(term)
+            idf = self._idf(span[1] - span[0] if span else 0)
+            total_weight += idf
+            if not span:
+                continue
+            passages = np.asarray(self._postings[span[0] : span[1]])
+            tf = np.asarray(self._frequencies[span[0] : span[1]], dtype=np.float32)
+            scores[passages] += idf * tf * (_BM25_K1 + 1) / (tf + self._norms[passages])
+            matched[passages] += idf
+
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top])]
+        return [
+            Hit(self.passages[i], float(scores[i]), float(matched[i] / total_weight))
+            for i in top
+            if scores[i] > 0
+        ]
+
+    def answer(self, query: str, k: int = 3) -> Optional[dict]:
+        """
+        Answers in the shape of `vaisearch.vertex_ai_search`: the passages'
+        most relevant sentences as a bulleted list, and their documents as
+        references. Returns None if nothing matches. `coverage` is that of
+        the best passage.
+        """
+        hits = self.search(query, k)
+        if not hits:
+            return None
+        terms = set(tokenize(query))
+        references = []
+        for hit in hits:
+            reference = {"uri": hit.passage.uri, "title": hit.passage.title}
+            if reference not in references:
+                references.append(reference)
+        return {
+            "answerText": "\n".join(
+                f"- {_best_sentences(hit.passage.text, terms)}" for hit in hits
+            ),
+            "references": references,
+            "coverage": hits[0].coverage,
+        }
+
+
+def _best_sentences(text: str, terms: set, count: int = 2) -> str:
+    """The `count` sentences sharing the most terms with the query, in order."""
+    sentences = [s.strip() for s in _SENTENCE.split(text) if s.strip()]
+    ranked = sorted(
+        range(len(sentences)),
+        key=lambda i: -len(terms.intersection(tokenize(sentences[i]))),
+    )
+    return " ".join(sentences[i] for i in sorted(ranked[:count]))
+
+
+_index: Optional[KnowledgeBaseIndex] = None
+_index_loaded = False
+_index_lock = threading.Lock()
+
+
+def get_index() -> Optional[KnowledgeBaseIndex]:
+    """Returns the index in KB_INDEX_DIR, loaded on first use, or None."""
+    global _index, _index_loaded
+    if not _index_loaded:
+        with _index_lock:
+            if not _index_loaded:
+                if KB_INDEX_DIR:
+                    try:
+                        _index = KnowledgeBaseIndex(KB_INDEX_DIR)
+                        logging.info(
+                            f"Loaded knowledge base index with {len(_index)} passages"
+                        )
+                    except (OSError, ValueError, KeyError) as e:
+                        logging.warning(
+                            f"Could not load knowledge base index from {KB_INDEX_DIR}: {e}"
+                        )
+                _index_loaded = True
+    return _index
+
+
+class _HTMLText(html.parser.HTMLParser):
+    def __init__(self):
+        super().__init__()
+        self.parts: List[str] = []
+        self._skip = 0
+
+    def handle_starttag(self, tag, attrs):
+        if tag in ("script", "style"):
+            self._skip += 1
+        elif tag in ("p", "br", "li", "div", "tr", "h1", "h2", "h3", "h4"):
+            self.parts.append("\n")
+
+    def handle_endtag(self, tag):
+        if tag in ("script", "style") and self._skip:
+            self._skip -= 1
+
+    def handle_data(self, data):
+        if not self._skip:
+            self.parts.append(data)
+
+
+def _extract_text(name: str, data: bytes) -> Optional[str]:
+    """Plain text of a .txt, .md, .html or .pdf document, or None."""
+    lower = name.lower()
+    if lower.endswith(_TEXT_EXTENSIONS):
+        return data.decode("utf-8", errors="replace")
+    if lower.endswith(_HTML_EXTENSIONS):
+        parser = _HTMLText()
+        parser.feed(data.decode("utf-8", errors="replace"))
+        return "".join(parser.parts)
+    if lower.endswith(".pdf"):
+        try:
+            from io import BytesIO
+
+            import pypdf
+        except ImportError:
+            logging.warning(f"Skipping {name}: indexing PDFs needs pypdf (pip install pypdf)")
+            return None
+        reader = pypdf.PdfReader(BytesIO(data))
+        return "\n".join(page.extract_text() or "" for page in reader.pages)
+    return None
+
+
+def _read_sources(sources: Iterable[str]) -> Iterator[Tuple[str, str, bytes]]:
+    """Yields (uri, name, bytes) for each file in local directories or gs:// prefixes."""
+    for source in sources:
+        if source.startswith("gs://"):
+            from google.cloud import storage
+
+            bucket_name, _, prefix = source[len("gs://") :].partition("/")
+            client = storage.Client()
+            for blob in client.list_blobs(bucket_name, prefix=prefix):
+                if blob.name.endswith("/"):
+                    continue
+                # Same form as the references returned by vertex_ai_search.
+                uri = f"https://storage.cloud.google.com/{bucket_name}/{blob.name}"
+                yield uri, blob.name, blob.download_as_bytes()
+        elif os.path.isdir(source):
+            for root, _, files in os.walk(source):
+                for name in sorted(files):
+                    path = os.path.join(root, name)
+                    with open(path, "rb") as f:
+                        yield os.path.abspath(path), name, f.read()
+        else:
+            with open(source, "rb") as f:
+                yield os.path.abspath(source), os.path.basename(source), f.read()
+
+
+def _passages(uri: str, title: str, text: str) -> Iterator[Passage]:
+    words = text.split()
+    step = _PASSAGE_WORDS - _PASSAGE_OVERLAP
+    for start in range(0, max(len(words) - _PASSAGE_OVERLAP, 1), step):
+        yield Passage(uri, title, " ".join(words[start : start + _PASSAGE_WORDS]))
+
+
+def build_index(documents: Iterable[Tuple[str, str, str]], directory: str) -> int:
+    """
+    Writes an index of (uri, title, text) documents to `directory` and
+    returns the number of passages.
+    """
+    passages: List[Passage] = []
+    term_frequencies: Dict[str, Dict[int, int]] = {}
+    lengths = []
+    for uri, title, text in documents:
+        for passage in _passages(uri, title, text):
+            tokens = tokenize(passage.text)
+            if not tokens:
+                continue
+            passage_id = len(passages)
+            passages.append(passage)
+            lengths.append(len(tokens))
+            for term, count in Counter(tokens).items():
+                term_frequencies.setdefault(term, {})[passage_id] = count
+
+    vocabulary: Dict[str, List[int]] = {}
+    postings: List[int] = []
+    frequencies: List[int] = []
+    for term in sorted(term_frequencies):
+        start = len(postings)
+        for passage_id, count in sorted(term_frequencies[term].items()):
+            postings.append(passage_id)
+            frequencies.append(count)
+        vocabulary[term] = [start, len(postings)]
+
+    os.makedirs(directory, exist_ok=True)
+    np.save(os.path.join(directory, "postings.npy"), np.array(postings, dtype=np.int32))
+    np.save(
+        os.path.join(directory, "frequencies.npy"),
+        np.minimum(np.array(frequencies), np.iinfo(np.uint16).max).astype(np.uint16),
+    )
+    np.save(os.path.join(directory, "lengths.npy"), np.array(lengths, dtype=np.float32))
+    with open(os.path.join(directory, "passages.jsonl"), "w") as f:
+        for passage in passages:
+            f.write(json.dumps(passage._asdict()) + "\n")
+    with open(os.path.join(directory, "meta.json"), "w") as f:
+        json.dump(
+            {
+                "avg_length": float(np.mean(lengths)) if lengths else 0.0,
+                "built_at": time.time(),
+                "vocabulary": vocabulary,
+            },
+            f,
+        )
+    return len(passages)
+
+
+def _build(args: argparse.Namespace) -> None:
+    documents = []
+    for uri, name, data in _read_sources(args.sources):
+        text = _extract_text(name, data)
+        if text and text.strip():
+            documents.append((uri, os.path.splitext(os.path.basename(name))[0], text))
+        elif text is None:
+            logging.info(f"Skipping unsupported file {name}")
+    count = build_index(documents, args.output)
+    print(f"Indexed {len(documents)} documents as {count} passages in {args.output}")
+
+
+def _percentile(values: List[float], percent: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * percent / 100))]
+
+
+def _bench(args: argparse.Namespace) -> None:
+    with open(args.queries) as f:
+        queries = [line.strip() for line in f if line.strip()]
+    index = KnowledgeBaseIndex(args.index)
+
+    local_ms, confident = [], 0
+    local_answers = []
+    for query in queries:
+        start = time.perf_counter()
+        answer = index.answer(query, k=args.k)
+        local_ms.append((time.perf_counter() - start) * 1000)
+        local_answers.append(answer)
+        confident += bool(answer and answer["coverage"] >= KB_INDEX_MIN_COVERAGE)
+    print(
+        f"local: {len(queries)} queries, p50 {statistics.median(local_ms):.2f} ms, "
+        f"p95 {_percentile(local_ms, 95):.2f} ms, "
+        f"{confident} confident (coverage >= {KB_INDEX_MIN_COVERAGE})"
+    )
+    if not args.vertex:
+        return
+
+    from product_onboarding.sub_agents.product_recommender import vaisearch
+
+    project_id = os.environ["GOOGLE_CLOUD_PROJECT"]
+    location = os.environ["VERTEX_AI_SEARCH_LOCATION"]
+    engine_id = os.environ["VERTEX_AI_SEARCH_ENGINE_ID"]
+    vertex_ms, recalls = [], []
+    for query, local in zip(queries, local_answers):
+        start = time.perf_counter()
+        response = vaisearch.vertex_ai_search(project_id, location, engine_id, query)
+        vertex_ms.append((time.perf_counter() - start) * 1000)
+        expected = {r["uri"] for r in response.get("references", [])}
+        if expected:
+            found = {r["uri"] for r in local["references"]} if local else set()
+            recalls.append(len(expected & found) / len(expected))
+    print(
+        f"vertex: p50 {statistics.median(vertex_ms):.0f} ms, "
+        f"p95 {_percentile(vertex_ms, 95):.0f} ms"
+    )
+    if recalls:
+        print(
+            f"recall@{args.k} of Vertex AI Search references: "
+            f"{statistics.mean(recalls):.2f} over {len(recalls)} queries"
+        )
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m product_onboarding.sub_agents.product_recommender.kb_index",
+        description="Build or benchmark the local knowledge base index.",
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    build = commands.add_parser("build", help="index local directories, files or gs:// prefixes")
+    build.add_argument("sources", nargs="+")
+    build.add_argument("-o", "--output", default=KB_INDEX_DIR or ".cache/kb_index")
+    build.set_defaults(func=_build)
+
+    bench = commands.add_parser("bench", help="time the index on a file of questions")
+    bench.add_argument("queries", help="text file with one question per line")
+    bench.add_argument("--index", default=KB_INDEX_DIR or ".cache/kb_index")
+    bench.add_argument("-k", type=int, default=3, help="passages per answer")
+    bench.add_argument(
+        "--vertex",
+        action="store_true",
+        help="also call vertex_ai_search and report its latency and the local recall",
+    )
+    bench.set_defaults(func=_bench)
+
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.WARNING)
+    args.func(args)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,190 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Semantic cache of knowledge base answers.
+
+Questions are embedded and compared with those already answered, so a
+rephrased question ("Flex contactless?" after "does the Flex take tap to
+pay") is served from memory instead of a new answer-generation call. The
+index is a fixed-size matrix of L2-normalized float32 vectors scored with one
+matrix product per lookup. Embeddings barely separate questions that differ
+only in the product they ask about, so an answer is only reused for a
+question naming the same catalog products.
+"""
+
+import logging
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, FrozenSet, List, Optional, Sequence, Tuple
+
+import numpy as np
+from google.genai import Client, types
+
+from product_onboarding.shared_libraries.cache import TTLCache
+from product_onboarding.sub_agents.product_recommender import catalog
+
+# Cosine similarity above which a cached answer is reused.
+KB_SEMANTIC_CACHE_THRESHOLD = float(os.getenv("KB_SEMANTIC_CACHE_THRESHOLD", "0.92"))
+KB_SEMANTIC_CACHE_TTL = float(os.getenv("KB_SEMANTIC_CACHE_TTL", "3600"))
+# Answers kept; 0 disables the cache.
+KB_SEMANTIC_CACHE_SIZE = int(os.getenv("KB_SEMANTIC_CACHE_SIZE", "1024"))
+KB_EMBEDDING_MODEL = os.getenv("KB_EMBEDDING_MODEL", "text-embedding-004")
+
+Embedder = Callable[[Sequence[str]], np.ndarray]
+KeyTerms = Callable[[str], FrozenSet[str]]
+
+_genai_client: Optional[Client] = None
+
+
+def genai_embedder(texts: Sequence[str]) -> np.ndarray:
+    """Embeds texts with KB_EMBEDDING_MODEL, one row per text."""
+    global _genai_client
+    if _genai_client is None:
+        _genai_client = Client()
+    response = _genai_client.models.embed_content(
+        model=KB_EMBEDDING_MODEL,
+        contents=list(texts),
+        config=types.EmbedContentConfig(task_type="SEMANTIC_SIMILARITY"),
+    )
+    return np.array([e.values for e in response.embeddings], dtype=np.float32)
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+    return vectors / np.where(norms == 0, 1.0, norms)
+
+
+class SemanticCache:
+    """
+    Fixed-capacity nearest-neighbour cache from questions to answers.
+
+    Entries expire after `ttl` seconds and are all dropped when the catalog
+    version changes. When full, an expired slot or else the oldest entry is
+    overwritten. Embeddings of exact repeat questions are memoized. An entry
+    only matches questions with the same `key_terms`, by default the catalog
+    products they name.
+    """
+
+    def __init__(
+        self,
+        embed: Embedder = genai_embedder,
+        threshold: float = KB_SEMANTIC_CACHE_THRESHOLD,
+        ttl: float = KB_SEMANTIC_CACHE_TTL,
+        maxsize: int = KB_SEMANTIC_CACHE_SIZE,
+        version: str = "",
+        key_terms: KeyTerms = catalog.product_names,
+    ):
+        self.threshold = threshold
+        self.ttl = ttl
+        self.maxsize = maxsize
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._embed = embed
+        self._key_terms = key_terms
+        self._vectors: Optional[np.ndarray] = None
+        self._values: List[Any] = [None] * maxsize
+        # Hash of each entry's key terms, compared in one vector operation.
+        self._terms = np.zeros(maxsize, dtype=np.int64)
+        self._expires = np.zeros(maxsize, dtype=np.float64)
+        self._inserted = np.zeros(maxsize, dtype=np.float64)
+        self._query_vectors = TTLCache(maxsize=256, ttl=ttl)
+        self._lock = threading.Lock()
+
+    def _vector(self, query: str) -> np.ndarray:
+        key = " ".join(query.casefold().split())
+        vector = self._query_vectors.get(key)
+        if vector is None:
+            vector = _normalize_rows(self._embed([query]))[0]
+            self._query_vectors.set(key, vector)
+        return vector
+
+    def check_version(self, version: str) -> None:
+        """Drops every entry if the catalog version has changed."""
+        if version != self.version:
+            logging.info(
+                f"Catalog version changed from {self.version!r} to {version!r}, "
+                "clearing semantic cache"
+            )
+            self.clear()
+            self.version = version
+
+    def top1(
+        self, vectors: np.ndarray, terms: Optional[FrozenSet[str]] = None
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Returns (indices, scores) of the best live entry for each row of
+        `vectors`; the score is -inf where the cache has no live entry. When
+        `terms` is given, only entries with those key terms are considered.
+        """
+        with self._lock:
+            if self._vectors is None:
+                return (
+                    np.zeros(len(vectors), dtype=np.int64),
+                    np.full(len(vectors), -np.inf, dtype=np.float32),
+                )
+            scores = _normalize_rows(vectors) @ self._vectors.T
+            scores[:, self._expires <= time.time()] = -np.inf
+            if terms is not None:
+                scores[:, self._terms != hash(terms)] = -np.inf
+        indices = np.argmax(scores, axis=1)
+        return indices, scores[np.arange(len(scores)), indices]
+
+    def get(self, query: str) -> Optional[Any]:
+        """Returns the answer cached for the closest question above the threshold."""
+        if self.maxsize <= 0:
+            return None
+        indices, scores = self.top1(self._vector(query)[None, :], self._key_terms(query))
+        if scores[0] >= self.threshold:
+            with self._lock:
+                value = self._values[indices[0]]
+            if value is not None:
+                self.hits += 1
+                logging.info(f"Semantic cache hit for {query!r} (score {scores[0]:.3f})")
+                return value
+        self.misses += 1
+        return None
+
+    def set(self, query: str, value: Any) -> None:
+        if self.maxsize <= 0:
+            return
+        vector = self._vector(query)
+        terms = self._key_terms(query)
+        now = time.time()
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.maxsize, len(vector)), dtype=np.float32)
+            expired = np.flatnonzero(self._expires <= now)
+            slot = expired[0] if len(expired) else int(np.argmin(self._inserted))
+            self._vectors[slot] = vector
+            self._values[slot] = value
+            self._terms[slot] = hash(terms)
+            self._expires[slot] = now + self.ttl
+            self._inserted[slot] = now
+
+    def clear(self) -> None:
+        with self._lock:
+            self._values = [None] * self.maxsize
+            self._terms[:] = 0
+            self._expires[:] = 0
+            self._inserted[:] = 0
+        self._query_vectors.clear()
+
+    def __len__(self) -> int:
+        return int(np.count_nonzero(self._expires > time.time()))
+
+    def stats(self) -> Dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "entries": len(self)}
@@ -1,7 +1,18 @@
-import base64  # Kept for now, may not be strictly needed
+"""Calls the Vertex AI Search API to get an answer for the query.
+
+The client for each location and the answer request for each serving config
+are built once and reused, so a search only pays for the RPC itself.
+"""
+
+import asyncio
+import atexit
+import logging
+import threading
+import weakref
+from typing import AsyncIterator, Dict, List, Optional
 
-from google.cloud import discoveryengine_v1 as discoveryengine
 from google.api_core.client_options import ClientOptions
+from google.cloud import discoveryengine_v1 as discoveryengine
 
 # TODO(developer): Uncomment these variables before running the sample.
 # project_id = "YOUR_PROJECT_ID"
@@ -9,35 +20,86 @@ from google.api_core.client_options import ClientOptions
 # engine_id = "YOUR_APP_ID" # This is often referred to as Data Store ID in the context of Answer API
 # search_query = "YOUR_SEARCH_QUERY"
 
-"""Calls the Vertex AI Search API to get an answer for the query."""
+_clients: Dict[str, discoveryengine.ConversationalSearchServiceClient] = {}
+_clients_lock = threading.Lock()
+# gRPC asyncio channels belong to the loop that created them, so async
+# clients are kept per event loop and per location.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, discoveryengine.ConversationalSearchServiceAsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+# Raw protobuf request templates per serving config. They are never handed
+# out; each call copies one and sets the query.
+_request_templates: Dict[str, object] = {}
+_templates_lock = threading.Lock()
 
 
-def vertex_ai_search(
-    project_id: str,
-    location: str,
-    engine_id: str,  # For Answer API, this is typically the Data Store ID
-    search_query: str,
-) -> dict:
+def _client_options(location: str) -> Optional[ClientOptions]:
     #  For more information, refer to:
     # https://cloud.google.com/generative-ai-app-builder/docs/locations#specify_a_multi-region_for_your_data_store
-    client_options = (
-        ClientOptions(api_endpoint=f"{location}-discoveryengine.googleapis.com")
-        if location != "global"
-        else None
-    )
+    if location == "global":
+        return None
+    return ClientOptions(api_endpoint=f"{location}-discoveryengine.googleapis.com")
+
 
-    # Create a client
-    client = discoveryengine.ConversationalSearchServiceClient(
-        client_options=client_options
-    )  # Answer method is part of SearchServiceClient
+def get_client(location: str) -> discoveryengine.ConversationalSearchServiceClient:
+    """
+    Returns the shared client for a Vertex AI Search location.
 
-    # The full resource name of the search app serving config or data store
-    # For Answer API, this is typically the data store.
-    # Example: projects/{project_id}/locations/{location}/collections/default_collection/dataStores/{engine_id}
-    # However, the 'answer' method uses a serving_config like search.
-    # Let's assume engine_id is the engine_id for a serving_config.
-    serving_config = f"projects/{project_id}/locations/{location}/collections/default_collection/engines/{engine_id}/servingConfigs/default_config"
+    Clients are created on first use and reused by every thread, so the gRPC
+    channel, auth and TLS setup happen once per location per process.
+    """
+    client = _clients.get(location)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(location)
+            if client is None:
+                logging.info(f"Creating Vertex AI Search client for {location}")
+                client = discoveryengine.ConversationalSearchServiceClient(
+                    client_options=_client_options(location)
+                )
+                _clients[location] = client
+    return client
 
+
+@atexit.register
+def close_clients() -> None:
+    """
+    Closes every shared client. Called automatically at interpreter exit.
+    """
+    with _clients_lock:
+        for location, client in _clients.items():
+            try:
+                client.transport.close()
+            except Exception as e:
+                logging.warning(f"Error closing Vertex AI Search client for {location}: {e}")
+        _clients.clear()
+
+
+def get_async_client(
+    location: str,
+) -> discoveryengine.ConversationalSearchServiceAsyncClient:
+    """
+    Returns the running event loop's async client for a location, creating
+    it on first use.
+    """
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    client = clients.get(location)
+    if client is None:
+        logging.info(f"Creating async Vertex AI Search client for {location}")
+        client = discoveryengine.ConversationalSearchServiceAsyncClient(
+            client_options=_client_options(location)
+        )
+        clients[location] = client
+    return client
+
+
+def _serving_config(project_id: str, location: str, engine_id: str) -> str:
+    # The 'answer' method uses the engine's serving config, like search.
+    return f"projects/{project_id}/locations/{location}/collections/default_collection/engines/{engine_id}/servingConfigs/default_config"
+
+
+def _build_request_template(serving_config: str) -> discoveryengine.AnswerQueryRequest:
+    """Builds the answer request for a serving config, without a query."""
     answer_generation_spec = discoveryengine.AnswerQueryRequest.AnswerGenerationSpec(
         ignore_adversarial_query=False,  # Optional: Ignore adversarial query
         ignore_non_answer_seeking_query=False,  # Optional: Ignore non-answer seeking query
@@ -71,10 +133,8 @@ def vertex_ai_search(
             ]  # Options: ADVERSARIAL_QUERY, NON_ANSWER_SEEKING_QUERY or both
         ),
     )
-    # Construct the AnswerRequest
-    request = discoveryengine.AnswerQueryRequest(
+    return discoveryengine.AnswerQueryRequest(
         serving_config=serving_config,
-        query=discoveryengine.Query(text=search_query),
         answer_generation_spec=answer_generation_spec,
         session=None,  # Optional: include previous session ID to continue a conversation
         query_understanding_spec=query_understanding_spec,
@@ -85,28 +145,99 @@ def vertex_ai_search(
         ),
     )
 
+
+def build_request(serving_config: str, search_query: str) -> discoveryengine.AnswerQueryRequest:
+    """
+    Returns the answer request for a query: a copy of the serving config's
+    prebuilt template with only the query set.
+    """
+    template = _request_templates.get(serving_config)
+    if template is None:
+        with _templates_lock:
+            template = _request_templates.get(serving_config)
+            if template is None:
+                template = discoveryengine.AnswerQueryRequest.pb(
+                    _build_request_template(serving_config)
+                )
+                _request_templates[serving_config] = template
+    request = type(template)()
+    request.CopyFrom(template)
+    request.query.text = search_query
+    return discoveryengine.AnswerQueryRequest.wrap(request)
+
+
+def vertex_ai_search(
+    project_id: str,
+    location: str,
+    engine_id: str,  # For Answer API, this is typically the Data Store ID
+    search_query: str,
+) -> dict:
+    client = get_client(location)
+    request = build_request(_serving_config(project_id, location, engine_id), search_query)
+
     # Call the answer API
     response = client.answer_query(request)
 
-    # Process the response
-    answer_text = response.answer.answer_text
+    return {
+        "answerText": response.answer.answer_text,
+        "references": _references(response.answer),
+        "blobAttachments": _attachments(response.answer),
+    }
+
 
+async def stream_vertex_ai_search(
+    project_id: str,
+    location: str,
+    engine_id: str,
+    search_query: str,
+) -> AsyncIterator[dict]:
+    """
+    Streams the answer for the query as it is generated.
+
+    Yields {"answerTextChunk": str} for each piece of new answer text, then one
+    final dict shaped like the `vertex_ai_search` result, with the complete
+    answer text, references and blob attachments.
+    """
+    client = get_async_client(location)
+    request = build_request(_serving_config(project_id, location, engine_id), search_query)
+
+    answer_text = ""
+    last_answer = None
+    async for response in await client.stream_answer_query(request):
+        chunk = response.answer.answer_text
+        # Each message carries the text generated since the previous one;
+        # tolerate cumulative text as well.
+        if answer_text and chunk.startswith(answer_text):
+            chunk = chunk[len(answer_text) :]
+        if chunk:
+            answer_text += chunk
+            yield {"answerTextChunk": chunk}
+        last_answer = response.answer
+
+    yield {
+        "answerText": answer_text,
+        "references": _references(last_answer) if last_answer else [],
+        "blobAttachments": _attachments(last_answer) if last_answer else [],
+    }
+
+
+def _references(answer: discoveryengine.Answer) -> List[dict]:
     references_list = []
-    if hasattr(response.answer, "references") and response.answer.references:
-        for ref in response.answer.references:
+    if hasattr(answer, "references") and answer.references:
+        for ref in answer.references:
             if ref.chunk_info and ref.chunk_info.document_metadata:
                 uri = ref.chunk_info.document_metadata.uri
                 # replace gs:// with https://storage.googleapis.com/
                 uri = uri.replace("gs://", "https://storage.cloud.google.com/")
                 title = ref.chunk_info.document_metadata.title
                 references_list.append({"uri": uri, "title": title})
+    return references_list
+
 
+def _attachments(answer: discoveryengine.Answer) -> List[dict]:
     attachments_list = []
-    if (
-        hasattr(response.answer, "blob_attachments")
-        and response.answer.blob_attachments
-    ):
-        for attachment in response.answer.blob_attachments:
+    if hasattr(answer, "blob_attachments") and answer.blob_attachments:
+        for attachment in answer.blob_attachments:
             if attachment.data:
                 attachments_list.append(
                     {
@@ -116,9 +247,4 @@ def vertex_ai_search(
                         }
                     }
                 )
-
-    return {
-        "answerText": answer_text,
-        "references": references_list,
-        "blobAttachments": attachments_list,
-    }
+    return attachments_list
@@ -17,12 +17,23 @@
 from google.adk.agents import Agent
 
 from product_onboarding.sub_agents.qualify_customer import prompt
-from product_onboarding.tools.places import find_business_from_google_maps
+from product_onboarding.tools.places import (
+    find_business_from_google_maps_async,
+    find_business_from_google_maps_stream,
+)
+from product_onboarding.tools.streaming import StreamingFunctionTool
 
 qualify_customer_agent = Agent(
     model="gemini-2.5-pro-preview-05-06",
     name="qualify_customer_agent",
     description="A validate business agent who helps users verify their business listing using business name and location",
     instruction=prompt.VERIFY_BUSINESS_AGENT_INSTR,
-    tools=[find_business_from_google_maps],
+    tools=[
+        # Streams each place to live sessions as it is found; regular runs
+        # get the complete list from find_business_from_google_maps_async.
+        StreamingFunctionTool(
+            find_business_from_google_maps_stream,
+            fallback=find_business_from_google_maps_async,
+        )
+    ],
 )
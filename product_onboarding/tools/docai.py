@@ -1,34 +1,319 @@
-from google.cloud import documentai
-import base64
+import asyncio
+import atexit
+import hashlib
 import logging
-def process_document(processor_name: str, image_buffer: bytes, mime_type: str) -> documentai.Document:
+import os
+import re
+import threading
+import weakref
+from typing import Dict, Optional, Union
+
+from google.cloud import documentai
+
+from product_onboarding.shared_libraries.cache import TieredCache
+
+# gRPC keep-alive pings for the shared Document AI channels.
+DOCAI_KEEPALIVE_TIME_MS = int(os.getenv("DOCAI_KEEPALIVE_TIME_MS", "60000"))
+DOCAI_KEEPALIVE_TIMEOUT_MS = int(os.getenv("DOCAI_KEEPALIVE_TIMEOUT_MS", "20000"))
+
+# Parsed-document cache, keyed by the content hash and the processor version.
+# The memory tier is bounded by serialized size; set DOCAI_CACHE_DB to keep
+# results on disk across restarts.
+DOCAI_CACHE_SIZE = int(os.getenv("DOCAI_CACHE_SIZE", "256"))
+DOCAI_CACHE_TTL = float(os.getenv("DOCAI_CACHE_TTL", "86400"))
+DOCAI_CACHE_MAX_BYTES = int(os.getenv("DOCAI_CACHE_MAX_BYTES", str(64 * 1024 * 1024)))
+DOCAI_CACHE_DB = os.getenv("DOCAI_CACHE_DB")
+DOCAI_CACHE_DISK_MAX_BYTES = int(
+    os.getenv("DOCAI_CACHE_DISK_MAX_BYTES", str(1024 * 1024 * 1024))
+)
+
+_PROCESSOR_LOCATION = re.compile(r"^projects/[^/]+/locations/([^/]+)/")
+_PROCESSOR_VERSION = re.compile(r"/processorVersions/([^/]+)$")
+
+_document_cache = TieredCache(
+    maxsize=DOCAI_CACHE_SIZE,
+    ttl=DOCAI_CACHE_TTL,
+    db_path=DOCAI_CACHE_DB,
+    table="documents",
+    serialize=bytes,
+    deserialize=bytes,
+    max_bytes=DOCAI_CACHE_MAX_BYTES,
+    disk_max_bytes=DOCAI_CACHE_DISK_MAX_BYTES,
+)
+# One lock per cache key being processed, so concurrent calls for the same
+# document wait for the first result instead of parsing it again.
+_inflight: "weakref.WeakValueDictionary[str, threading.Lock]" = (
+    weakref.WeakValueDictionary()
+)
+_inflight_lock = threading.Lock()
+
+_clients: Dict[str, documentai.DocumentProcessorServiceClient] = {}
+_clients_lock = threading.Lock()
+# gRPC asyncio channels belong to the loop that created them, so async
+# clients are kept per event loop and per endpoint.
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[str, documentai.DocumentProcessorServiceAsyncClient]]" = (
+    weakref.WeakKeyDictionary()
+)
+_async_inflight: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, weakref.WeakValueDictionary[str, asyncio.Lock]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _endpoint_for(processor_name: str) -> str:
+    """
+    Returns the regional API endpoint serving a processor.
+
+    The location comes from the processor path, falling back to
+    PROCESSOR_LOCATION for bare processor names.
+    """
+    match = _PROCESSOR_LOCATION.match(processor_name)
+    location = match.group(1) if match else os.getenv("PROCESSOR_LOCATION", "us")
+    return f"{location}-documentai.googleapis.com"
+
+
+def _channel_options() -> list:
+    return [
+        ("grpc.max_send_message_length", -1),
+        ("grpc.max_receive_message_length", -1),
+        ("grpc.keepalive_time_ms", DOCAI_KEEPALIVE_TIME_MS),
+        ("grpc.keepalive_timeout_ms", DOCAI_KEEPALIVE_TIMEOUT_MS),
+    ]
+
+
+def _create_client(endpoint: str) -> documentai.DocumentProcessorServiceClient:
+    """
+    Creates a client whose gRPC channel keeps its connection alive.
+    """
+    transport_class = documentai.DocumentProcessorServiceClient.get_transport_class(
+        "grpc"
+    )
+    channel = transport_class.create_channel(endpoint, options=_channel_options())
+    return documentai.DocumentProcessorServiceClient(
+        transport=transport_class(host=endpoint, channel=channel)
+    )
+
+
+def get_client(processor_name: str) -> documentai.DocumentProcessorServiceClient:
+    """
+    Returns the shared client for the processor's regional endpoint.
+
+    Clients are created on first use and reused by every thread, so the gRPC
+    channel, auth and TLS setup happen once per endpoint per process.
+    """
+    endpoint = _endpoint_for(processor_name)
+    client = _clients.get(endpoint)
+    if client is None:
+        with _clients_lock:
+            client = _clients.get(endpoint)
+            if client is None:
+                logging.info(f"Creating Document AI client for {endpoint}")
+                client = _create_client(endpoint)
+                _clients[endpoint] = client
+    return client
+
+
+@atexit.register
+def close_clients() -> None:
+    """
+    Closes every shared client. Called automatically at interpreter exit.
+    """
+    with _clients_lock:
+        for endpoint, client in _clients.items():
+            try:
+                client.transport.close()
+            except Exception as e:
+                logging.warning(f"Error closing Document AI client for {endpoint}: {e}")
+        _clients.clear()
+
+
+def _as_bytes(buffer: Union[bytes, bytearray, memoryview]) -> bytes:
+    """
+    Returns the payload as `bytes`, without copying when it already is.
+
+    A memoryview over a whole `bytes` object hands back that object. Only
+    partial views and mutable buffers pay for a single copy.
+    """
+    if isinstance(buffer, bytes):
+        return buffer
+    if (
+        isinstance(buffer, memoryview)
+        and isinstance(buffer.obj, bytes)
+        and buffer.c_contiguous
+        and buffer.nbytes == len(buffer.obj)
+    ):
+        return buffer.obj
+    return bytes(buffer)
+
+
+def _cache_key(
+    processor_name: str, content: bytes, first_pages: Optional[int] = None
+) -> str:
+    """
+    Content address of a parse: sha256 of the bytes, the processor, the
+    processor version ("default" when the name does not pin one) and the
+    page selection.
+    """
+    match = _PROCESSOR_VERSION.search(processor_name)
+    version = match.group(1) if match else "default"
+    processor = processor_name.split("/processorVersions/")[0]
+    digest = hashlib.sha256(content).hexdigest()
+    pages = f"first{first_pages}" if first_pages else "all"
+    return f"{digest}:{processor}:{version}:{pages}"
+
+
+def get_document_cache_stats() -> Dict[str, int]:
+    """Hit/miss counters for the parsed-document cache."""
+    return _document_cache.stats()
+
+
+def process_document(
+    processor_name: str,
+    image_buffer: Union[bytes, bytearray, memoryview],
+    mime_type: str,
+    first_pages: Optional[int] = None,
+) -> documentai.Document:
     """
     Process a document using the DocumentAI API.
+
+    Results are cached by content hash, so the same bytes sent to the same
+    processor version are only parsed once within DOCAI_CACHE_TTL.
     Args:
         processor_name: The Document AI processor name
         image_buffer: A buffer containing the image data
         mime_type: Mime type of the input image
+        first_pages: Only process this many pages from the start of the
+            document. All pages are processed when it is None or the document
+            is shorter.
     Returns:
         The parsed document
     """
+    content = _as_bytes(image_buffer)
+    cache_key = _cache_key(processor_name, content, first_pages)
+    with _inflight_lock:
+        key_lock = _inflight.setdefault(cache_key, threading.Lock())
+    with key_lock:
+        cached = _document_cache.get(cache_key)
+        if cached is not None:
+            logging.info(f"Document AI cache hit for processor: {processor_name}")
+            return documentai.Document.deserialize(cached)
+        document = _process_document(processor_name, content, mime_type, first_pages)
+        _document_cache.set(cache_key, documentai.Document.serialize(document))
+        return document
 
+
+def _process_document(
+    processor_name: str,
+    content: bytes,
+    mime_type: str,
+    first_pages: Optional[int] = None,
+) -> documentai.Document:
+    """Sends one document to Document AI, bypassing the cache."""
     logging.info(f"Processing document with processor: {processor_name}")
-    client = documentai.DocumentProcessorServiceClient()
+    client = get_client(processor_name)
+    request = _build_request(processor_name, content, mime_type, first_pages)
 
-    # Base64 encode buffer
-    encoded_content = base64.b64encode(image_buffer).decode("utf-8")
+    result = client.process_document(request=request)
+    document = result.document
 
-    raw_document = documentai.RawDocument(
-        content=encoded_content, mime_type=mime_type
-    )
+    return document
+
+
+def _build_request(
+    processor_name: str,
+    content: bytes,
+    mime_type: str,
+    first_pages: Optional[int] = None,
+) -> documentai.ProcessRequest:
+    # RawDocument.content is a bytes field: pass the raw payload straight
+    # through instead of base64 encoding it into a str.
+    raw_document = documentai.RawDocument(content=content, mime_type=mime_type)
 
     request = documentai.ProcessRequest(
         name=processor_name,
         raw_document=raw_document,
         skip_human_review=True,
     )
+    if first_pages:
+        request.process_options = documentai.ProcessOptions(from_start=first_pages)
+    return request
 
-    result = client.process_document(request=request)
-    document = result.document
 
-    return document
+# --- Async Document AI ---
+def _create_async_client(
+    endpoint: str,
+) -> documentai.DocumentProcessorServiceAsyncClient:
+    """
+    Creates an asyncio client whose gRPC channel keeps its connection alive.
+    """
+    transport_class = documentai.DocumentProcessorServiceClient.get_transport_class(
+        "grpc_asyncio"
+    )
+    channel = transport_class.create_channel(endpoint, options=_channel_options())
+    return documentai.DocumentProcessorServiceAsyncClient(
+        transport=transport_class(host=endpoint, channel=channel)
+    )
+
+
+def get_async_client(
+    processor_name: str,
+) -> documentai.DocumentProcessorServiceAsyncClient:
+    """
+    Returns the running event loop's shared async client for the processor's
+    regional endpoint. One channel multiplexes every in-flight request.
+    """
+    clients = _async_clients.setdefault(asyncio.get_running_loop(), {})
+    endpoint = _endpoint_for(processor_name)
+    client = clients.get(endpoint)
+    if client is None:
+        logging.info(f"Creating async Document AI client for {endpoint}")
+        client = _create_async_client(endpoint)
+        clients[endpoint] = client
+    return client
+
+
+async def close_async_clients() -> None:
+    """
+    Closes the running event loop's async clients, e.g. on worker shutdown.
+    """
+    clients = _async_clients.pop(asyncio.get_running_loop(), {})
+    for endpoint, client in clients.items():
+        try:
+            await client.transport.close()
+        except Exception as e:
+            logging.warning(
+                f"Error closing async Document AI client for {endpoint}: {e}"
+            )
+
+
+async def process_document_async(
+    processor_name: str,
+    image_buffer: Union[bytes, bytearray, memoryview],
+    mime_type: str,
+    first_pages: Optional[int] = None,
+) -> documentai.Document:
+    """
+    Async version of `process_document`, sharing its cache.
+
+    The request waits on the event loop instead of holding a thread, so one
+    worker can keep many documents in flight. Concurrent calls for the same
+    document on a loop wait for the first one's result.
+    """
+    content = _as_bytes(image_buffer)
+    cache_key = _cache_key(processor_name, content, first_pages)
+    locks = _async_inflight.setdefault(
+        asyncio.get_running_loop(), weakref.WeakValueDictionary()
+    )
+    key_lock = locks.setdefault(cache_key, asyncio.Lock())
+    async with key_lock:
+        cached = _document_cache.get(cache_key)
+        if cached is not None:
+            logging.info(f"Document AI cache hit for processor: {processor_name}")
+            return documentai.Document.deserialize(cached)
+
+        logging.info(f"Processing document asynchronously with processor: {processor_name}")
+        client = get_async_client(processor_name)
+        request = _build_request(processor_name, content, mime_type, first_pages)
+        result = await client.process_document(request=request)
+        document = result.document
+        _document_cache.set(cache_key, documentai.Document.serialize(document))
+        return document
@@ -1,9 +1,227 @@
+import asyncio
+import concurrent.futures
 import json
 import logging
 import os
-from typing import Any, Dict, List, Union
+import re
+import threading
+import time
+import weakref
+import zlib
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple, Union
 
+import httpx
+import numpy as np
 import requests
+from requests.adapters import HTTPAdapter
+
+from product_onboarding.shared_libraries.cache import TieredCache
+from product_onboarding.shared_libraries.ratelimit import RateLimiter
+
+# Upper bound on Place Details calls in flight across the whole process.
+PLACES_MAX_WORKERS = int(os.getenv("PLACES_MAX_WORKERS", "8"))
+# Per-call deadline (seconds) for a single Places API request.
+PLACES_DETAILS_TIMEOUT = float(os.getenv("PLACES_DETAILS_TIMEOUT", "5"))
+
+# Number of per-host connection pools to keep (one per Maps API host in use).
+PLACES_POOL_CONNECTIONS = int(os.getenv("PLACES_POOL_CONNECTIONS", "4"))
+# Keep-alive connections kept open per host. Defaults to one per worker.
+PLACES_POOL_MAXSIZE = int(os.getenv("PLACES_POOL_MAXSIZE", str(PLACES_MAX_WORKERS)))
+
+# Connection cap for each event loop's async client (all calls go to one host).
+PLACES_ASYNC_MAX_CONNECTIONS = int(os.getenv("PLACES_ASYNC_MAX_CONNECTIONS", "100"))
+
+# Process-wide Places request budget. The concurrency limit starts at
+# PLACES_MAX_CONCURRENCY and adapts (AIMD) to OVER_QUERY_LIMIT / HTTP 429.
+PLACES_QPS = float(os.getenv("PLACES_QPS", "50"))
+PLACES_BURST = int(os.getenv("PLACES_BURST", "20"))
+PLACES_MAX_CONCURRENCY = int(os.getenv("PLACES_MAX_CONCURRENCY", "32"))
+PLACES_OVERLOAD_RETRIES = int(os.getenv("PLACES_OVERLOAD_RETRIES", "2"))
+PLACES_OVERLOAD_BACKOFF = float(os.getenv("PLACES_OVERLOAD_BACKOFF", "0.5"))
+
+_limiter = RateLimiter(
+    qps=PLACES_QPS, burst=PLACES_BURST, max_concurrency=PLACES_MAX_CONCURRENCY
+)
+
+# Place Details cache: in-process LRU, plus SQLite when PLACES_CACHE_DB is set.
+PLACES_CACHE_SIZE = int(os.getenv("PLACES_CACHE_SIZE", "1024"))
+PLACES_CACHE_TTL = float(os.getenv("PLACES_CACHE_TTL", "86400"))
+# NOT_FOUND answers are cached separately, for a much shorter time.
+PLACES_NEGATIVE_CACHE_TTL = float(os.getenv("PLACES_NEGATIVE_CACHE_TTL", "300"))
+PLACES_CACHE_DB = os.getenv("PLACES_CACHE_DB")
+
+_details_cache = TieredCache(
+    maxsize=PLACES_CACHE_SIZE,
+    ttl=PLACES_CACHE_TTL,
+    db_path=PLACES_CACHE_DB,
+    table="place_details",
+)
+
+# Text Search cache: normalized query -> candidate list, shared by all sessions.
+PLACES_QUERY_CACHE_SIZE = int(os.getenv("PLACES_QUERY_CACHE_SIZE", "4096"))
+PLACES_QUERY_CACHE_TTL = float(os.getenv("PLACES_QUERY_CACHE_TTL", "3600"))
+
+_search_cache = TieredCache(
+    maxsize=PLACES_QUERY_CACHE_SIZE,
+    ttl=PLACES_QUERY_CACHE_TTL,
+    db_path=PLACES_CACHE_DB,
+    table="text_search",
+)
+
+# Lean mode builds results from the Text Search payload and only calls Place
+# Details for places missing one of PLACES_LEAN_REQUIRED_FIELDS. Text Search
+# never returns editorial_summary, so add it there to always get highlights.
+PLACES_LEAN_MODE = os.getenv("PLACES_LEAN_MODE", "false").lower() in ("1", "true", "yes")
+PLACES_LEAN_REQUIRED_FIELDS = [
+    field.strip()
+    for field in os.getenv(
+        "PLACES_LEAN_REQUIRED_FIELDS", "name,formatted_address,geometry"
+    ).split(",")
+    if field.strip()
+]
+
+# Local pre-ranking of Text Search candidates before any Details call.
+PLACES_RANKING = os.getenv("PLACES_RANKING", "true").lower() in ("1", "true", "yes")
+# Candidates scoring below this are dropped (unless none pass at all).
+PLACES_RANK_MIN_SCORE = float(os.getenv("PLACES_RANK_MIN_SCORE", "0.5"))
+# A best match this strong and this far ahead of the next one is returned alone.
+PLACES_RANK_CONFIDENT_SCORE = float(os.getenv("PLACES_RANK_CONFIDENT_SCORE", "0.85"))
+PLACES_RANK_CONFIDENT_MARGIN = float(os.getenv("PLACES_RANK_CONFIDENT_MARGIN", "0.15"))
+# Distance (km) at which the location score has dropped to ~37%.
+PLACES_RANK_DISTANCE_KM = float(os.getenv("PLACES_RANK_DISTANCE_KM", "25"))
+
+_DETAILS_URL = "https://maps.googleapis.com/maps/api/place/details/json"
+_TEXT_SEARCH_URL = "https://maps.googleapis.com/maps/api/place/textsearch/json"
+
+# Text Search result fields kept in the search cache.
+_SEARCH_RESULT_FIELDS = (
+    "place_id",
+    "name",
+    "formatted_address",
+    "geometry",
+    "rating",
+    "photos",
+    "business_status",
+)
+
+_US_STATES = {
+    "alabama": "al", "alaska": "ak", "arizona": "az", "arkansas": "ar",
+    "california": "ca", "colorado": "co", "connecticut": "ct", "delaware": "de",
+    "district of columbia": "dc", "florida": "fl", "georgia": "ga", "hawaii": "hi",
+    "idaho": "id", "illinois": "il", "indiana": "in", "iowa": "ia",
+    "kansas": "ks", "kentucky": "ky", "louisiana": "la", "maine": "me",
+    "maryland": "md", "massachusetts": "ma", "michigan": "mi", "minnesota": "mn",
+    "mississippi": "ms", "missouri": "mo", "montana": "mt", "nebraska": "ne",
+    "nevada": "nv", "new hampshire": "nh", "new jersey": "nj", "new mexico": "nm",
+    "new york": "ny", "north carolina": "nc", "north dakota": "nd", "ohio": "oh",
+    "oklahoma": "ok", "oregon": "or", "pennsylvania": "pa", "rhode island": "ri",
+    "south carolina": "sc", "south dakota": "sd", "tennessee": "tn", "texas": "tx",
+    "utah": "ut", "vermont": "vt", "virginia": "va", "washington": "wa",
+    "west virginia": "wv", "wisconsin": "wi", "wyoming": "wy",
+}
+# Longest names first so "west virginia" wins over "virginia".
+_US_STATE_PATTERN = re.compile(
+    r"\b("
+    + "|".join(sorted((re.escape(n) for n in _US_STATES), key=len, reverse=True))
+    + r")\b",
+    re.IGNORECASE,
+)
+_US_STATE_CODES = frozenset(_US_STATES.values())
+# A two-letter state code typed after a final comma, e.g. "Portland, in".
+_TRAILING_STATE_CODE = re.compile(r",\s*([a-z]{2})\s*$", re.IGNORECASE)
+_QUERY_STOPWORDS = {"a", "an", "the", "in", "at", "near", "of", "on", "located"}
+
+_session: Optional[requests.Session] = None
+_session_lock = threading.Lock()
+
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = (
+    weakref.WeakKeyDictionary()
+)
+
+_details_executor: Optional[concurrent.futures.ThreadPoolExecutor] = None
+_details_executor_lock = threading.Lock()
+
+
+def _get_details_executor() -> concurrent.futures.ThreadPoolExecutor:
+    """Returns the process-wide worker pool used for Place Details calls."""
+    global _details_executor
+    if _details_executor is None:
+        with _details_executor_lock:
+            if _details_executor is None:
+                _details_executor = concurrent.futures.ThreadPoolExecutor(
+                    max_workers=PLACES_MAX_WORKERS,
+                    thread_name_prefix="places-details",
+                )
+    return _details_executor
+
+
+def _get_session() -> requests.Session:
+    """
+    Returns the process-wide HTTP session used for all Places API calls.
+
+    The session keeps TLS connections alive between calls. Its pools are thread
+    safe, and `pool_block` makes callers wait for a free connection instead of
+    opening more than PLACES_POOL_MAXSIZE per host.
+    """
+    global _session
+    if _session is None:
+        with _session_lock:
+            if _session is None:
+                adapter = HTTPAdapter(
+                    pool_connections=PLACES_POOL_CONNECTIONS,
+                    pool_maxsize=PLACES_POOL_MAXSIZE,
+                    pool_block=True,
+                )
+                session = requests.Session()
+                session.mount("https://", adapter)
+                _session = session
+    return _session
+
+
+def _places_get(url: str, params: Dict[str, str]) -> Dict[str, Any]:
+    """
+    GETs a Places endpoint through the shared rate limiter and returns its JSON.
+
+    HTTP 429 and OVER_QUERY_LIMIT answers shrink the concurrency limit and are
+    retried with exponential backoff, up to PLACES_OVERLOAD_RETRIES times. After
+    that an OVER_QUERY_LIMIT body is returned for the caller to report.
+    """
+    for attempt in range(PLACES_OVERLOAD_RETRIES + 1):
+        with _limiter.acquire():
+            response = _get_session().get(
+                url, params=params, timeout=PLACES_DETAILS_TIMEOUT
+            )
+        data = _read_places_response(response.status_code, response)
+        if data is not None:
+            return data
+        if attempt < PLACES_OVERLOAD_RETRIES:
+            time.sleep(PLACES_OVERLOAD_BACKOFF * 2**attempt)
+
+    response.raise_for_status()
+    return response.json()
+
+
+def _read_places_response(
+    status_code: int, response: Union[requests.Response, httpx.Response]
+) -> Optional[Dict[str, Any]]:
+    """
+    Reports the outcome to the limiter. Returns None if the call was throttled.
+    """
+    if status_code == 429:
+        _limiter.record(overloaded=True)
+        return None
+    response.raise_for_status()
+    data = response.json()
+    overloaded = data.get("status") == "OVER_QUERY_LIMIT"
+    _limiter.record(overloaded=overloaded)
+    return None if overloaded else data
+
+
+def get_places_limiter_stats() -> Dict[str, float]:
+    """
+    Returns the Places rate limiter's concurrency limit and queue-wait metrics.
+    """
+    return _limiter.stats()
 
 
 # --- Helper Function: Get Photo URL ---
@@ -29,8 +247,42 @@ def get_place_details(
 ) -> Union[Dict[str, Any], Dict[str, str]]:
     """
     Fetches detailed information for a specific place using its place_id.
+
+    Answers are served from the Place Details cache when possible. Successful
+    lookups and NOT_FOUND answers are cached; other errors are not.
+    """
+    cached = _details_cache.get(place_id)
+    if cached is not None:
+        return cached
+
+    details = _fetch_place_details(place_id, api_key)
+    _cache_place_details(place_id, details)
+    return details
+
+
+def _fetch_place_details(
+    place_id: str, api_key: str
+) -> Union[Dict[str, Any], Dict[str, str]]:
+    """
+    Calls the Place Details API for a specific place_id.
+    """
+    try:
+        return _parse_details_response(
+            _places_get(_DETAILS_URL, _details_params(place_id, api_key))
+        )
+
+    except requests.exceptions.RequestException as e:
+        return {"error": f"Network error fetching place details: {e}"}
+    except Exception as e:
+        return {
+            "error": f"An unexpected error occurred during place details fetch: {e}"
+        }
+
+
+def _details_params(place_id: str, api_key: str) -> Dict[str, str]:
+    """
+    Builds the Place Details query parameters.
     """
-    details_url = "https://maps.googleapis.com/maps/api/place/details/json"
     fields = [
         "place_id",  # Ensure place_id is requested
         "name",
@@ -41,31 +293,549 @@ def get_place_details(
         "photo",
         "business_status",
     ]
-    params = {"place_id": place_id, "key": api_key, "fields": ",".join(fields)}
+    return {"place_id": place_id, "key": api_key, "fields": ",".join(fields)}
+
+
+def _parse_details_response(
+    details_data: Dict[str, Any]
+) -> Union[Dict[str, Any], Dict[str, str]]:
+    """
+    Returns the place from a Place Details response, or an error dict.
+    """
+    status = details_data.get("status")
+    if status == "OK":
+        return details_data.get("result", {})
+    else:
+        error_message = details_data.get(
+            "error_message", f"Place Details API Error: {status}"
+        )
+        return {"error": error_message, "status": status}
+
+
+def _cache_place_details(
+    place_id: str, details: Union[Dict[str, Any], Dict[str, str]]
+) -> None:
+    """
+    Caches a Place Details answer unless it is a transient error.
+    """
+    if "error" not in details:
+        _details_cache.set(place_id, details)
+    elif details.get("status") == "NOT_FOUND":
+        _details_cache.set(place_id, details, ttl=PLACES_NEGATIVE_CACHE_TTL)
+
+
+# --- Helper Function: Format Place ---
+def _format_place(details: Dict[str, Any], api_key: str) -> Dict[str, Any]:
+    """
+    Formats a Place Details result into the shape of a `Business` record.
+    """
+    # Safely access geometry and location data
+    geometry_data = details.get("geometry")
+    location_data = {}  # Default to empty dict
+    if isinstance(geometry_data, dict):
+        location_data = geometry_data.get("location", {})
+
+    lat_val = None
+    lng_val = None
+    if isinstance(location_data, dict):  # Ensure location_data is a dict before .get
+        lat_val = location_data.get("lat")
+        lng_val = location_data.get("lng")
+
+    # Safely access editorial summary
+    highlights = ""
+    editorial_summary_data = details.get("editorial_summary")
+    if isinstance(editorial_summary_data, dict):  # Ensure editorial_summary_data is a dict
+        highlights = editorial_summary_data.get("overview", "")
+
+    # Safely access photos
+    photos_list_data = details.get("photos")
+    if not isinstance(photos_list_data, list):  # Ensure photos_list_data is a list
+        photos_list_data = []  # Default to empty list if not a list or missing
+    image_url = get_photo_url(photos_list_data, api_key)
+
+    actual_place_id = details.get("place_id", "")  # Get the actual place_id from details
+    map_url = (
+        f"https://www.google.com/maps/place/?q=place_id:{actual_place_id}"
+        if actual_place_id
+        else ""
+    )
+
+    return {
+        "place_name": details.get("name", ""),
+        "address": details.get("formatted_address", ""),
+        "lat": str(lat_val) if lat_val is not None else "",
+        "long": str(lng_val) if lng_val is not None else "",
+        "review_ratings": details.get("rating", 0.0),
+        "highlights": highlights,
+        "image_url": image_url,
+        "map_url": map_url,  # Populated map_url
+        "place_id": actual_place_id,  # Populated place_id
+    }
+
+
+# --- Helper Function: Fetch Details Concurrently ---
+def _get_place_details_concurrently(
+    place_ids: List[str], api_key: str
+) -> List[Union[Dict[str, Any], Dict[str, str]]]:
+    """
+    Fetches details for several places on the shared worker pool.
+
+    Results are returned in the same order as `place_ids`. A call that does not
+    finish within PLACES_DETAILS_TIMEOUT seconds is reported as an error entry
+    instead of holding up the other results.
+    """
+    futures = [
+        _get_details_executor().submit(get_place_details, p_id, api_key)
+        for p_id in place_ids
+    ]
+    deadline = time.monotonic() + PLACES_DETAILS_TIMEOUT
+
+    results = []
+    for p_id, future in zip(place_ids, futures):
+        try:
+            results.append(
+                future.result(timeout=max(0.0, deadline - time.monotonic()))
+            )
+        except concurrent.futures.TimeoutError:
+            future.cancel()
+            results.append(
+                {"error": f"Timed out after {PLACES_DETAILS_TIMEOUT}s fetching place details."}
+            )
+        except Exception as e:
+            results.append(
+                {"error": f"An unexpected error occurred during place details fetch: {e}"}
+            )
+    return results
+
+
+def normalize_query(query: str) -> str:
+    """
+    Normalizes a business search so that spelling variants share a cache key.
+
+    "Not Just Coffee in Charlotte, North Carolina" and
+    "not just coffee charlotte nc" both become "not just coffee charlotte nc".
+    A state code is kept even when it is also a stopword, so "Portland, IN"
+    becomes "portland in" while "in Portland" becomes "portland".
+    """
+    text = query.replace("&", " and ")
+    if text.isupper():
+        text = text.casefold()
+    text = re.sub(r"['\u2019]", "", text)  # "Joe's" -> "joes"
+    text = " ".join(text.split())
+    # State names and codes are upper-cased so that Indiana's "IN" survives the
+    # stopword pass below while the preposition "in" does not.
+    text = _US_STATE_PATTERN.sub(lambda m: _US_STATES[m.group(1).casefold()].upper(), text)
+    text = _TRAILING_STATE_CODE.sub(
+        lambda m: ", " + m.group(1).upper()
+        if m.group(1).casefold() in _US_STATE_CODES
+        else m.group(0),
+        text,
+    )
+    text = re.sub(r"[^\w\s]", " ", text)
+    return " ".join(
+        t.casefold()
+        for t in text.split()
+        if t.casefold() not in _QUERY_STOPWORDS
+        or (t.isupper() and t.casefold() in _US_STATE_CODES)
+    )
+
+
+# --- Local Candidate Ranking ---
+_TRIGRAM_DIM = 1024
+_LOCATION_SPLIT = re.compile(r"\s+(?:in|near|at)\s+|,", re.IGNORECASE)
+
+
+def _trigram_matrix(texts: List[str]) -> np.ndarray:
+    """
+    Hashes each text's character trigrams into an L2-normalized row vector.
+    """
+    matrix = np.zeros((len(texts), _TRIGRAM_DIM), dtype=np.float32)
+    for row, text in enumerate(texts):
+        padded = f"  {text} "
+        for i in range(len(padded) - 2):
+            matrix[row, zlib.crc32(padded[i : i + 3].encode()) % _TRIGRAM_DIM] += 1.0
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.where(norms == 0, 1.0, norms)
+
+
+def _haversine_km(lat: np.ndarray, lng: np.ndarray, lat0: float, lng0: float) -> np.ndarray:
+    """
+    Great-circle distances (km) from every (lat, lng) to (lat0, lng0).
+    """
+    lat, lng, lat0, lng0 = map(np.radians, (lat, lng, lat0, lng0))
+    a = (
+        np.sin((lat - lat0) / 2) ** 2
+        + np.cos(lat) * np.cos(lat0) * np.sin((lng - lng0) / 2) ** 2
+    )
+    return 6371.0 * 2 * np.arcsin(np.sqrt(np.clip(a, 0.0, 1.0)))
+
+
+def _score_candidates(query: str, candidates: List[Dict[str, Any]]) -> np.ndarray:
+    """
+    Scores how well each candidate matches the business and place in `query`.
+
+    The name score mixes trigram cosine similarity with how many of the
+    candidate's name tokens the user typed. The location score checks that the
+    stated city/state appear in the address and how far the candidate is from
+    the other candidates in that city. No geocoding call is made.
+    """
+    parts = _LOCATION_SPLIT.split(query, maxsplit=1)
+    name_part, location_part = parts[0], parts[1] if len(parts) > 1 else ""
+    query_name = normalize_query(name_part) or normalize_query(query)
+    query_tokens = set(normalize_query(query).split())
+    names = [normalize_query(c.get("name", "")) for c in candidates]
+
+    cosine = _trigram_matrix(names) @ _trigram_matrix([query_name])[0]
+    coverage = np.array(
+        [
+            len(set(name.split()) & query_tokens) / max(1, len(name.split()))
+            for name in names
+        ],
+        dtype=np.float32,
+    )
+    name_score = 0.5 * cosine + 0.5 * coverage
+
+    location_tokens = set(normalize_query(location_part).split())
+    if location_tokens:
+        locality = np.array(
+            [
+                len(location_tokens & set(normalize_query(address).split()))
+                / len(location_tokens)
+                for address in (c.get("formatted_address", "") for c in candidates)
+            ],
+            dtype=np.float32,
+        )
+    else:
+        locality = np.ones(len(candidates), dtype=np.float32)
+
+    locations = [(c.get("geometry") or {}).get("location") or {} for c in candidates]
+    coords = np.array(
+        [[loc.get("lat", np.nan), loc.get("lng", np.nan)] for loc in locations],
+        dtype=np.float64,
+    )
+    geo = np.full(len(candidates), 0.5, dtype=np.float32)
+    has_coords = ~np.isnan(coords).any(axis=1)
+    if has_coords.any():
+        # The stated city's position is taken as the median of the candidates
+        # whose address matches it best.
+        in_city = has_coords & (locality >= locality.max())
+        center = np.median(coords[in_city if in_city.any() else has_coords], axis=0)
+        distances = _haversine_km(
+            coords[has_coords, 0], coords[has_coords, 1], center[0], center[1]
+        )
+        geo[has_coords] = np.exp(-distances / PLACES_RANK_DISTANCE_KM)
+
+    if location_tokens:
+        return 0.7 * name_score + 0.2 * locality + 0.1 * geo
+    return 0.85 * name_score + 0.15 * geo
+
+
+def _rank_candidates(
+    query: str, candidates: List[Dict[str, Any]], top_k: int
+) -> List[Dict[str, Any]]:
+    """
+    Picks which Text Search candidates are worth a Details call.
+
+    Candidates are ordered by local score and those under PLACES_RANK_MIN_SCORE
+    are dropped. A clear winner is returned on its own. If nothing scores well
+    enough, Text Search's own top `top_k` are kept.
+    """
+    if not PLACES_RANKING or len(candidates) <= 1:
+        return candidates[:top_k]
+
+    scores = _score_candidates(query, candidates)
+    order = np.argsort(-scores, kind="stable")
+    ranked = [int(i) for i in order if scores[i] >= PLACES_RANK_MIN_SCORE][:top_k]
+    if not ranked:
+        return candidates[:top_k]
+
+    best = scores[ranked[0]]
+    runner_up = scores[order[1]]
+    if (
+        best >= PLACES_RANK_CONFIDENT_SCORE
+        and best - runner_up >= PLACES_RANK_CONFIDENT_MARGIN
+    ):
+        ranked = ranked[:1]
+    return [candidates[i] for i in ranked]
+
+
+def _search_places(
+    query: str, api_key: str
+) -> Union[List[Dict[str, Any]], Dict[str, str]]:
+    """
+    Returns the candidates Text Search finds for `query`, or an error dict.
+
+    Each candidate keeps the place_id and the `_SEARCH_RESULT_FIELDS` of the
+    search payload. Results are cached under the normalized query, so repeat
+    and reworded searches skip the network round trip.
+    """
+    cache_key = normalize_query(query)
+    cached = _search_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    search_data = _places_get(_TEXT_SEARCH_URL, {"query": query, "key": api_key})
+    return _parse_search_response(cache_key, search_data)
+
+
+def _parse_search_response(
+    cache_key: str, search_data: Dict[str, Any]
+) -> Union[List[Dict[str, Any]], Dict[str, str]]:
+    """
+    Turns a Text Search response into cached candidates, or an error dict.
+    """
+    search_status = search_data.get("status")
+    if search_status == "ZERO_RESULTS":
+        _search_cache.set(cache_key, [], ttl=PLACES_NEGATIVE_CACHE_TTL)
+        return []
+    elif search_status != "OK":
+        error_message = search_data.get(
+            "error_message", f"Text Search API Error: {search_status}"
+        )
+        return {"error": error_message, "status": search_status}
+
+    candidates = [
+        {field: place[field] for field in _SEARCH_RESULT_FIELDS if field in place}
+        for place in search_data.get("results", [])
+        if place.get("place_id")
+    ]
+    _search_cache.set(cache_key, candidates)
+    return candidates
+
+
+def _complete_candidates(
+    candidates: List[Dict[str, Any]], api_key: str
+) -> List[Union[Dict[str, Any], Dict[str, str]]]:
+    """
+    Lean mode: uses Text Search candidates as place details where possible.
+
+    A cached Place Details result is preferred when there is one. Otherwise a
+    Details call is only made for candidates missing a required field. If that
+    call fails the candidate is still returned with what search provided.
+    """
+    results, needs_details = _lean_results(candidates)
+    fetched = _get_place_details_concurrently(
+        [candidates[index]["place_id"] for index in needs_details], api_key
+    )
+    _merge_lean_details(candidates, results, needs_details, fetched)
+    return results
+
+
+def _lean_results(
+    candidates: List[Dict[str, Any]]
+) -> Tuple[List[Dict[str, Any]], List[int]]:
+    """
+    Returns the lean results so far and the indexes that still need Details.
+    """
+    results: List[Dict[str, Any]] = []
+    needs_details = []
+    for index, candidate in enumerate(candidates):
+        cached = _details_cache.get(candidate["place_id"])
+        if cached is not None and "error" not in cached:
+            results.append(cached)
+            continue
+        results.append(candidate)
+        if any(not candidate.get(field) for field in PLACES_LEAN_REQUIRED_FIELDS):
+            needs_details.append(index)
+    return results, needs_details
+
+
+def _merge_lean_details(
+    candidates: List[Dict[str, Any]],
+    results: List[Dict[str, Any]],
+    needs_details: List[int],
+    fetched: List[Union[Dict[str, Any], Dict[str, str]]],
+) -> None:
+    """
+    Replaces incomplete lean results with the Details that were fetched.
+    """
+    for index, details in zip(needs_details, fetched):
+        if "error" not in details:
+            results[index] = details
+        else:
+            logging.warning(
+                f"Using search data for place_id {candidates[index]['place_id']}: "
+                f"{details.get('error')}"
+            )
+
+
+def _format_places(
+    place_ids: List[str],
+    all_details: List[Union[Dict[str, Any], Dict[str, str]]],
+    api_key: str,
+) -> List[Dict[str, Any]]:
+    """
+    Formats the places that have details, logging the ones that failed.
+    """
+    formatted_places_list = []
+    for p_id, details in zip(place_ids, all_details):
+        if "error" not in details:
+            formatted_places_list.append(_format_place(details, api_key))
+        else:
+            logging.warning(
+                f"Could not get details for place_id {p_id}: {details.get('error')}"
+            )
+    return formatted_places_list
+
+
+def find_business_from_google_maps(
+    query: str, max_results: int = 4
+) -> Union[Dict[str, List[Dict[str, Any]]], Dict[str, str]]:
+    """
+    Fetches details for multiple businesses and formats them as specified.
+    """
+    api_key = os.getenv("GOOGLE_PLACES_API_KEY")
+    if not api_key:
+        return {"error": "GOOGLE_PLACES_API_KEY environment variable not set or empty."}
 
     try:
-        response = requests.get(details_url, params=params)
-        response.raise_for_status()
-        details_data = response.json()
+        search_result = _search_places(query, api_key)
+        if isinstance(search_result, dict):
+            return search_result
+
+        candidates = _rank_candidates(query, search_result, max_results)
+        place_ids_from_search = [candidate["place_id"] for candidate in candidates]
 
-        status = details_data.get("status")
-        if status == "OK":
-            return details_data.get("result", {})
+        if PLACES_LEAN_MODE:
+            all_details = _complete_candidates(candidates, api_key)
         else:
-            error_message = details_data.get(
-                "error_message", f"Place Details API Error: {status}"
+            # Details calls are independent, so fan them out and keep search order.
+            all_details = _get_place_details_concurrently(
+                place_ids_from_search, api_key
             )
-            return {"error": error_message, "status": status}
+
+        return {
+            "places": _format_places(place_ids_from_search, all_details, api_key)
+        }
 
     except requests.exceptions.RequestException as e:
+        return {"error": f"Network error during business search: {e}"}
+    except Exception as e:
+        return {"error": f"An unexpected error occurred during business search: {e}"}
+
+
+# --- Async Variants ---
+# These share the caches and response handling above but use one httpx
+# AsyncClient per event loop, so in-flight lookups do not hold a thread.
+
+
+def _get_async_client() -> httpx.AsyncClient:
+    """
+    Returns the pooled keep-alive HTTP client for the running event loop.
+    """
+    loop = asyncio.get_running_loop()
+    client = _async_clients.get(loop)
+    if client is None or client.is_closed:
+        client = httpx.AsyncClient(
+            limits=httpx.Limits(
+                max_connections=PLACES_ASYNC_MAX_CONNECTIONS,
+                max_keepalive_connections=PLACES_POOL_MAXSIZE,
+            ),
+            timeout=PLACES_DETAILS_TIMEOUT,
+        )
+        _async_clients[loop] = client
+    return client
+
+
+async def _places_get_async(url: str, params: Dict[str, str]) -> Dict[str, Any]:
+    """
+    Async version of `_places_get`, sharing its rate limiter.
+    """
+    for attempt in range(PLACES_OVERLOAD_RETRIES + 1):
+        async with _limiter.acquire_async():
+            response = await _get_async_client().get(url, params=params)
+        data = _read_places_response(response.status_code, response)
+        if data is not None:
+            return data
+        if attempt < PLACES_OVERLOAD_RETRIES:
+            await asyncio.sleep(PLACES_OVERLOAD_BACKOFF * 2**attempt)
+
+    response.raise_for_status()
+    return response.json()
+
+
+async def close_async_client() -> None:
+    """
+    Closes the running event loop's HTTP client, e.g. on worker shutdown.
+    """
+    client = _async_clients.pop(asyncio.get_running_loop(), None)
+    if client is not None:
+        await client.aclose()
+
+
+async def get_place_details_async(
+    place_id: str, api_key: str
+) -> Union[Dict[str, Any], Dict[str, str]]:
+    """
+    Async version of `get_place_details`, sharing its cache.
+    """
+    cached = _details_cache.get(place_id)
+    if cached is not None:
+        return cached
+
+    try:
+        details = _parse_details_response(
+            await _places_get_async(_DETAILS_URL, _details_params(place_id, api_key))
+        )
+    except httpx.HTTPError as e:
         return {"error": f"Network error fetching place details: {e}"}
     except Exception as e:
         return {
             "error": f"An unexpected error occurred during place details fetch: {e}"
         }
 
+    _cache_place_details(place_id, details)
+    return details
 
-def find_business_from_google_maps(
+
+async def _get_place_details_concurrently_async(
+    place_ids: List[str], api_key: str
+) -> List[Union[Dict[str, Any], Dict[str, str]]]:
+    """
+    Fetches details for several places concurrently, keeping their order.
+    """
+
+    return list(
+        await asyncio.gather(
+            *(_get_place_details_with_deadline_async(p_id, api_key) for p_id in place_ids)
+        )
+    )
+
+
+async def _get_place_details_with_deadline_async(
+    place_id: str, api_key: str
+) -> Union[Dict[str, Any], Dict[str, str]]:
+    """
+    `get_place_details_async` bounded by PLACES_DETAILS_TIMEOUT.
+    """
+    try:
+        return await asyncio.wait_for(
+            get_place_details_async(place_id, api_key), PLACES_DETAILS_TIMEOUT
+        )
+    except asyncio.TimeoutError:
+        return {
+            "error": f"Timed out after {PLACES_DETAILS_TIMEOUT}s fetching place details."
+        }
+
+
+async def _search_places_async(
+    query: str, api_key: str
+) -> Union[List[Dict[str, Any]], Dict[str, str]]:
+    """
+    Async version of `_search_places`, sharing its cache.
+    """
+    cache_key = normalize_query(query)
+    cached = _search_cache.get(cache_key)
+    if cached is not None:
+        return cached
+
+    search_data = await _places_get_async(
+        _TEXT_SEARCH_URL, {"query": query, "key": api_key}
+    )
+    return _parse_search_response(cache_key, search_data)
+
+
+async def find_business_from_google_maps_async(
     query: str, max_results: int = 4
 ) -> Union[Dict[str, List[Dict[str, Any]]], Dict[str, str]]:
     """
@@ -75,94 +845,88 @@ def find_business_from_google_maps(
     if not api_key:
         return {"error": "GOOGLE_PLACES_API_KEY environment variable not set or empty."}
 
-    search_url = "https://maps.googleapis.com/maps/api/place/textsearch/json"
-    search_params = {"query": query, "key": api_key, "fields": "place_id"}
+    try:
+        search_result = await _search_places_async(query, api_key)
+        if isinstance(search_result, dict):
+            return search_result
 
-    formatted_places_list = []
+        candidates = _rank_candidates(query, search_result, max_results)
+        place_ids_from_search = [candidate["place_id"] for candidate in candidates]
 
-    try:
-        search_response = requests.get(search_url, params=search_params)
-        search_response.raise_for_status()
-        search_data = search_response.json()
-
-        search_status = search_data.get("status")
-        if search_status == "ZERO_RESULTS":
-            return {"places": []}
-        elif search_status != "OK":
-            error_message = search_data.get(
-                "error_message", f"Text Search API Error: {search_status}"
+        if PLACES_LEAN_MODE:
+            all_details, needs_details = _lean_results(candidates)
+            fetched = await _get_place_details_concurrently_async(
+                [candidates[index]["place_id"] for index in needs_details], api_key
+            )
+            _merge_lean_details(candidates, all_details, needs_details, fetched)
+        else:
+            all_details = await _get_place_details_concurrently_async(
+                place_ids_from_search, api_key
             )
-            return {"error": error_message, "status": search_status}
-
-        place_ids_from_search = [
-            place.get("place_id")
-            for place in search_data.get("results", [])
-            if place.get("place_id")
-        ]
-
-        for p_id in place_ids_from_search[
-            :max_results
-        ]:  # Use p_id to avoid conflict with details['place_id']
-            details = get_place_details(p_id, api_key)
-            if "error" not in details:
-                # Safely access geometry and location data
-                geometry_data = details.get("geometry")
-                location_data = {} # Default to empty dict
-                if isinstance(geometry_data, dict):
-                    location_data = geometry_data.get("location", {})
-
-                lat_val = None
-                lng_val = None
-                if isinstance(location_data, dict): # Ensure location_data is a dict before .get
-                    lat_val = location_data.get("lat")
-                    lng_val = location_data.get("lng")
-
-                # Safely access editorial summary
-                highlights = ""
-                editorial_summary_data = details.get("editorial_summary")
-                if isinstance(editorial_summary_data, dict): # Ensure editorial_summary_data is a dict
-                    highlights = editorial_summary_data.get("overview", "")
-                
-                # Safely access photos
-                photos_list_data = details.get("photos")
-                if not isinstance(photos_list_data, list): # Ensure photos_list_data is a list
-                    photos_list_data = []  # Default to empty list if not a list or missing
-                image_url = get_photo_url(photos_list_data, api_key)
-
-                actual_place_id = details.get(
-                    "place_id", ""
-                )  # Get the actual place_id from details
-                map_url = (
-                    f"https://www.google.com/maps/place/?q=place_id:{actual_place_id}"
-                    if actual_place_id
-                    else ""
-                )
-
-                formatted_place = {
-                    "place_name": details.get("name", ""),
-                    "address": details.get("formatted_address", ""),
-                    "lat": str(lat_val) if lat_val is not None else "",
-                    "long": str(lng_val) if lng_val is not None else "",
-                    "review_ratings": details.get("rating", 0.0),
-                    "highlights": highlights,
-                    "image_url": image_url,
-                    "map_url": map_url,  # Populated map_url
-                    "place_id": actual_place_id,  # Populated place_id
-                }
-                formatted_places_list.append(formatted_place)
-            else:
-                logging.warning(
-                    f"Could not get details for place_id {p_id}: {details.get('error')}"
-                )
 
-        return {"places": formatted_places_list}
+        return {
+            "places": _format_places(place_ids_from_search, all_details, api_key)
+        }
 
-    except requests.exceptions.RequestException as e:
+    except httpx.HTTPError as e:
         return {"error": f"Network error during business search: {e}"}
     except Exception as e:
         return {"error": f"An unexpected error occurred during business search: {e}"}
 
 
+async def find_business_from_google_maps_stream(
+    query: str, max_results: int = 4
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Finds businesses matching the query and yields each one as soon as its details arrive.
+    """
+    api_key = os.getenv("GOOGLE_PLACES_API_KEY")
+    if not api_key:
+        yield {"error": "GOOGLE_PLACES_API_KEY environment variable not set or empty."}
+        return
+
+    try:
+        search_result = await _search_places_async(query, api_key)
+    except httpx.HTTPError as e:
+        yield {"error": f"Network error during business search: {e}"}
+        return
+    if isinstance(search_result, dict):
+        yield search_result
+        return
+
+    candidates = _rank_candidates(query, search_result, max_results)
+    if PLACES_LEAN_MODE:
+        results, needs_details = _lean_results(candidates)
+        for index, details in enumerate(results):
+            if index not in needs_details:
+                yield _format_place(details, api_key)
+    else:
+        needs_details = list(range(len(candidates)))
+
+    async def fetch(index: int) -> Tuple[int, Union[Dict[str, Any], Dict[str, str]]]:
+        place_id = candidates[index]["place_id"]
+        return index, await _get_place_details_with_deadline_async(place_id, api_key)
+
+    for next_done in asyncio.as_completed([fetch(index) for index in needs_details]):
+        index, details = await next_done
+        if "error" not in details:
+            yield _format_place(details, api_key)
+        elif PLACES_LEAN_MODE:
+            yield _format_place(candidates[index], api_key)
+        else:
+            logging.warning(
+                f"Could not get details for place_id {candidates[index]['place_id']}: "
+                f"{details.get('error')}"
+            )
+
+
+def get_places_cache_stats() -> Dict[str, Dict[str, int]]:
+    """
+    Returns hit/miss counters for the Place Details and Text Search caches.
+    """
+    return {"details": _details_cache.stats(), "search": _search_cache.stats()}
+
+
 # --- Main Execution Block ---
 # if __name__ == "__main__":
 #     business_query = "Not Just Coffee in Charlotte NC"
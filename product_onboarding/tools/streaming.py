@@ -0,0 +1,48 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Function tool that streams partial results in live (bidi) sessions."""
+
+import inspect
+from typing import Any, Callable
+
+from google.adk.tools import FunctionTool, ToolContext
+from typing_extensions import override
+
+
+class StreamingFunctionTool(FunctionTool):
+    """
+    Wraps an async generator so ADK can stream what it yields.
+
+    In live sessions ADK runs async generator tools in the background and
+    feeds each yielded item back to the model as it arrives. Regular
+    (non-live) runs cannot consume a generator, so they call `fallback`
+    instead: a coroutine function with the same parameters that returns the
+    complete result.
+    """
+
+    def __init__(self, func: Callable[..., Any], fallback: Callable[..., Any]):
+        if not inspect.isasyncgenfunction(func):
+            raise TypeError(f"{func.__name__} must be an async generator function.")
+        super().__init__(func)
+        self.fallback = fallback
+
+    @override
+    async def run_async(self, *, args: dict[str, Any], tool_context: ToolContext) -> Any:
+        args_to_call = args.copy()
+        if "tool_context" in inspect.signature(self.fallback).parameters:
+            args_to_call["tool_context"] = tool_context
+        if inspect.iscoroutinefunction(self.fallback):
+            return await self.fallback(**args_to_call) or {}
+        return self.fallback(**args_to_call) or {}
@@ -18,7 +18,9 @@ import json
 import logging
 import os
 import unittest
+from io import BytesIO
 
+import PIL.Image
 import pytest
 from dotenv import load_dotenv
 from google.adk.agents.invocation_context import InvocationContext
@@ -36,7 +38,10 @@ from product_onboarding.sub_agents.kyc_check.agent import (
     check_fraud_drivers_license,
     extract_info_from_bank_statement,
     extract_info_from_drivers_license,
+    run_kyc_pipeline,
 )
+from product_onboarding.sub_agents.kyc_check import preprocess
+from product_onboarding.tools import docai
 
 
 @pytest.fixture(scope="session", autouse=True)
@@ -229,3 +234,68 @@ class TestDocAITools(unittest.TestCase):
         self.assertIn("Address", result, "Result should contain 'Address' key")
         self.assertEqual(result.get("Name"), "Brenda Sample")
         self.assertEqual(result.get("Address"), "123 Main Street\nHelena, MT 59601")
+
+    def test_run_kyc_pipeline_integration(self):
+        """Tests run_kyc_pipeline on both sample documents sent in one message."""
+        parts = []
+        for file_path, mime_type in [
+            ("tests/data/DL-brenda-sample.jpeg", "image/jpeg"),
+            ("tests/data/Bank-Statement-brenda-sample.pdf", "application/pdf"),
+        ]:
+            with open(file_path, "rb") as f:
+                parts.append(
+                    genai_types.Part(
+                        inline_data=genai_types.Blob(data=f.read(), mime_type=mime_type)
+                    )
+                )
+        invoc_context_with_files = InvocationContext(
+            session_service=session_service,
+            artifact_service=artifact_service,
+            invocation_id="test_kyc_pipeline",
+            agent=root_agent,
+            session=self.session,
+            user_content=genai_types.Content(parts=parts),
+        )
+        tool_context_with_files = ToolContext(
+            invocation_context=invoc_context_with_files
+        )
+
+        result = run_kyc_pipeline("verify my documents", tool_context_with_files)
+
+        logging.info(f"KYC Pipeline Result: {result}")
+        self.assertEqual(result["verdict"], "verified", result)
+        self.assertEqual(result["drivers_license"]["name"], "BRENDA SAMPLE")
+        self.assertEqual(result["bank_statement"]["name"], "Brenda Sample")
+
+    def test_normalized_phone_photo_extracts_same_fields(self):
+        """Tests that a normalized phone-sized photo of the sample license
+        extracts the same fields as the original, from a fraction of the bytes."""
+        processor_name_env = os.getenv("DL_PROCESSOR_FULLPATH")
+        self.assertIsNotNone(processor_name_env, "DL_PROCESSOR_FULLPATH env var not set.")
+
+        file_path = "tests/data/DL-brenda-sample.jpeg"
+        with PIL.Image.open(file_path) as image:
+            large = image.convert("RGB").resize((4032, round(4032 * image.height / image.width)))
+        exif = PIL.Image.Exif()
+        exif[0x0112] = 6  # Stored sideways, as a phone held in portrait would
+        output = BytesIO()
+        large.transpose(PIL.Image.Transpose.ROTATE_90).save(
+            output, format="JPEG", quality=95, exif=exif
+        )
+        phone_bytes = output.getvalue()
+
+        normalized, mime_type = preprocess.normalize_image(phone_bytes, "image/jpeg")
+        self.assertLess(len(normalized) * 3, len(phone_bytes))
+
+        with open(file_path, "rb") as f:
+            original = docai.process_document(processor_name_env, f.read(), "image/jpeg")
+        from_normalized = docai.process_document(processor_name_env, normalized, mime_type)
+
+        def fields(document):
+            return {
+                entity.type_: entity.mention_text
+                for entity in document.entities
+                if entity.type_ in ("Given Names", "Family Name", "Address")
+            }
+
+        self.assertEqual(fields(from_normalized), fields(original))
@@ -0,0 +1,83 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Document AI results, uploads and a ToolContext shared by the KYC tests."""
+
+from google.cloud import documentai
+from google.genai import types
+
+PROCESSORS = {
+    "ID_PROOFING_PROCESSOR_FULLPATH": "projects/p/locations/us/processors/idp",
+    "DL_PROCESSOR_FULLPATH": "projects/p/locations/us/processors/dl",
+    "BANK_STATEMENT_PROCESSOR_FULLPATH": "projects/p/locations/us/processors/bank",
+}
+
+
+def document_with(**entities):
+    return documentai.Document(
+        entities=[
+            documentai.Document.Entity(type_=type_, mention_text=text)
+            for type_, text in entities.items()
+        ]
+    )
+
+
+DOCUMENTS = {
+    "idp": document_with(fraud_signals_is_identity_document="PASS"),
+    "dl": documentai.Document(
+        entities=[
+            documentai.Document.Entity(type_="Given Names", mention_text="BRENDA"),
+            documentai.Document.Entity(type_="Family Name", mention_text="SAMPLE"),
+            documentai.Document.Entity(
+                type_="Address", mention_text="123 MAIN STREET\nHELENA, MT 59601"
+            ),
+        ]
+    ),
+    "bank": document_with(
+        client_name="Brenda Sample", client_address="123 Main Street\nHelena, MT 59601"
+    ),
+}
+
+
+class FakeToolContext:
+    """Minimal stand-in for ToolContext with an in-memory artifact store."""
+
+    def __init__(self, parts, artifacts=None):
+        self.user_content = types.Content(parts=parts)
+        self.artifacts = artifacts if artifacts is not None else {}
+
+    def save_artifact(self, filename, artifact):
+        self.artifacts[filename] = artifact
+        return 0
+
+    def load_artifact(self, filename):
+        return self.artifacts.get(filename)
+
+
+def inline_part(data, mime_type):
+    return types.Part(inline_data=types.Blob(data=data, mime_type=mime_type))
+
+
+def png_header(width, height):
+    """A PNG header of the given size, enough for the classifier."""
+    return (
+        b"\x89PNG\r\n\x1a\n\x00\x00\x00\rIHDR"
+        + width.to_bytes(4, "big")
+        + height.to_bytes(4, "big")
+    )
+
+
+# Uploads the classifier is confident about.
+LICENSE_PNG = png_header(600, 386)
+STATEMENT_PDF = b"%PDF-1.7 /Type /Pages /Count 3 /MediaBox [0 0 612 792]"
@@ -0,0 +1,80 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the shared cache helpers."""
+
+import os
+import tempfile
+import time
+import unittest
+
+from product_onboarding.shared_libraries.cache import TieredCache, TTLCache
+
+
+class TestTTLCache(unittest.TestCase):
+    """Test cases for the in-process LRU cache."""
+
+    def test_evicts_least_recently_used(self):
+        cache = TTLCache(maxsize=2, ttl=60)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+        cache.set("c", 3)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("c"), 3)
+
+    def test_entries_expire(self):
+        cache = TTLCache(maxsize=10, ttl=60)
+        cache.set("short", "x", ttl=0.05)
+        cache.set("long", "y")
+        time.sleep(0.1)
+
+        self.assertIsNone(cache.get("short"))
+        self.assertEqual(cache.get("long"), "y")
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+    def test_evicts_down_to_max_bytes(self):
+        cache = TTLCache(maxsize=10, ttl=60, max_bytes=9)
+        cache.set("a", b"1234")
+        cache.set("b", b"5678")
+        cache.set("a", b"12")
+        cache.set("c", b"9012")
+        cache.set("too-big", bytes(10))
+
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual(cache.get("a"), b"12")
+        self.assertIsNone(cache.get("too-big"))
+        self.assertEqual(cache.nbytes, 6)
+
+
+class TestTieredCache(unittest.TestCase):
+    """Test cases for the memory + SQLite cache."""
+
+    def test_disk_tier_survives_a_new_process(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = os.path.join(tmp, "cache.sqlite3")
+            TieredCache(maxsize=10, ttl=60, db_path=db_path).set("k", {"v": 1})
+
+            fresh = TieredCache(maxsize=10, ttl=60, db_path=db_path)
+            self.assertEqual(fresh.get("k"), {"v": 1})
+            self.assertEqual(fresh.get("k"), {"v": 1})
+            self.assertIsNone(fresh.get("missing"))
+
+            stats = fresh.stats()
+            self.assertEqual(stats["disk_hits"], 1)
+            self.assertEqual(stats["memory_hits"], 1)
+            self.assertEqual(stats["misses"], 1)
+            fresh.disk.close()
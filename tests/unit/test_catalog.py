@@ -0,0 +1,141 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Offline tests for the product catalog and recommendation scorer."""
+
+import unittest
+
+from google.adk.tools import FunctionTool
+from google.genai import types
+
+from product_onboarding.sub_agents.product_recommender import catalog, prompt
+
+
+def _names(result):
+    return [r["name"].split(" ", 2)[-1] for r in result["recommendations"]]
+
+
+class TestRecommendTerminals(unittest.TestCase):
+    """Test cases for recommend_terminals."""
+
+    def test_coffee_shop_gets_counter_terminals(self):
+        result = catalog.recommend_terminals("coffee shop", current_pos="Square Register")
+
+        self.assertEqual(_names(result), ["Station Solo", "Mini"])
+        self.assertEqual(result["business_segments"], ["quick-service restaurants"])
+        self.assertIn(
+            "Built for quick-service restaurants", result["recommendations"][0]["reasons"]
+        )
+
+    def test_mobile_low_volume_business(self):
+        result = catalog.recommend_terminals("Food truck", volume="low", mobile=True)
+
+        self.assertEqual(_names(result), ["Go", "Flex"])
+
+    def test_needs_drive_the_ranking_and_report_gaps(self):
+        result = catalog.recommend_terminals(
+            "full-service restaurant",
+            volume="high",
+            needs=["table management", "tableside_ordering", "teleportation"],
+        )
+
+        self.assertEqual(_names(result), ["Station Duo", "Flex"])
+        self.assertEqual(result["recommendations"][0]["gaps"], ["No tableside ordering"])
+        self.assertEqual(result["ignored_needs"], ["teleportation"])
+
+    def test_remote_invoicing_business(self):
+        result = catalog.recommend_terminals(
+            "online consulting",
+            remote_payments=True,
+            needs=["invoicing", "recurring_payments"],
+        )
+
+        self.assertEqual(_names(result)[0], "Virtual Terminal")
+
+    def test_business_type_keywords_match_whole_words(self):
+        segments = {
+            business_type: catalog.business_segments(business_type)
+            for business_type in [
+                "Spanish tapas restaurant",
+                "velvet boutique",
+                "bookkeeping firm",
+                "Italian restaurant",
+                "quick-service restaurant",
+            ]
+        }
+
+        self.assertEqual(
+            segments,
+            {
+                "Spanish tapas restaurant": {catalog.FULL_SERVICE_RESTAURANT},
+                "velvet boutique": {catalog.RETAIL},
+                "bookkeeping firm": set(),
+                "Italian restaurant": {catalog.FULL_SERVICE_RESTAURANT},
+                "quick-service restaurant": {catalog.QUICK_SERVICE_RESTAURANT},
+            },
+        )
+        self.assertEqual(
+            _names(catalog.recommend_terminals("Italian restaurant"))[0],
+            "Station Duo",
+        )
+
+    def test_needs_given_as_a_string(self):
+        result = catalog.recommend_terminals("", needs="inventory, loyalty")
+
+        self.assertNotIn("ignored_needs", result)
+        self.assertEqual(
+            result["recommendations"][0]["reasons"], ["Supports inventory", "Supports loyalty"]
+        )
+
+    def test_mobility_is_inferred_from_current_pos(self):
+        self.assertIs(catalog.pos_is_mobile("Square Register"), False)
+        self.assertIs(catalog.pos_is_mobile("Square Reader"), True)
+        self.assertIsNone(catalog.pos_is_mobile("Verifone"))
+
+        result = catalog.recommend_terminals("coffee shop", current_pos="Square Reader")
+        self.assertEqual(_names(result), ["Flex", "Go"])
+
+    def test_ranking_is_deterministic(self):
+        results = {
+            str(catalog.recommend_terminals("hair salon", needs=["appointments"]))
+            for _ in range(5)
+        }
+
+        self.assertEqual(len(results), 1)
+        self.assertEqual(len(catalog.recommend_terminals("")["recommendations"]), 2)
+
+    def test_declaration_has_typed_parameters(self):
+        declaration = FunctionTool(catalog.recommend_terminals)._get_declaration()
+        properties = declaration.parameters.properties
+
+        self.assertEqual(
+            {name: schema.type for name, schema in properties.items()},
+            {
+                "business_type": types.Type.STRING,
+                "current_pos": types.Type.STRING,
+                "volume": types.Type.STRING,
+                "mobile": types.Type.BOOLEAN,
+                "remote_payments": types.Type.BOOLEAN,
+                "needs": types.Type.ARRAY,
+            },
+        )
+        self.assertEqual(properties["needs"].items.type, types.Type.STRING)
+
+    def test_catalog_is_not_in_the_prompt(self):
+        self.assertNotIn("| Feature / Product", prompt.PRODUCT_RECOMENDER_AGENT_INSTR)
+        self.assertIn("recommend_terminals", prompt.PRODUCT_RECOMENDER_AGENT_INSTR)
+
+
+if __name__ == "__main__":
+    unittest.main()
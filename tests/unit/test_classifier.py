@@ -0,0 +1,141 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the local KYC document-type classifier."""
+
+import io
+import json
+import os
+import time
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from google.genai import types
+from PIL import Image
+
+from product_onboarding.sub_agents.kyc_check import agent as kyc_agent
+from product_onboarding.sub_agents.kyc_check import classifier
+from tests.unit.kyc_fixtures import png_header
+
+DATA_DIR = os.path.join(os.path.dirname(__file__), "..", "data")
+
+
+def _read(name):
+    with open(os.path.join(DATA_DIR, name), "rb") as f:
+        return memoryview(f.read())
+
+
+class TestClassifyDocument(unittest.TestCase):
+    """Test cases for classify_document on the sample documents."""
+
+    def setUp(self):
+        self.license = _read("DL-brenda-sample.jpeg")
+        self.statement = _read("Bank-Statement-brenda-sample.pdf")
+
+    def test_samples_are_classified_confidently(self):
+        license_class = classifier.classify_document(self.license, "image/jpeg")
+        statement_class = classifier.classify_document(self.statement, "application/pdf")
+
+        self.assertEqual(classifier.image_size(self.license, "image/jpeg"), (600, 386))
+        self.assertEqual(license_class[:2], (classifier.DRIVERS_LICENSE, True))
+        self.assertEqual(statement_class[:2], (classifier.BANK_STATEMENT, True))
+
+    def test_pdf_signals(self):
+        card = memoryview(b"%PDF-1.4 /Type /Pages /Count 1 /MediaBox [0 0 243 153]")
+        pages = memoryview(b"%PDF-1.4 /Type /Pages /Count 3 /MediaBox [0 0 612 792]")
+        titled = memoryview(b"%PDF-1.4 /Title (Driver License Scan)")
+
+        self.assertEqual(classifier.classify_document(card, "application/pdf").kind, "drivers_license")
+        self.assertEqual(classifier.pdf_page_count(pages), 3)
+        self.assertEqual(classifier.classify_document(pages, "application/pdf").kind, "bank_statement")
+        self.assertEqual(classifier.classify_document(titled, "application/pdf").kind, "drivers_license")
+
+    def test_photo_orientation_separates_cards_from_pages(self):
+        # A 3:2 photo is within the loose ID card range either way round.
+        landscape = memoryview(png_header(1500, 1000))
+        portrait = memoryview(png_header(1000, 1500))
+        legal = memoryview(png_header(1000, 1650))
+
+        self.assertEqual(
+            classifier.classify_document(landscape, "image/png")[:2],
+            (classifier.DRIVERS_LICENSE, True),
+        )
+        for photo in (portrait, legal):
+            self.assertEqual(
+                classifier.classify_document(photo, "image/png")[:2],
+                (classifier.BANK_STATEMENT, True),
+            )
+        self.assertIsNone(
+            classifier.mismatch_error(portrait, "image/png", classifier.BANK_STATEMENT)
+        )
+        self.assertIn(
+            "looks like a bank statement",
+            classifier.mismatch_error(portrait, "image/png", classifier.DRIVERS_LICENSE),
+        )
+
+    def test_portrait_phone_photo_is_not_a_confident_statement(self):
+        # A 4:3 portrait phone photo of a license, aspect 1.33.
+        photo = memoryview(png_header(3024, 4032))
+
+        self.assertFalse(classifier.classify_document(photo, "image/png").confident)
+        for kind in (classifier.DRIVERS_LICENSE, classifier.BANK_STATEMENT):
+            self.assertIsNone(classifier.mismatch_error(photo, "image/png", kind))
+
+    def test_exif_orientation_is_applied(self):
+        exif = Image.Exif()
+        exif[classifier._EXIF_ORIENTATION_TAG] = 6  # Stored landscape, shown portrait
+        buffer = io.BytesIO()
+        Image.new("RGB", (300, 200)).save(buffer, format="JPEG", exif=exif.tobytes())
+        photo = memoryview(buffer.getvalue())
+
+        self.assertEqual(classifier.image_size(photo, "image/jpeg"), (200, 300))
+        self.assertEqual(
+            classifier.classify_document(photo, "image/jpeg").kind, classifier.BANK_STATEMENT
+        )
+
+    def test_decision_is_under_a_millisecond(self):
+        for data, mime_type in [
+            (self.license, "image/jpeg"),
+            (self.statement, "application/pdf"),
+        ]:
+            classifier.classify_document(data, mime_type)
+            start = time.perf_counter()
+            for _ in range(20):
+                classifier.classify_document(data, mime_type)
+            self.assertLess((time.perf_counter() - start) / 20, 0.001)
+
+
+class TestToolRejection(unittest.TestCase):
+    """Test cases for rejecting mismatched uploads before calling Document AI."""
+
+    def test_license_sent_to_bank_statement_tool_is_rejected(self):
+        license_bytes = bytes(_read("DL-brenda-sample.jpeg"))
+        tool_context = SimpleNamespace(
+            user_content=types.Content(
+                parts=[types.Part(inline_data=types.Blob(data=license_bytes, mime_type="image/jpeg"))]
+            )
+        )
+        process = mock.Mock()
+        with mock.patch.object(kyc_agent.docai, "process_document", process), mock.patch.dict(
+            "os.environ", {"BANK_STATEMENT_PROCESSOR_FULLPATH": "projects/p/locations/us/processors/b"}
+        ):
+            result = json.loads(kyc_agent.extract_info_from_bank_statement("extract", tool_context))
+
+        self.assertIn("looks like a driver's license", result["error"])
+        process.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,231 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Offline tests for the Document AI helpers."""
+
+import asyncio
+import tempfile
+import threading
+import tracemalloc
+import unittest
+from types import SimpleNamespace
+from unittest import mock
+
+from google.cloud import documentai
+from google.genai import types
+
+from product_onboarding.shared_libraries.cache import TieredCache
+from product_onboarding.sub_agents.kyc_check.agent import _load_file_from_context
+from product_onboarding.tools import docai
+
+US_PROCESSOR = "projects/p/locations/us/processors/abc"
+EU_PROCESSOR = "projects/p/locations/eu/processors/def"
+
+
+class TestClientRegistry(unittest.TestCase):
+    """Test cases for the shared per-endpoint clients."""
+
+    def setUp(self):
+        docai._clients.clear()
+
+    def tearDown(self):
+        docai._clients.clear()
+
+    def test_endpoint_comes_from_processor_path(self):
+        self.assertEqual(docai._endpoint_for(EU_PROCESSOR), "eu-documentai.googleapis.com")
+        with mock.patch.dict("os.environ", {"PROCESSOR_LOCATION": "us"}):
+            self.assertEqual(docai._endpoint_for("abc"), "us-documentai.googleapis.com")
+
+    def test_one_client_per_endpoint_across_threads(self):
+        create = mock.Mock(side_effect=lambda endpoint: mock.Mock(name=endpoint))
+        clients = []
+        with mock.patch.object(docai, "_create_client", create):
+            threads = [
+                threading.Thread(target=lambda: clients.append(docai.get_client(US_PROCESSOR)))
+                for _ in range(8)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            eu_client = docai.get_client(EU_PROCESSOR)
+
+        self.assertTrue(all(client is clients[0] for client in clients))
+        self.assertIsNot(eu_client, clients[0])
+        self.assertEqual(create.call_count, 2)
+
+        docai.close_clients()
+        clients[0].transport.close.assert_called_once()
+        self.assertEqual(docai._clients, {})
+
+
+class TestPayloadCopies(unittest.TestCase):
+    """Test cases for passing document bytes to Document AI without copies."""
+
+    PAYLOAD_SIZE = 10 * 1024 * 1024
+
+    def setUp(self):
+        docai._document_cache.clear()
+
+    def test_peak_memory_stays_near_payload_size(self):
+        payload = b"%PDF" + bytes(self.PAYLOAD_SIZE - 4)
+        tool_context = SimpleNamespace(
+            user_content=types.Content(
+                parts=[
+                    types.Part(
+                        inline_data=types.Blob(data=payload, mime_type="application/pdf")
+                    )
+                ]
+            )
+        )
+        client = mock.Mock()
+        client.process_document.return_value = documentai.ProcessResponse()
+
+        with mock.patch.object(docai, "get_client", return_value=client):
+            tracemalloc.start()
+            file_bytes, mime_type = _load_file_from_context(tool_context)
+            docai.process_document(US_PROCESSOR, file_bytes, mime_type)
+            _, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+
+        request = client.process_document.call_args.kwargs["request"]
+        self.assertEqual(len(request.raw_document.content), self.PAYLOAD_SIZE)
+        # The protobuf message holds one copy; base64 used to add about three.
+        self.assertLess(peak, 1.25 * self.PAYLOAD_SIZE)
+
+    def test_partial_views_are_copied_once(self):
+        data = b"0123456789"
+        self.assertIs(docai._as_bytes(memoryview(data)), data)
+        self.assertEqual(docai._as_bytes(memoryview(data)[2:5]), b"234")
+        self.assertEqual(docai._as_bytes(bytearray(b"ab")), b"ab")
+
+
+class TestDocumentCache(unittest.TestCase):
+    """Test cases for the content-addressed parsed-document cache."""
+
+    def setUp(self):
+        docai._document_cache.clear()
+        self.client = mock.Mock()
+        self.client.process_document.return_value = documentai.ProcessResponse(
+            document=documentai.Document(text="Jane Doe")
+        )
+        patcher = mock.patch.object(docai, "get_client", return_value=self.client)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.addCleanup(docai._document_cache.clear)
+
+    def test_same_bytes_are_parsed_once_per_processor_version(self):
+        hits_before = docai.get_document_cache_stats()["hits"]
+        first = docai.process_document(US_PROCESSOR, b"license", "image/jpeg")
+        second = docai.process_document(US_PROCESSOR, memoryview(b"license"), "image/jpeg")
+        docai.process_document(f"{US_PROCESSOR}/processorVersions/v2", b"license", "image/jpeg")
+        docai.process_document(EU_PROCESSOR, b"license", "image/jpeg")
+        docai.process_document(US_PROCESSOR, b"statement", "application/pdf")
+
+        self.assertEqual(first.text, "Jane Doe")
+        self.assertEqual(second, first)
+        docai.process_document(US_PROCESSOR, b"statement", "application/pdf", first_pages=1)
+        request = self.client.process_document.call_args.kwargs["request"]
+        self.assertEqual(request.process_options.from_start, 1)
+        self.assertEqual(self.client.process_document.call_count, 5)
+        self.assertEqual(docai.get_document_cache_stats()["hits"] - hits_before, 1)
+
+    def test_concurrent_calls_share_one_parse(self):
+        started = threading.Event()
+
+        def slow_process(request):
+            started.set()
+            threading.Event().wait(0.05)
+            return documentai.ProcessResponse(document=documentai.Document(text="x"))
+
+        self.client.process_document.side_effect = slow_process
+        threads = [
+            threading.Thread(
+                target=docai.process_document, args=(US_PROCESSOR, b"same", "image/png")
+            )
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(self.client.process_document.call_count, 1)
+
+    def test_disk_tier_survives_restart_and_is_size_bounded(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            db_path = f"{tmp}/docai.sqlite3"
+
+            def new_cache():
+                return TieredCache(
+                    maxsize=8,
+                    ttl=60,
+                    db_path=db_path,
+                    table="documents",
+                    serialize=bytes,
+                    deserialize=bytes,
+                    max_bytes=1024,
+                    disk_max_bytes=1024,
+                )
+
+            with mock.patch.object(docai, "_document_cache", new_cache()) as cache:
+                docai.process_document(US_PROCESSOR, b"license", "image/jpeg")
+                cache.disk.close()
+            with mock.patch.object(docai, "_document_cache", new_cache()) as cache:
+                document = docai.process_document(US_PROCESSOR, b"license", "image/jpeg")
+                self.assertEqual(document.text, "Jane Doe")
+                self.assertEqual(cache.stats()["disk_hits"], 1)
+
+                cache.set("big-1", bytes(600))
+                cache.set("big-2", bytes(600))
+                self.assertLessEqual(cache.stats()["memory_bytes"], 1024)
+                self.assertIsNone(cache.disk.get("big-1"))
+                cache.disk.close()
+
+        self.assertEqual(self.client.process_document.call_count, 1)
+
+
+class TestProcessDocumentAsync(unittest.TestCase):
+    """Test cases for the asyncio Document AI path."""
+
+    def setUp(self):
+        docai._document_cache.clear()
+        self.addCleanup(docai._document_cache.clear)
+
+    def test_concurrent_calls_share_one_request_and_the_cache(self):
+        client = mock.Mock()
+
+        async def process(request):
+            await asyncio.sleep(0.05)
+            return documentai.ProcessResponse(document=documentai.Document(text="x"))
+
+        client.process_document = mock.AsyncMock(side_effect=process)
+
+        async def run():
+            same = [
+                docai.process_document_async(US_PROCESSOR, b"same", "image/png")
+                for _ in range(5)
+            ]
+            other = docai.process_document_async(EU_PROCESSOR, b"same", "image/png")
+            return await asyncio.gather(*same, other)
+
+        with mock.patch.object(docai, "get_async_client", return_value=client):
+            documents = asyncio.run(run())
+        # The blocking path is served from the same cache.
+        with mock.patch.object(docai, "get_client") as get_client:
+            docai.process_document(US_PROCESSOR, b"same", "image/png")
+            get_client.assert_not_called()
+
+        self.assertEqual({d.text for d in documents}, {"x"})
+        self.assertEqual(client.process_document.await_count, 2)
@@ -0,0 +1,151 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Offline tests for the local knowledge base index."""
+
+import os
+import shutil
+import tempfile
+import time
+import unittest
+from unittest import mock
+
+from product_onboarding.sub_agents.product_recommender import agent as recommender_agent
+from product_onboarding.sub_agents.product_recommender import kb_index
+
+DOCUMENTS = {
+    "flex.txt": (
+        "The Flex is a handheld terminal. It accepts tap to pay, chip and swipe. "
+        "The Flex battery lasts a full shift. It prints receipts on thermal paper."
+    ),
+    "mini.html": (
+        "<html><head><style>p {color: red}</style></head><body>"
+        "<h1>Mini</h1><p>The Mini is a countertop terminal with a 7 inch screen.</p>"
+        "<p>The Mini supports a cash drawer and a kitchen printer.</p></body></html>"
+    ),
+    "station.md": "# Station\nThe Station supports inventory management and employee shifts.",
+    "notes.bin": "ignored",
+}
+
+
+class TestKnowledgeBaseIndex(unittest.TestCase):
+    """Test cases for building and searching the index."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.docs = os.path.join(self.directory, "docs")
+        os.makedirs(self.docs)
+        for name, text in DOCUMENTS.items():
+            with open(os.path.join(self.docs, name), "w") as f:
+                f.write(text)
+        self.index_dir = os.path.join(self.directory, "index")
+        with mock.patch("builtins.print"):
+            kb_index.main(["build", self.docs, "-o", self.index_dir])
+        self.index = kb_index.KnowledgeBaseIndex(self.index_dir)
+
+    def test_build_indexes_supported_documents(self):
+        self.assertEqual(
+            sorted(p.title for p in self.index.passages), ["flex", "mini", "station"]
+        )
+        self.assertNotIn("color", " ".join(p.text for p in self.index.passages))
+
+    def test_spec_lookup_is_confident_and_fast(self):
+        start = time.perf_counter()
+        answer = self.index.answer("Does the Flex accept tap to pay?")
+        elapsed = time.perf_counter() - start
+
+        self.assertLess(elapsed, 0.01)
+        self.assertAlmostEqual(answer["coverage"], 1.0, places=5)
+        self.assertTrue(answer["references"][0]["uri"].endswith("flex.txt"))
+        self.assertIn("tap to pay", answer["answerText"].splitlines()[0])
+
+    def test_partial_match_is_not_confident(self):
+        answer = self.index.answer("Does the Flex support loyalty rewards?")
+
+        self.assertLess(answer["coverage"], kb_index.KB_INDEX_MIN_COVERAGE)
+        self.assertIsNone(self.index.answer("loyalty rewards"))
+
+    def test_long_documents_are_split_into_overlapping_passages(self):
+        words = [f"word{i}" for i in range(450)]
+        count = kb_index.build_index(
+            [("uri", "long", " ".join(words))], os.path.join(self.directory, "long")
+        )
+        index = kb_index.KnowledgeBaseIndex(os.path.join(self.directory, "long"))
+
+        self.assertEqual(count, 3)
+        self.assertEqual(len(index.search("word175", k=5)), 2)
+
+
+class TestKnowledgebaseSearchFallback(unittest.TestCase):
+    """Test cases for the local index in knowledgebase_search_agent."""
+
+    ENV = {
+        "GOOGLE_CLOUD_PROJECT": "p",
+        "VERTEX_AI_SEARCH_LOCATION": "us",
+        "VERTEX_AI_SEARCH_ENGINE_ID": "engine",
+    }
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        kb_index.build_index([("gs://kb/flex.txt", "flex", DOCUMENTS["flex.txt"])], directory)
+        patchers = [
+            mock.patch.dict("os.environ", self.ENV),
+            mock.patch.object(
+                kb_index, "get_index", return_value=kb_index.KnowledgeBaseIndex(directory)
+            ),
+            mock.patch.object(recommender_agent, "_cached_answer", return_value=None),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_confident_lookup_skips_vertex_ai_search(self):
+        with mock.patch.object(recommender_agent.vaisearch, "vertex_ai_search") as search:
+            answer = recommender_agent.knowledgebase_search_agent(
+                "Flex tap to pay?", mock.Mock()
+            )
+
+        search.assert_not_called()
+        self.assertEqual(answer["references"], [{"uri": "gs://kb/flex.txt", "title": "flex"}])
+        self.assertNotIn("degraded", answer)
+
+    def test_confident_lookup_skips_the_semantic_cache(self):
+        with mock.patch.object(
+            recommender_agent, "_cached_answer", return_value=None
+        ) as cached, mock.patch.object(recommender_agent.vaisearch, "vertex_ai_search"):
+            answer = recommender_agent.knowledgebase_search_agent(
+                "Flex tap to pay?", mock.Mock()
+            )
+
+        cached.assert_not_called()
+        self.assertIn("tap to pay", answer["answerText"])
+
+    def test_local_index_answers_when_vertex_ai_search_fails(self):
+        with mock.patch.object(
+            recommender_agent.vaisearch,
+            "vertex_ai_search",
+            side_effect=RuntimeError("503 unavailable"),
+        ):
+            answer = recommender_agent.knowledgebase_search_agent(
+                "Flex warranty and battery?", mock.Mock()
+            )
+
+        self.assertTrue(answer["degraded"])
+        self.assertIn("battery", answer["answerText"])
+
+
+if __name__ == "__main__":
+    unittest.main()
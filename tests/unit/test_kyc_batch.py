@@ -0,0 +1,150 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Offline tests for the bulk KYC CLI, against a local fake processor."""
+
+import asyncio
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from product_onboarding import kyc_batch
+from tests.unit.kyc_fixtures import DOCUMENTS, PROCESSORS
+
+
+class TestKycBatch(unittest.TestCase):
+    """Test cases for kyc_batch."""
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        self.calls = []
+        self.failing = set()
+
+        async def process_document_async(processor_name, image_buffer, mime_type, first_pages=None):
+            processor = processor_name.rsplit("/", 1)[-1]
+            self.calls.append(processor)
+            if bytes(image_buffer) in self.failing:
+                raise RuntimeError("quota exceeded")
+            await asyncio.sleep(0)
+            return DOCUMENTS[processor]
+
+        patchers = [
+            mock.patch.dict("os.environ", PROCESSORS),
+            mock.patch.object(
+                kyc_batch.docai, "process_document_async", process_document_async
+            ),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def _packet(self, packet_id, license_bytes=b"\xff\xd8\xff\xe0", statement=True):
+        packet_dir = os.path.join(self.directory, "packets", packet_id)
+        os.makedirs(packet_dir)
+        with open(os.path.join(packet_dir, "license.jpg"), "wb") as f:
+            f.write(license_bytes)
+        if statement:
+            with open(os.path.join(packet_dir, "statement.pdf"), "wb") as f:
+                f.write(b"%PDF-1.7")
+
+    def _report(self):
+        with open(os.path.join(self.directory, "report.jsonl")) as f:
+            return [json.loads(line) for line in f]
+
+    def _run(self, *args):
+        with mock.patch("builtins.print"):
+            return kyc_batch.main(
+                [
+                    os.path.join(self.directory, "packets"),
+                    "-o",
+                    os.path.join(self.directory, "report.jsonl"),
+                    *args,
+                ]
+            )
+
+    def test_directory_packets_get_pipeline_verdicts(self):
+        self._packet("a")
+        self._packet("b", statement=False)
+
+        self.assertEqual(self._run(), 0)
+
+        verdicts = {r["packet_id"]: r["verdict"] for r in self._report()}
+        self.assertEqual(verdicts, {"a": "verified", "b": "incomplete"})
+        self.assertCountEqual(self.calls, ["idp", "dl", "bank", "idp", "dl"])
+
+    def test_resume_skips_finished_packets_and_retries_errors(self):
+        self._packet("a")
+        self._packet("b", license_bytes=b"\xff\xd8\xff\xe0bad")
+        self.failing.add(b"\xff\xd8\xff\xe0bad")
+        self.assertEqual(self._run(), 1)
+
+        self.failing.clear()
+        self.calls.clear()
+        self.assertEqual(self._run(), 0)
+
+        self.assertCountEqual(self.calls, ["idp", "dl", "bank"])
+        records = self._report()
+        self.assertCountEqual(
+            [(r["packet_id"], r["verdict"]) for r in records],
+            [("a", "verified"), ("b", "error"), ("b", "verified")],
+        )
+        self.assertEqual(records[-1]["packet_id"], "b")
+
+    def test_unexpected_exception_is_recorded_for_its_packet_only(self):
+        self._packet("a")
+        self._packet("b")
+        verify = kyc_batch.kyc_agent.verify_kyc_documents_async
+
+        async def verify_or_crash(documents):
+            if bytes(documents["drivers_license"].data) == b"crash":
+                raise KeyError("entities")
+            return await verify(documents)
+
+        self._packet("c", license_bytes=b"crash")
+        with mock.patch.object(
+            kyc_batch.kyc_agent, "verify_kyc_documents_async", verify_or_crash
+        ):
+            self.assertEqual(self._run(), 1)
+
+        records = {r["packet_id"]: r for r in self._report()}
+        self.assertEqual(records["a"]["verdict"], "verified")
+        self.assertEqual(records["b"]["verdict"], "verified")
+        self.assertEqual(records["c"]["verdict"], "error")
+        self.assertIn("entities", records["c"]["errors"][0])
+
+    def test_jsonl_manifest_and_truncated_checkpoint(self):
+        self._packet("a")
+        manifest = os.path.join(self.directory, "manifest.jsonl")
+        with open(manifest, "w") as f:
+            files = ["packets/a/license.jpg", "packets/a/statement.pdf"]
+            f.write(json.dumps({"packet_id": "a", "files": files}) + "\n")
+        report = os.path.join(self.directory, "report.jsonl")
+        with open(report, "w") as f:
+            f.write('{"packet_id": "a", "verd')
+
+        with mock.patch("builtins.print"):
+            kyc_batch.main([manifest, "-o", report])
+
+        with open(report) as f:
+            lines = f.read().splitlines()
+        self.assertEqual(json.loads(lines[-1])["verdict"], "verified")
+        self.assertEqual(len(lines), 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
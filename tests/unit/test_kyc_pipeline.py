@@ -0,0 +1,249 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Offline tests for the single-shot KYC pipeline tool."""
+
+import asyncio
+import threading
+import time
+import unittest
+from unittest import mock
+
+from google.genai import types
+
+from product_onboarding.sub_agents.kyc_check import agent as kyc_agent
+from tests.unit.kyc_fixtures import (
+    DOCUMENTS,
+    LICENSE_PNG,
+    PROCESSORS,
+    STATEMENT_PDF,
+    FakeToolContext,
+    document_with,
+    inline_part,
+    png_header,
+)
+
+
+class TestStatementPageSelection(unittest.TestCase):
+    """Test cases for processing only the first pages of a bank statement."""
+
+    STATEMENT = b"%PDF-1.7 /Type /Pages /Count 12 /MediaBox [0 0 612 792]"
+
+    def _extract(self, documents_by_pages):
+        calls = []
+
+        def process_document(processor_name, image_buffer, mime_type, first_pages=None):
+            calls.append(first_pages)
+            return documents_by_pages[first_pages]
+
+        with mock.patch.object(kyc_agent.docai, "process_document", process_document):
+            document = kyc_agent._extract_bank_statement(
+                PROCESSORS["BANK_STATEMENT_PROCESSOR_FULLPATH"],
+                memoryview(self.STATEMENT),
+                "application/pdf",
+            )
+        return document, calls
+
+    def test_first_page_is_enough(self):
+        document, calls = self._extract({1: DOCUMENTS["bank"]})
+
+        self.assertEqual(calls, [kyc_agent.KYC_STATEMENT_PAGES])
+        self.assertIs(document, DOCUMENTS["bank"])
+
+    def test_expands_to_whole_statement_when_entities_are_missing(self):
+        document, calls = self._extract(
+            {1: document_with(client_name="Brenda Sample"), None: DOCUMENTS["bank"]}
+        )
+
+        self.assertEqual(calls, [1, None])
+        self.assertIs(document, DOCUMENTS["bank"])
+
+
+class TestLoadDocuments(unittest.TestCase):
+    """Test cases for reading every document part of a message."""
+
+    def test_returns_every_document_with_detected_type_without_copying(self):
+        license_bytes = b"\xff\xd8\xff\xe0license"
+        statement_bytes = b"%PDF-1.7 statement"
+        tool_context = FakeToolContext(
+            [
+                types.Part(text="here are my documents"),
+                inline_part(license_bytes, "application/octet-stream"),
+                inline_part(statement_bytes, "image/jpeg"),
+                inline_part(b"plain text", "text/plain"),
+            ]
+        )
+
+        documents = kyc_agent._load_documents_from_context(tool_context)
+
+        self.assertEqual(
+            [(d.mime_type, d.kind) for d in documents],
+            [("image/jpeg", "drivers_license"), ("application/pdf", "bank_statement")],
+        )
+        self.assertIs(documents[0].data.obj, license_bytes)
+        self.assertIs(documents[1].data.obj, statement_bytes)
+
+    def test_single_file_loader_prefers_requested_kind(self):
+        tool_context = FakeToolContext(
+            [inline_part(b"%PDF-1.7", "application/pdf"), inline_part(b"\x89PNG\r\n\x1a\n", "image/png")]
+        )
+
+        _, mime_type = kyc_agent._load_file_from_context(tool_context, "drivers_license")
+        self.assertEqual(mime_type, "image/png")
+        _, mime_type = kyc_agent._load_file_from_context(tool_context)
+        self.assertEqual(mime_type, "application/pdf")
+
+
+class TestRunKycPipeline(unittest.TestCase):
+    """Test cases for run_kyc_pipeline."""
+
+    def setUp(self):
+        self.calls = []
+        self.barrier = threading.Barrier(3, timeout=5)
+
+        def process_document(processor_name, image_buffer, mime_type, first_pages=None):
+            self.calls.append((processor_name.rsplit("/", 1)[-1], mime_type))
+            if self.barrier is not None:
+                # Returns only once all three calls are in flight together.
+                self.barrier.wait()
+            return DOCUMENTS[processor_name.rsplit("/", 1)[-1]]
+
+        patchers = [
+            mock.patch.dict("os.environ", PROCESSORS),
+            mock.patch.object(kyc_agent.docai, "process_document", process_document),
+        ]
+        for patcher in patchers:
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def test_processors_run_concurrently_and_verdict_is_merged(self):
+        tool_context = FakeToolContext(
+            [inline_part(b"jpeg", "image/jpeg"), inline_part(b"%PDF", "application/pdf")]
+        )
+
+        result = kyc_agent.run_kyc_pipeline("verify", tool_context)
+
+        self.assertCountEqual(
+            self.calls,
+            [("idp", "image/jpeg"), ("dl", "image/jpeg"), ("bank", "application/pdf")],
+        )
+        self.assertEqual(result["verdict"], "verified")
+        self.assertTrue(result["names_match"])
+        self.assertTrue(result["addresses_match"])
+        self.assertEqual(result["drivers_license"]["name"], "BRENDA SAMPLE")
+
+    def test_documents_from_earlier_turns_are_reused(self):
+        self.barrier = None
+        artifacts = {}
+
+        first = kyc_agent.run_kyc_pipeline(
+            "verify", FakeToolContext([inline_part(LICENSE_PNG, "image/png")], artifacts)
+        )
+        second = kyc_agent.run_kyc_pipeline(
+            "verify", FakeToolContext([inline_part(STATEMENT_PDF, "application/pdf")], artifacts)
+        )
+
+        self.assertEqual(first["verdict"], "incomplete")
+        self.assertEqual(first["missing_documents"], ["bank_statement"])
+        self.assertEqual(second["verdict"], "verified")
+
+    def test_unclassified_upload_does_not_replace_saved_document(self):
+        license_part = inline_part(LICENSE_PNG, "image/png")
+        artifacts = {"kyc_drivers_license": license_part}
+
+        documents = kyc_agent._collect_kyc_documents(
+            FakeToolContext([inline_part(b"jpeg", "image/jpeg")], artifacts)
+        )
+
+        self.assertFalse(documents["drivers_license"].confident)
+        self.assertIs(artifacts["kyc_drivers_license"], license_part)
+
+    def test_portrait_license_photo_does_not_replace_saved_statement(self):
+        statement_part = inline_part(STATEMENT_PDF, "application/pdf")
+        artifacts = {"kyc_bank_statement": statement_part}
+
+        documents = kyc_agent._collect_kyc_documents(
+            FakeToolContext([inline_part(png_header(3024, 4032), "image/png")], artifacts)
+        )
+
+        self.assertEqual(documents["drivers_license"].kind, "drivers_license")
+        self.assertIs(documents["bank_statement"].part, statement_part)
+        self.assertIs(artifacts["kyc_bank_statement"], statement_part)
+
+    def test_portrait_statement_photo_is_kept_as_statement(self):
+        artifacts = {}
+        statement_part = inline_part(png_header(1000, 1500), "image/png")
+
+        documents = kyc_agent._collect_kyc_documents(
+            FakeToolContext([inline_part(LICENSE_PNG, "image/png"), statement_part], artifacts)
+        )
+
+        self.assertEqual(documents["bank_statement"].part, statement_part)
+        self.assertIs(artifacts["kyc_bank_statement"], statement_part)
+        self.assertEqual(artifacts["kyc_drivers_license"].inline_data.data, LICENSE_PNG)
+
+    def test_failed_fraud_signal_wins(self):
+        self.barrier = None
+        tool_context = FakeToolContext([inline_part(b"jpeg", "image/jpeg")])
+        with mock.patch.dict(
+            DOCUMENTS, {"idp": document_with(fraud_signals_is_identity_document="FAIL")}
+        ):
+            result = kyc_agent.run_kyc_pipeline("verify", tool_context)
+
+        self.assertEqual(result["verdict"], "fraud_detected")
+        self.assertEqual(len(result["fraud_signals"]), 1)
+
+
+class TestRunKycPipelineAsync(unittest.TestCase):
+    """Test cases for run_kyc_pipeline_async."""
+
+    def test_many_verifications_in_flight_on_one_loop(self):
+        in_flight = 0
+        peak = 0
+
+        async def process_document_async(processor_name, image_buffer, mime_type, first_pages=None):
+            nonlocal in_flight, peak
+            in_flight += 1
+            peak = max(peak, in_flight)
+            await asyncio.sleep(0.1)
+            in_flight -= 1
+            return DOCUMENTS[processor_name.rsplit("/", 1)[-1]]
+
+        async def verify_many(count):
+            return await asyncio.gather(
+                *(
+                    kyc_agent.run_kyc_pipeline_async(
+                        "verify",
+                        FakeToolContext(
+                            [inline_part(b"jpeg", "image/jpeg"), inline_part(b"%PDF", "application/pdf")]
+                        ),
+                    )
+                    for _ in range(count)
+                )
+            )
+
+        with mock.patch.dict("os.environ", PROCESSORS), mock.patch.object(
+            kyc_agent.docai, "process_document_async", process_document_async
+        ):
+            start = time.monotonic()
+            results = asyncio.run(verify_many(40))
+            elapsed = time.monotonic() - start
+
+        self.assertTrue(all(r["verdict"] == "verified" for r in results))
+        self.assertEqual(peak, 120)
+        self.assertLess(elapsed, 2.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
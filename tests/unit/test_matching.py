@@ -0,0 +1,82 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the KYC name and address matching engine."""
+
+import unittest
+
+import numpy as np
+
+from product_onboarding.sub_agents.kyc_check import matching
+
+
+class TestNormalization(unittest.TestCase):
+    """Test cases for name and address normalization."""
+
+    def test_name_ignores_case_order_titles_and_initials(self):
+        self.assertEqual(matching.normalize_name("SAMPLE, BRENDA A."), "brenda sample")
+        self.assertEqual(matching.normalize_name("Mrs. Brenda Sample Jr"), "brenda sample")
+
+    def test_address_uses_postal_abbreviations_and_unit_numbers(self):
+        expected = "123 main st unit 4b helena mt 59601"
+        self.assertEqual(
+            matching.normalize_address("123 Main Street, Apt. 4B\nHelena, Montana 59601-1234"),
+            expected,
+        )
+        self.assertEqual(matching.normalize_address("123 MAIN ST #4b HELENA MT 59601"), expected)
+        self.assertEqual(
+            matching.normalize_address("1 Ocean Dr, Miami, FL 33101"), "1 ocean dr miami fl 33101"
+        )
+
+
+class TestMatchPairs(unittest.TestCase):
+    """Test cases for the batch matching API."""
+
+    def test_batch_decisions(self):
+        result = matching.match_pairs(
+            ["BRENDA SAMPLE", "John Smith", "Brenda Sample", None],
+            ["Brenda A Sample", "Jane Smith", "Sample Brenda", "Brenda Sample"],
+            [
+                "123 MAIN STREET\nHELENA, MT 59601",
+                "5 Elm Road",
+                "10 Oak Ave",
+                "1 A St",
+            ],
+            [
+                "123 Main Street\nHelena, MT 59601",
+                "7 Elm Rd",
+                "10 Oak Avenue Apt 3",
+                "1 A St",
+            ],
+        )
+
+        np.testing.assert_array_equal(result["names_match"], [True, False, True, False])
+        np.testing.assert_array_equal(result["addresses_match"], [True, False, True, True])
+        self.assertTrue(np.isnan(result["name_score"][3]))
+        self.assertEqual(result["address_score"][1], 0.0)
+
+    def test_thousands_of_pairs_in_one_call(self):
+        names = ["Brenda Sample", "Brenda Smith"] * 2500
+        addresses = [f"{i} Main Street" for i in range(5000)]
+        result = matching.match_pairs(
+            names, ["Sample, Brenda"] * 5000, addresses, addresses[::-1]
+        )
+
+        self.assertEqual(result["name_score"].shape, (5000,))
+        self.assertEqual(int(result["names_match"].sum()), 2500)
+        self.assertEqual(int(result["addresses_match"].sum()), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
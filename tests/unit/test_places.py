@@ -0,0 +1,343 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Offline tests for the Places tool helpers."""
+
+import asyncio
+import os
+import time
+import unittest
+from unittest import mock
+
+import httpx
+
+from product_onboarding.tools import places
+from product_onboarding.tools.streaming import StreamingFunctionTool
+
+
+class TestPlaceDetailsFanOut(unittest.TestCase):
+    """Tests for the concurrent Place Details fan-out."""
+
+    def test_results_keep_search_order(self):
+        delays = {"a": 0.3, "b": 0.1, "c": 0.2}
+
+        def fake_details(place_id, api_key):
+            time.sleep(delays[place_id])
+            return {"place_id": place_id}
+
+        with mock.patch.object(places, "get_place_details", fake_details):
+            start = time.monotonic()
+            results = places._get_place_details_concurrently(["a", "b", "c"], "key")
+            elapsed = time.monotonic() - start
+
+        self.assertEqual([r["place_id"] for r in results], ["a", "b", "c"])
+        # One round trip, not the sum of all three.
+        self.assertLess(elapsed, 0.5)
+
+    def test_slow_call_is_reported_as_error(self):
+        def fake_details(place_id, api_key):
+            if place_id == "slow":
+                time.sleep(0.5)
+            return {"place_id": place_id}
+
+        with mock.patch.object(places, "get_place_details", fake_details), \
+                mock.patch.object(places, "PLACES_DETAILS_TIMEOUT", 0.1):
+            results = places._get_place_details_concurrently(["fast", "slow"], "key")
+
+        self.assertEqual(results[0], {"place_id": "fast"})
+        self.assertIn("error", results[1])
+
+
+class TestPlacesSession(unittest.TestCase):
+    """Tests for the shared keep-alive session."""
+
+    def test_session_is_shared_across_threads(self):
+        sessions = list(
+            places._get_details_executor().map(lambda _: places._get_session(), range(8))
+        )
+        self.assertTrue(all(s is sessions[0] for s in sessions))
+
+        adapter = sessions[0].get_adapter("https://maps.googleapis.com")
+        self.assertEqual(adapter._pool_maxsize, places.PLACES_POOL_MAXSIZE)
+
+
+class TestPlaceDetailsCache(unittest.TestCase):
+    """Tests for the Place Details cache."""
+
+    def setUp(self):
+        places._details_cache.clear()
+
+    def test_repeat_lookup_is_served_from_cache(self):
+        fetch = mock.Mock(return_value={"place_id": "p1", "name": "Cafe"})
+        with mock.patch.object(places, "_fetch_place_details", fetch):
+            places.get_place_details("p1", "key")
+            result = places.get_place_details("p1", "key")
+
+        self.assertEqual(result["name"], "Cafe")
+        self.assertEqual(fetch.call_count, 1)
+
+    def test_not_found_is_cached_but_other_errors_are_not(self):
+        fetch = mock.Mock(
+            side_effect=[
+                {"error": "gone", "status": "NOT_FOUND"},
+                {"error": "Network error fetching place details: boom"},
+                {"error": "Network error fetching place details: boom"},
+            ]
+        )
+        with mock.patch.object(places, "_fetch_place_details", fetch):
+            places.get_place_details("missing", "key")
+            places.get_place_details("missing", "key")
+            places.get_place_details("flaky", "key")
+            places.get_place_details("flaky", "key")
+
+        self.assertEqual(fetch.call_count, 3)
+
+
+class TestTextSearchCache(unittest.TestCase):
+    """Tests for query normalization and the Text Search cache."""
+
+    def setUp(self):
+        places._search_cache.clear()
+
+    def test_normalize_query_variants(self):
+        variants = [
+            "Not Just Coffee in Charlotte NC",
+            "not just coffee, charlotte, nc",
+            "Not Just Coffee in Charlotte, North Carolina",
+        ]
+        self.assertEqual(
+            {places.normalize_query(v) for v in variants},
+            {"not just coffee charlotte nc"},
+        )
+
+    def test_normalize_query_keeps_state_codes(self):
+        indiana = {
+            places.normalize_query(v)
+            for v in ["Joe's Coffee, Portland, IN", "Joe's Coffee Portland Indiana"]
+        }
+        oregon = {
+            places.normalize_query(v)
+            for v in ["Joe's Coffee, Portland, OR", "joe's coffee portland oregon"]
+        }
+
+        self.assertEqual(indiana, {"joes coffee portland in"})
+        self.assertEqual(oregon, {"joes coffee portland or"})
+        self.assertEqual(places.normalize_query("Joe's Coffee in Portland"), "joes coffee portland")
+        self.assertEqual(places.normalize_query("JOE'S COFFEE IN PORTLAND"), "joes coffee portland")
+
+    def test_reworded_query_skips_search(self):
+        response = mock.Mock()
+        response.json.return_value = {
+            "status": "OK",
+            "results": [{"place_id": "p1"}, {"place_id": "p2"}],
+        }
+        session = mock.Mock()
+        session.get.return_value = response
+
+        with mock.patch.object(places, "_get_session", return_value=session):
+            first = places._search_places("Not Just Coffee in Charlotte NC", "key")
+            second = places._search_places("not just coffee, charlotte, nc", "key")
+
+        self.assertEqual([c["place_id"] for c in first], ["p1", "p2"])
+        self.assertEqual(second, first)
+        self.assertEqual(session.get.call_count, 1)
+
+
+class TestLeanMode(unittest.TestCase):
+    """Tests for building results straight from the Text Search payload."""
+
+    def setUp(self):
+        places._search_cache.clear()
+        places._details_cache.clear()
+
+    def test_details_only_for_incomplete_candidates(self):
+        complete = {
+            "place_id": "p1",
+            "name": "Not Just Coffee",
+            "formatted_address": "2230 Park Rd #102, Charlotte, NC 28203, USA",
+            "geometry": {"location": {"lat": 35.2, "lng": -80.8}},
+            "rating": 4.4,
+        }
+        incomplete = {"place_id": "p2", "name": "Not Just Coffee 2"}
+        response = mock.Mock()
+        response.json.return_value = {"status": "OK", "results": [complete, incomplete]}
+        session = mock.Mock()
+        session.get.return_value = response
+        fetch = mock.Mock(
+            return_value={**incomplete, "formatted_address": "Somewhere", "geometry": {}}
+        )
+
+        with mock.patch.dict(os.environ, {"GOOGLE_PLACES_API_KEY": "key"}), \
+                mock.patch.object(places, "_get_session", return_value=session), \
+                mock.patch.object(places, "_fetch_place_details", fetch), \
+                mock.patch.object(places, "PLACES_LEAN_MODE", True), \
+                mock.patch.object(places, "PLACES_RANKING", False):
+            result = places.find_business_from_google_maps("Not Just Coffee")
+
+        fetch.assert_called_once_with("p2", "key")
+        self.assertEqual(
+            [p["place_id"] for p in result["places"]], ["p1", "p2"]
+        )
+        self.assertEqual(result["places"][0]["address"], complete["formatted_address"])
+        self.assertEqual(result["places"][0]["lat"], "35.2")
+
+
+class TestAsyncPlaces(unittest.TestCase):
+    """Tests for the asyncio variant of the Places tool."""
+
+    def setUp(self):
+        places._search_cache.clear()
+        places._details_cache.clear()
+
+    def test_find_business_async(self):
+        async def handler(request):
+            if request.url.path.endswith("/textsearch/json"):
+                return httpx.Response(
+                    200,
+                    json={"status": "OK", "results": [{"place_id": "p1"}, {"place_id": "p2"}]},
+                )
+            place_id = request.url.params["place_id"]
+            await asyncio.sleep(0.2)
+            return httpx.Response(
+                200, json={"status": "OK", "result": {"place_id": place_id, "name": place_id}}
+            )
+
+        async def run():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            with mock.patch.object(places, "_get_async_client", return_value=client):
+                start = time.monotonic()
+                result = await places.find_business_from_google_maps_async("cafe")
+                elapsed = time.monotonic() - start
+            await client.aclose()
+            return result, elapsed
+
+        with mock.patch.dict(os.environ, {"GOOGLE_PLACES_API_KEY": "key"}):
+            result, elapsed = asyncio.run(run())
+
+        self.assertEqual([p["place_id"] for p in result["places"]], ["p1", "p2"])
+        self.assertLess(elapsed, 0.35)
+
+
+def _candidate(place_id, name, address, lat, lng):
+    return {
+        "place_id": place_id,
+        "name": name,
+        "formatted_address": address,
+        "geometry": {"location": {"lat": lat, "lng": lng}},
+    }
+
+
+class TestCandidateRanking(unittest.TestCase):
+    """Tests for local pre-ranking of Text Search candidates."""
+
+    def test_clear_winner_is_returned_alone(self):
+        candidates = [
+            _candidate("p1", "Charlotte Coffee Co", "1 Trade St, Charlotte, NC", 35.22, -80.84),
+            _candidate("p2", "Not Just Coffee", "2230 Park Rd, Charlotte, NC", 35.20, -80.85),
+            _candidate("p3", "Coffee Shop", "5 Main St, Raleigh, NC", 35.78, -78.64),
+        ]
+        ranked = places._rank_candidates("Not Just Coffee in Charlotte NC", candidates, 4)
+        self.assertEqual([c["place_id"] for c in ranked], ["p2"])
+
+    def test_equally_good_matches_are_all_kept(self):
+        candidates = [
+            _candidate("p1", "Not Just Coffee", "2230 Park Rd, Charlotte, NC", 35.20, -80.85),
+            _candidate("p2", "Not Just Coffee", "224 E 7th St, Charlotte, NC", 35.23, -80.84),
+            _candidate("p3", "Starbucks", "9 Tryon St, Charlotte, NC", 35.22, -80.84),
+        ]
+        ranked = places._rank_candidates("not just coffee, charlotte, nc", candidates, 4)
+        self.assertCountEqual([c["place_id"] for c in ranked], ["p1", "p2"])
+
+    def test_vague_query_keeps_search_order(self):
+        candidates = [
+            _candidate("p1", "Amélie's", "Charlotte, NC", 35.2, -80.8),
+            _candidate("p2", "Suarez Bakery", "Charlotte, NC", 35.2, -80.8),
+        ]
+        ranked = places._rank_candidates("pastries near uptown", candidates, 4)
+        self.assertEqual([c["place_id"] for c in ranked], ["p1", "p2"])
+
+    def test_state_code_counts_toward_locality(self):
+        candidates = [
+            _candidate("p1", "Joe's Coffee", "12 SW Oak St, Portland, OR 97204, USA", 45.52, -122.67),
+            _candidate("p2", "Joe's Coffee", "105 W Main St, Portland, IN 47371, USA", 40.43, -84.98),
+        ]
+        scores = places._score_candidates("Joe's Coffee, Portland, IN", candidates)
+        self.assertGreater(scores[1], scores[0])
+
+
+class TestPlacesBackpressure(unittest.TestCase):
+    """Tests for OVER_QUERY_LIMIT handling."""
+
+    def test_over_query_limit_is_retried(self):
+        throttled = mock.Mock(status_code=200)
+        throttled.json.return_value = {"status": "OVER_QUERY_LIMIT"}
+        ok = mock.Mock(status_code=200)
+        ok.json.return_value = {"status": "OK", "result": {"place_id": "p1"}}
+        session = mock.Mock()
+        session.get.side_effect = [throttled, ok]
+
+        with mock.patch.object(places, "_get_session", return_value=session), \
+                mock.patch.object(places, "PLACES_OVERLOAD_BACKOFF", 0.01):
+            details = places._fetch_place_details("p1", "key")
+
+        self.assertEqual(details, {"place_id": "p1"})
+        self.assertGreaterEqual(places.get_places_limiter_stats()["overloads"], 1)
+
+
+class TestStreamingPlaces(unittest.TestCase):
+    """Tests for the streaming variant of the Places tool."""
+
+    def setUp(self):
+        places._search_cache.clear()
+        places._details_cache.clear()
+
+    def test_places_are_yielded_as_details_arrive(self):
+        delays = {"slow": 0.3, "fast": 0.05}
+
+        async def handler(request):
+            if request.url.path.endswith("/textsearch/json"):
+                return httpx.Response(
+                    200,
+                    json={"status": "OK", "results": [{"place_id": "slow"}, {"place_id": "fast"}]},
+                )
+            place_id = request.url.params["place_id"]
+            await asyncio.sleep(delays[place_id])
+            return httpx.Response(200, json={"status": "OK", "result": {"place_id": place_id}})
+
+        async def run():
+            client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+            arrivals = []
+            start = time.monotonic()
+            with mock.patch.object(places, "_get_async_client", return_value=client):
+                async for place in places.find_business_from_google_maps_stream("cafe"):
+                    arrivals.append((place["place_id"], time.monotonic() - start))
+            await client.aclose()
+            return arrivals
+
+        with mock.patch.dict(os.environ, {"GOOGLE_PLACES_API_KEY": "key"}):
+            arrivals = asyncio.run(run())
+
+        self.assertEqual([place_id for place_id, _ in arrivals], ["fast", "slow"])
+        self.assertLess(arrivals[0][1], 0.2)
+
+    def test_non_live_runs_use_the_fallback(self):
+        async def fallback(query: str, max_results: int = 4):
+            return {"places": [query]}
+
+        tool = StreamingFunctionTool(
+            places.find_business_from_google_maps_stream, fallback=fallback
+        )
+        result = asyncio.run(tool.run_async(args={"query": "cafe"}, tool_context=None))
+        self.assertEqual(tool.name, "find_business_from_google_maps_stream")
+        self.assertEqual(result, {"places": ["cafe"]})
@@ -0,0 +1,79 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for KYC image normalization."""
+
+import os
+import unittest
+from io import BytesIO
+
+import PIL.Image
+
+from product_onboarding.sub_agents.kyc_check import preprocess
+
+SAMPLE_LICENSE = os.path.join(
+    os.path.dirname(__file__), "..", "data", "DL-brenda-sample.jpeg"
+)
+
+
+def phone_photo(path=SAMPLE_LICENSE, width=4032, orientation=6):
+    """Upscales a sample into a large, sideways JPEG with EXIF metadata."""
+    with PIL.Image.open(path) as image:
+        large = image.convert("RGB").resize(
+            (width, round(width * image.height / image.width))
+        )
+    # Stored rotated, as a phone held in portrait would, with the EXIF tag
+    # telling viewers to rotate it back.
+    stored = large.transpose(PIL.Image.Transpose.ROTATE_90)
+    exif = PIL.Image.Exif()
+    exif[0x0112] = orientation
+    exif[0x010F] = "PhoneMaker"
+    output = BytesIO()
+    stored.save(output, format="JPEG", quality=95, exif=exif)
+    return output.getvalue(), large.size
+
+
+class TestNormalizeImage(unittest.TestCase):
+    """Test cases for normalize_image."""
+
+    def test_phone_photo_is_upright_smaller_and_stripped(self):
+        data, upright_size = phone_photo()
+
+        normalized, mime_type = preprocess.normalize_image(memoryview(data), "image/jpeg")
+
+        self.assertEqual(mime_type, "image/jpeg")
+        self.assertLess(len(normalized) * 3, len(data))
+        with PIL.Image.open(BytesIO(normalized)) as image:
+            self.assertEqual(max(image.size), preprocess.KYC_IMAGE_MAX_SIDE)
+            # Landscape again, with the card's aspect ratio preserved.
+            self.assertAlmostEqual(
+                image.width / image.height, upright_size[0] / upright_size[1], places=2
+            )
+            self.assertEqual(len(image.getexif()), 0)
+
+    def test_small_upright_images_and_pdfs_pass_through(self):
+        with open(SAMPLE_LICENSE, "rb") as f:
+            sample = memoryview(f.read())
+
+        self.assertIs(preprocess.normalize_image(sample, "image/jpeg")[0], sample)
+        pdf = memoryview(b"%PDF-1.7")
+        self.assertEqual(preprocess.normalize_image(pdf, "application/pdf"), (pdf, "application/pdf"))
+
+    def test_unreadable_images_are_sent_as_is(self):
+        data = b"\xff\xd8\xff" + bytes(preprocess.KYC_IMAGE_MIN_BYTES)
+        self.assertEqual(preprocess.normalize_image(data, "image/jpeg"), (data, "image/jpeg"))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Tests for the shared rate limiter."""
+
+import asyncio
+import time
+import unittest
+
+from product_onboarding.shared_libraries.ratelimit import RateLimiter
+
+
+class TestRateLimiter(unittest.TestCase):
+    """Test cases for the token bucket and AIMD concurrency limit."""
+
+    def test_token_bucket_paces_requests(self):
+        limiter = RateLimiter(qps=20, burst=1, max_concurrency=4)
+        start = time.monotonic()
+        for _ in range(5):
+            with limiter.acquire():
+                pass
+        # The first request uses the burst, the other four wait 50 ms each.
+        self.assertGreaterEqual(time.monotonic() - start, 0.18)
+        self.assertGreater(limiter.stats()["queue_wait_total_s"], 0.15)
+
+    def test_overload_halves_and_success_recovers(self):
+        limiter = RateLimiter(qps=0, burst=1, max_concurrency=8, cooldown=60)
+        limiter.record(overloaded=True)
+        limiter.record(overloaded=True)  # Same burst, ignored by the cooldown.
+        self.assertEqual(limiter.stats()["concurrency_limit"], 4)
+
+        for _ in range(8):
+            limiter.record(overloaded=False)
+        self.assertEqual(limiter.stats()["concurrency_limit"], 5)
+
+    def test_async_acquire_respects_concurrency_limit(self):
+        limiter = RateLimiter(qps=0, burst=1, max_concurrency=2)
+        peak = 0
+
+        async def request():
+            nonlocal peak
+            async with limiter.acquire_async():
+                peak = max(peak, limiter.stats()["in_flight"])
+                await asyncio.sleep(0.02)
+
+        async def run():
+            await asyncio.gather(*(request() for _ in range(6)))
+
+        asyncio.run(run())
+        self.assertEqual(peak, 2)
+        self.assertEqual(limiter.stats()["in_flight"], 0)
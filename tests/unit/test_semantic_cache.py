@@ -0,0 +1,142 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Offline tests for the semantic knowledge base answer cache."""
+
+import unittest
+from unittest import mock
+
+import numpy as np
+
+from product_onboarding.sub_agents.product_recommender import agent as recommender_agent
+from product_onboarding.sub_agents.product_recommender.semantic_cache import (
+    SemanticCache,
+)
+
+# Hand-made embeddings: the first two questions are paraphrases.
+EMBEDDINGS = {
+    "does the Flex take tap to pay": [1.0, 0.1, 0.0],
+    "Flex contactless?": [0.9, 0.12, 0.05],
+    "how much does the Mini cost": [0.0, 0.2, 1.0],
+    # Nearly the same vector as the Flex question, about another product.
+    "does the Mini take tap to pay": [1.0, 0.1, 0.01],
+}
+ANSWER = {"answerText": "- Yes, Flex supports NFC.", "references": [{"uri": "u"}]}
+
+
+class _Embedder:
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, texts):
+        self.calls += 1
+        return np.array([EMBEDDINGS[t] for t in texts], dtype=np.float32)
+
+
+class TestSemanticCache(unittest.TestCase):
+    """Test cases for SemanticCache."""
+
+    def setUp(self):
+        self.embed = _Embedder()
+        self.cache = SemanticCache(embed=self.embed, threshold=0.95, ttl=60, maxsize=2)
+
+    def test_paraphrase_hits_and_unrelated_question_misses(self):
+        self.cache.set("does the Flex take tap to pay", ANSWER)
+
+        self.assertEqual(self.cache.get("Flex contactless?"), ANSWER)
+        self.assertIsNone(self.cache.get("how much does the Mini cost"))
+        self.assertEqual(self.cache.stats(), {"hits": 1, "misses": 1, "entries": 1})
+
+    def test_answer_is_not_reused_for_another_product(self):
+        mini_answer = {"answerText": "- Yes, Mini supports NFC.", "references": [{"uri": "m"}]}
+        self.cache.set("does the Flex take tap to pay", ANSWER)
+
+        self.assertIsNone(self.cache.get("does the Mini take tap to pay"))
+
+        self.cache.set("does the Mini take tap to pay", mini_answer)
+        self.assertEqual(self.cache.get("does the Mini take tap to pay"), mini_answer)
+        self.assertEqual(self.cache.get("Flex contactless?"), ANSWER)
+
+    def test_repeat_questions_reuse_their_embedding(self):
+        self.cache.set("does the Flex take tap to pay", ANSWER)
+        self.cache.get("Does the  Flex take tap to pay")
+        self.cache.get("does the flex take tap to pay")
+
+        self.assertEqual(self.embed.calls, 1)
+
+    def test_entries_expire_and_oldest_is_replaced_when_full(self):
+        with mock.patch("time.time", return_value=1000.0):
+            self.cache.set("does the Flex take tap to pay", ANSWER)
+        with mock.patch("time.time", return_value=1001.0):
+            self.cache.set("how much does the Mini cost", {"answerText": "$49"})
+            self.cache.set("Flex contactless?", {"answerText": "newer"})
+            self.assertEqual(
+                self.cache.get("how much does the Mini cost"), {"answerText": "$49"}
+            )
+            self.assertEqual(len(self.cache), 2)
+        with mock.patch("time.time", return_value=1100.0):
+            self.assertIsNone(self.cache.get("Flex contactless?"))
+
+    def test_catalog_version_change_clears_entries(self):
+        self.cache.set("does the Flex take tap to pay", ANSWER)
+        self.cache.check_version("")
+        self.assertEqual(self.cache.get("Flex contactless?"), ANSWER)
+
+        self.cache.check_version("2025-06")
+
+        self.assertIsNone(self.cache.get("Flex contactless?"))
+        self.assertEqual(self.cache.version, "2025-06")
+
+    def test_batched_top1(self):
+        self.cache.set("does the Flex take tap to pay", ANSWER)
+        self.cache.set("how much does the Mini cost", {"answerText": "$49"})
+
+        indices, scores = self.cache.top1(
+            np.array([EMBEDDINGS["how much does the Mini cost"], EMBEDDINGS["Flex contactless?"]])
+        )
+
+        self.assertEqual(list(indices), [1, 0])
+        self.assertAlmostEqual(float(scores[0]), 1.0, places=5)
+
+
+class TestKnowledgebaseSearchCache(unittest.TestCase):
+    """Test cases for the semantic cache in front of vertex_ai_search."""
+
+    ENV = {
+        "GOOGLE_CLOUD_PROJECT": "p",
+        "VERTEX_AI_SEARCH_LOCATION": "us",
+        "VERTEX_AI_SEARCH_ENGINE_ID": "engine",
+    }
+
+    def test_near_duplicate_question_skips_answer_generation(self):
+        search = mock.Mock(return_value={**ANSWER, "blobAttachments": []})
+        with mock.patch.dict("os.environ", self.ENV), mock.patch.object(
+            recommender_agent.vaisearch, "vertex_ai_search", search
+        ), mock.patch.object(
+            recommender_agent, "_answer_cache", SemanticCache(embed=_Embedder())
+        ):
+            first = recommender_agent.knowledgebase_search_agent(
+                "does the Flex take tap to pay", mock.Mock()
+            )
+            second = recommender_agent.knowledgebase_search_agent(
+                "Flex contactless?", mock.Mock()
+            )
+
+        self.assertEqual(search.call_count, 1)
+        self.assertEqual(first, ANSWER)
+        self.assertEqual(second, ANSWER)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,198 @@
+# Copyright 2025 Google LLC
+#
+# Licensed under the Apache License, Version 2.0 (the "License");
+# you may not use this file except in compliance with the License.
+# You may obtain a copy of the License at
+#
+#     http://www.apache.org/licenses/LICENSE-2.0
+#
+# Unless required by applicable law or agreed to in writing, software
+# distributed under the License is distributed on an "AS IS" BASIS,
+# WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+# See the License for the specific language governing permissions and
+# limitations under the License.
+
+"""Offline tests for the Vertex AI Search helpers."""
+
+import asyncio
+import unittest
+from unittest import mock
+
+import numpy as np
+from google.cloud import discoveryengine_v1 as discoveryengine
+
+from product_onboarding.sub_agents.product_recommender import agent as recommender_agent
+from product_onboarding.sub_agents.product_recommender import semantic_cache, vaisearch
+
+
+class TestVertexAISearch(unittest.TestCase):
+    """Test cases for the shared clients and request templates."""
+
+    def setUp(self):
+        vaisearch._clients.clear()
+        vaisearch._request_templates.clear()
+        self.addCleanup(vaisearch._clients.clear)
+        self.addCleanup(vaisearch._request_templates.clear)
+
+    def test_one_client_per_location(self):
+        with mock.patch.object(
+            discoveryengine, "ConversationalSearchServiceClient"
+        ) as client_class:
+            client_class.side_effect = lambda client_options: mock.Mock()
+            global_client = vaisearch.get_client("global")
+            self.assertIs(vaisearch.get_client("global"), global_client)
+            us_client = vaisearch.get_client("us")
+
+        self.assertIsNot(us_client, global_client)
+        self.assertIsNone(client_class.call_args_list[0].kwargs["client_options"])
+        self.assertEqual(
+            client_class.call_args_list[1].kwargs["client_options"].api_endpoint,
+            "us-discoveryengine.googleapis.com",
+        )
+
+    def test_requests_share_a_template_and_only_differ_in_query(self):
+        with mock.patch.object(
+            vaisearch, "_build_request_template", wraps=vaisearch._build_request_template
+        ) as build:
+            first = vaisearch.build_request("serving/a", "Which terminals take tips?")
+            second = vaisearch.build_request("serving/a", "Do you support Apple Pay?")
+            vaisearch.build_request("serving/b", "Apple Pay?")
+
+        self.assertEqual(build.call_count, 2)
+        self.assertEqual(first.query.text, "Which terminals take tips?")
+        self.assertEqual(second.query.text, "Do you support Apple Pay?")
+        self.assertEqual(second.search_spec.search_params.max_return_results, 3)
+        second.query.text = first.query.text
+        self.assertEqual(
+            discoveryengine.AnswerQueryRequest.pb(first),
+            discoveryengine.AnswerQueryRequest.pb(second),
+        )
+        self.assertFalse(vaisearch._request_templates["serving/a"].HasField("query"))
+
+    def test_vertex_ai_search_sends_request_on_cached_client(self):
+        client = mock.Mock()
+        client.answer_query.return_value = discoveryengine.AnswerQueryResponse(
+            answer=discoveryengine.Answer(answer_text="- Yes")
+        )
+        vaisearch._clients["us"] = client
+
+        result = vaisearch.vertex_ai_search("p", "us", "engine", "Apple Pay?")
+
+        request = client.answer_query.call_args.args[0]
+        self.assertEqual(
+            request.serving_config,
+            "projects/p/locations/us/collections/default_collection/engines/engine/servingConfigs/default_config",
+        )
+        self.assertEqual(request.query.text, "Apple Pay?")
+        self.assertEqual(result["answerText"], "- Yes")
+
+
+class _StreamingClient:
+    """Async client stand-in whose stream yields the given responses."""
+
+    def __init__(self, responses):
+        self.responses = responses
+        self.requests = []
+
+    async def stream_answer_query(self, request):
+        self.requests.append(request)
+
+        async def stream():
+            for response in self.responses:
+                await asyncio.sleep(0)
+                yield response
+
+        return stream()
+
+
+def _response(text, references=(), state=discoveryengine.Answer.State.STREAMING):
+    return discoveryengine.AnswerQueryResponse(
+        answer=discoveryengine.Answer(
+            answer_text=text,
+            state=state,
+            references=[
+                discoveryengine.Answer.Reference(
+                    chunk_info=discoveryengine.Answer.Reference.ChunkInfo(
+                        document_metadata=discoveryengine.Answer.Reference.ChunkInfo.DocumentMetadata(
+                            uri=uri, title=uri.rsplit("/", 1)[-1]
+                        )
+                    )
+                )
+                for uri in references
+            ],
+        )
+    )
+
+
+class TestStreamingAnswers(unittest.TestCase):
+    """Test cases for streaming knowledge base answers."""
+
+    RESPONSES = [
+        _response("- Flex takes tips."),
+        _response(" - Mini is portable."),
+        _response(
+            "",
+            references=["gs://kb/flex.pdf"],
+            state=discoveryengine.Answer.State.SUCCEEDED,
+        ),
+    ]
+
+    def _stream(self, responses, generator):
+        client = _StreamingClient(responses)
+
+        async def collect():
+            return [item async for item in generator]
+
+        with mock.patch.object(vaisearch, "get_async_client", return_value=client):
+            return asyncio.run(collect()), client
+
+    def test_chunks_then_final_answer_with_references(self):
+        items, client = self._stream(
+            self.RESPONSES, vaisearch.stream_vertex_ai_search("p", "us", "engine", "tips?")
+        )
+
+        self.assertEqual(client.requests[0].query.text, "tips?")
+        self.assertEqual(
+            items[:2],
+            [{"answerTextChunk": "- Flex takes tips."}, {"answerTextChunk": " - Mini is portable."}],
+        )
+        self.assertEqual(items[2]["answerText"], "- Flex takes tips. - Mini is portable.")
+        self.assertEqual(
+            items[2]["references"],
+            [{"uri": "https://storage.cloud.google.com/kb/flex.pdf", "title": "flex.pdf"}],
+        )
+
+    def test_cumulative_text_is_turned_into_deltas(self):
+        items, _ = self._stream(
+            [_response("- Flex"), _response("- Flex takes tips.")],
+            vaisearch.stream_vertex_ai_search("p", "us", "engine", "tips?"),
+        )
+
+        self.assertEqual(
+            [item.get("answerTextChunk") for item in items[:2]], ["- Flex", " takes tips."]
+        )
+        self.assertEqual(items[-1]["answerText"], "- Flex takes tips.")
+
+    def test_tool_streams_chunks_and_ends_with_tool_result(self):
+        tool_context = mock.Mock()
+        env = {
+            "GOOGLE_CLOUD_PROJECT": "p",
+            "VERTEX_AI_SEARCH_LOCATION": "us",
+            "VERTEX_AI_SEARCH_ENGINE_ID": "engine",
+        }
+        with mock.patch.dict("os.environ", env), mock.patch.object(
+            recommender_agent,
+            "_answer_cache",
+            semantic_cache.SemanticCache(embed=lambda texts: np.ones((len(texts), 4))),
+        ):
+            items, _ = self._stream(
+                self.RESPONSES,
+                recommender_agent.knowledgebase_search_stream("tips?", tool_context),
+            )
+
+        self.assertEqual(len(items), 3)
+        self.assertEqual(set(items[-1]), {"answerText", "references"})
+
+
+if __name__ == "__main__":
+    unittest.main()